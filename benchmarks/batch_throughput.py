@@ -0,0 +1,89 @@
+"""
+Бенчмарк пропускной способности инференса при разных размерах батча.
+
+Сценарий - офлайн-переобработка записанного видео с трамвая: кадры
+заранее декодируются в память, после чего модель с динамическим батчем
+прогоняется по ним батчами разного размера.
+
+С --backends сравниваются форматы модели, например ONNX через обёртку
+ultralytics и OrtEngine без неё.
+
+Пример:
+    python benchmarks/batch_throughput.py --source path/to/tram.mp4 --batch_sizes 1 2 4 8
+    python benchmarks/batch_throughput.py --source path/to/tram.mp4 --batch_sizes 1 4 --backends onnx ort
+"""
+
+import argparse
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.models.yolo_detector import YOLODetector, model_backend
+from src.pipeline.video_io import iter_batches, iter_frames
+
+
+def measure_throughput(
+    detector: YOLODetector, frames: List[np.ndarray], batch_size: int, warmup_runs: int = 2
+) -> Dict[str, float]:
+    """
+    Измерение пропускной способности инференса для одного размера батча.
+
+    Args:
+        detector: детектор с моделью, поддерживающей динамический батч
+        frames: декодированные кадры
+        batch_size: размер батча
+        warmup_runs: количество батчей для разогрева
+
+    Returns:
+        Dict[str, float]: fps и среднее время на кадр в миллисекундах
+    """
+    for batch in islice(iter_batches(frames, batch_size), warmup_runs):
+        detector.detect(batch)
+
+    start_time = time.perf_counter()
+    for batch in iter_batches(frames, batch_size):
+        detector.detect(batch)
+    total_time = time.perf_counter() - start_time
+
+    return {
+        "fps": len(frames) / total_time,
+        "ms_per_frame": total_time * 1000 / len(frames),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Batch inference throughput benchmark')
+    parser.add_argument('--source', type=str, required=True, help='Recorded video to reprocess')
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--max_frames', type=int, default=256, help='Number of frames to decode into memory')
+    parser.add_argument('--backends', type=str, nargs='+', help='Model formats to compare (default: ModelConfig backend)')
+    args = parser.parse_args()
+
+    frames = list(islice(iter_frames(args.source), args.max_frames))
+    if not frames:
+        raise ValueError(f"В видео {args.source} нет кадров")
+
+    print(f"Кадров: {len(frames)}, разрешение: {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print(f"{'backend':>8} {'batch':>6} {'fps':>10} {'ms/frame':>10} {'speedup':>10}")
+
+    baseline_fps = None
+    for backend in args.backends or [model_backend()]:
+        detector = YOLODetector(batch_size=max(max(args.batch_sizes), 2), backend=backend)
+        for batch_size in args.batch_sizes:
+            result = measure_throughput(detector, frames, batch_size)
+            if baseline_fps is None:
+                baseline_fps = result["fps"]
+            print(
+                f"{backend:>8} {batch_size:>6} {result['fps']:>10.1f} {result['ms_per_frame']:>10.2f} "
+                f"{result['fps'] / baseline_fps:>9.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
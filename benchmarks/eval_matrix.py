@@ -0,0 +1,241 @@
+"""
+Матрица скорость/качество по форматам модели, размерам входа, точности и
+режиму детекции раз в N кадров.
+
+Каждая конфигурация прогоняет размеченные клипы через headless-пайплайн
+(детекция, трекинг между детекциями, оценка расстояний), после чего по
+размеченным кадрам считаются mAP@0.5, mAP@0.5:0.95 и ошибка расстояния,
+а по всем кадрам - задержка кадра (p50/p95) и пропускная способность.
+Конфигурации, которые не уступают никакой другой сразу по mAP@0.5:0.95,
+ошибке расстояния, FPS и p95 задержки, отмечаются как Парето-оптимальные.
+
+Клип - видео и файл разметки с тем же именем и расширением .jsonl
+рядом с ним (формат см. src/utils/evaluation.py: load_labels).
+INT8 проверяется только для onnx и ort и требует --calibration_dir.
+
+Пример:
+    python benchmarks/eval_matrix.py --clips recordings/labelled --backends onnx ort openvino \
+        --img_sizes 256 320 416 --precisions fp32 int8 --detect_every 1 3 --calibration_dir recordings/calib
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from config.settings import ModelConfig
+from src.models.yolo_detector import INT8_BACKENDS, YOLODetector
+from src.pipeline.processor import VideoProcessor
+from src.pipeline.results_writer import load_results
+from src.utils.autotune import available_backends
+from src.utils.evaluation import detection_map, distance_error, load_labels, pareto_front
+from src.utils.metrics import PipelineMetrics
+from src.utils.profiling import latency_summary
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov")
+
+
+def list_clips(clips_dir: str) -> List[Tuple[str, str]]:
+    """
+    Размеченные клипы директории: видео, для которых рядом лежит разметка .jsonl
+
+    Args:
+        clips_dir: директория с клипами
+
+    Returns:
+        List[Tuple[str, str]]: пары (видео, разметка), отсортированные по имени
+    """
+    clips = []
+    for video in sorted(Path(clips_dir).iterdir()):
+        labels = video.with_suffix(".jsonl")
+        if video.suffix.lower() in VIDEO_EXTENSIONS and labels.exists():
+            clips.append((str(video), str(labels)))
+    return clips
+
+
+def config_grid(
+    backends: Sequence[str],
+    img_sizes: Sequence[int],
+    precisions: Sequence[str],
+    detect_every: Sequence[int],
+) -> List[Dict[str, Any]]:
+    """
+    Все сочетания параметров (INT8 - только для INT8_BACKENDS)
+
+    Returns:
+        List[Dict[str, Any]]: конфигурации backend, img_size, precision, detect_every
+    """
+    return [
+        {"backend": backend, "img_size": img_size, "precision": precision, "detect_every": n}
+        for backend, img_size, precision, n in itertools.product(backends, img_sizes, precisions, detect_every)
+        if precision == "fp32" or backend in INT8_BACKENDS
+    ]
+
+
+def evaluate_config(config: Dict[str, Any], clips: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Прогон одной конфигурации по всем клипам
+
+    Args:
+        config: конфигурация (см. config_grid)
+        clips: пары (видео, разметка)
+
+    Returns:
+        Dict[str, Any]: конфигурация, map50, map50_95, distance (см.
+            distance_error), latency (сводка задержек кадра), fps, frames и error
+    """
+    try:
+        detector = YOLODetector(
+            batch_size=1, int8=config["precision"] == "int8", img_size=config["img_size"], backend=config["backend"]
+        )
+        detector.warmup(3)
+        processor = VideoProcessor(detector=detector, show_stats=False, metrics=PipelineMetrics())
+
+        predictions, distances, labels, latencies_ms = [], [], [], []
+        total_time, total_frames = 0.0, 0
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for video_path, labels_path in clips:
+                clip_labels = load_labels(labels_path, detector.names)
+                results_path = str(Path(tmp_dir) / "results.bin")
+
+                start_time = time.perf_counter()
+                # первый интервал клипа включает открытие видео и в задержки кадра не входит
+                last_time = None
+
+                def on_frame(frames: int) -> None:
+                    nonlocal last_time
+                    now = time.perf_counter()
+                    if last_time is not None:
+                        latencies_ms.append((now - last_time) * 1000)
+                    last_time = now
+
+                total_frames += processor.process_results(
+                    video_path, results_path, detect_every=config["detect_every"], progress_callback=on_frame
+                )
+                total_time += time.perf_counter() - start_time
+
+                results = load_results(results_path)
+                offsets = results["offsets"]
+                for i, frame_index in enumerate(results["frame"].tolist()):
+                    if frame_index not in clip_labels:
+                        continue
+                    rows = slice(offsets[i], offsets[i + 1])
+                    xyxy, cls = results["boxes"][rows], results["cls"][rows].astype(np.int32)
+                    predictions.append((xyxy, cls, results["conf"][rows]))
+                    distances.append((xyxy, cls, results["distance"][rows]))
+                    labels.append(clip_labels[frame_index])
+
+        return {
+            **config,
+            **detection_map(predictions, labels),
+            "distance": distance_error(distances, labels),
+            "latency": latency_summary(latencies_ms),
+            "fps": total_frames / total_time if total_time else 0.0,
+            "frames": total_frames,
+            "labelled_frames": len(labels),
+            "error": None,
+        }
+    except Exception as e:
+        return {**config, "error": f"{type(e).__name__}: {e}"}
+
+
+def mark_pareto(results: List[Dict[str, Any]]) -> None:
+    """
+    Отметка Парето-оптимальных конфигураций (поле pareto): больше
+    mAP@0.5:0.95 и FPS, меньше ошибка расстояния и p95 задержки кадра.
+    Скорость сравнивается прежде всего по FPS: при детекции раз в N
+    кадров детектор всё равно работает на каждом N-м кадре, и p95
+    задержки кадра равен задержке детектора, поэтому по одному p95
+    пропуск кадров никогда не выигрывал бы. Без размеченных расстояний
+    ошибка расстояния не учитывается.
+
+    Args:
+        results: результаты evaluate_config (изменяются на месте)
+    """
+    valid = [r for r in results if r["error"] is None]
+    for r in results:
+        r["pareto"] = False
+    if not valid:
+        return
+
+    distance_known = all(r["distance"]["matched"] for r in valid)
+    points = [
+        [r["map50_95"], r["fps"], -r["latency"]["p95_ms"]] + ([-r["distance"]["mae_m"]] if distance_known else [])
+        for r in valid
+    ]
+    for r, is_optimal in zip(valid, pareto_front(np.array(points))):
+        r["pareto"] = bool(is_optimal)
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"\n{'':>2} {'backend':>9} {'size':>5} {'prec':>5} {'every':>5} {'mAP50':>7} {'mAP50-95':>9} "
+        f"{'dist MAE, м':>12} {'dist rel':>9} {'p50, мс':>8} {'p95, мс':>8} {'FPS':>7}"
+    )
+    for r in results:
+        head = (
+            f"{'*' if r.get('pareto') else '':>2} {r['backend']:>9} {r['img_size']:>5} "
+            f"{r['precision']:>5} {r['detect_every']:>5}"
+        )
+        if r["error"] is not None:
+            print(f"{head} ошибка: {r['error']}")
+            continue
+        d, latency = r["distance"], r["latency"]
+        print(
+            f"{head} {r['map50']:>7.3f} {r['map50_95']:>9.3f} {d['mae_m']:>12.2f} {d['rel_error']:>9.1%} "
+            f"{latency['p50_ms']:>8.1f} {latency['p95_ms']:>8.1f} {r['fps']:>7.1f}"
+        )
+    print("\n* - Парето-оптимальные конфигурации (mAP@0.5:0.95, ошибка расстояния, FPS, p95 задержки)")
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description='Speed vs accuracy matrix over backends, input sizes, precisions and frame skipping')
+    parser.add_argument('--clips', type=str, required=True, help='Directory with videos and <video>.jsonl labels')
+    parser.add_argument('--backends', type=str, nargs='+', default=['pt', 'onnx', 'ort', 'openvino'],
+                        help='Model formats (missing runtimes are skipped)')
+    parser.add_argument('--img_sizes', type=int, nargs='+', default=[256, 320, 416])
+    parser.add_argument('--precisions', choices=['fp32', 'int8'], nargs='+', default=['fp32'])
+    parser.add_argument('--detect_every', type=int, nargs='+', default=[1, 3],
+                        help='Run the detector every N frames and track in between')
+    parser.add_argument('--calibration_dir', type=str, default=ModelConfig.CALIBRATION_DIR,
+                        help='Calibration videos for INT8 models')
+    parser.add_argument('--output', type=str, default='eval_matrix.json', help='Path to save the JSON report')
+    args = parser.parse_args()
+
+    clips = list_clips(args.clips)
+    if not clips:
+        parser.error(f"в {args.clips} нет видео с разметкой .jsonl")
+    ModelConfig.CALIBRATION_DIR = args.calibration_dir
+
+    results = []
+    for config in config_grid(available_backends(args.backends), args.img_sizes, args.precisions, args.detect_every):
+        print(f"Оценка {config}...")
+        results.append(evaluate_config(config, clips))
+    mark_pareto(results)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "clips": [video for video, _ in clips],
+            "model_path": ModelConfig.MODEL_PATH,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(results)
+    print(f"\nОтчёт сохранён в {args.output}")
+    return 0 if any(r["error"] is None for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Бенчмарк передачи кадров между процессами: multiprocessing.Queue против
+кольца кадров в общей памяти (src/pipeline/shared_frames.py).
+
+Оба варианта - одинаковый конвейер из процессов: декодер -> preprocess
+(уменьшение кадра до входа модели) -> render (отрисовка на кадре) ->
+приёмник в основном процессе (с --encode - запись видео). Через Queue
+каждый кадр сериализуется и копируется на каждом переходе между
+процессами, через кольцо передаются только номера слотов. Пропускная
+способность считается от первого до последнего кадра на приёмнике, то
+есть без запуска процессов.
+
+Пример:
+    python benchmarks/frame_transport.py --resolutions 640x480 1280x720 1920x1080 --frames 300
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from config.settings import PipelineConfig
+from src.pipeline.shared_frames import run_ring_pipeline
+from src.pipeline.video_io import create_video_writer, get_video_properties, iter_frames
+from src.utils.profiling import rss_mb
+
+MODEL_INPUT = (320, 320)
+
+
+def preprocess_stage(frame: np.ndarray, payload: Any) -> float:
+    """Уменьшение кадра до входа модели (нагрузка стадии инференса)."""
+    small = cv2.resize(frame, MODEL_INPUT, interpolation=cv2.INTER_LINEAR)
+    return float(small[::8, ::8].mean())
+
+
+def render_stage(frame: np.ndarray, payload: Any) -> float:
+    """Отрисовка прямо в кадр (нагрузка стадии отрисовки)."""
+    h, w = frame.shape[:2]
+    for i in range(5):
+        x = (i * w) // 6
+        cv2.rectangle(frame, (x, h // 3), (x + w // 10, h // 2), (0, 0, 255), 2)
+    cv2.putText(frame, f"{payload:.1f}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2)
+    return payload
+
+
+STAGES = [("preprocess", preprocess_stage), ("render", render_stage)]
+
+
+def _decode_to_queue(video_path: str, out_queue: "mp.Queue") -> None:
+    for index, frame in enumerate(iter_frames(video_path)):
+        out_queue.put((index, frame, None))
+    out_queue.put(None)
+
+
+def _run_queue_stage(func: Callable[[np.ndarray, Any], Any], in_queue: "mp.Queue", out_queue: "mp.Queue") -> None:
+    while True:
+        item = in_queue.get()
+        if item is None:
+            out_queue.put(None)
+            return
+        index, frame, payload = item
+        out_queue.put((index, frame, func(frame, payload)))
+
+
+def run_queue_pipeline(
+    video_path: str,
+    stages: List[Tuple[str, Callable[[np.ndarray, Any], Any]]],
+    sink: Callable[[np.ndarray, Any], None],
+    queue_size: int,
+) -> int:
+    """
+    Тот же конвейер, что run_ring_pipeline, но кадры передаются через
+    multiprocessing.Queue (pickle на каждом переходе)
+
+    Returns:
+        int: количество кадров, дошедших до sink
+    """
+    ctx = mp.get_context("spawn")
+    queues = [ctx.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    processes = [ctx.Process(target=_decode_to_queue, args=(video_path, queues[0]))]
+    for i, (_, func) in enumerate(stages):
+        processes.append(ctx.Process(target=_run_queue_stage, args=(func, queues[i], queues[i + 1])))
+
+    for process in processes:
+        process.start()
+    count = 0
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is None:
+                break
+            _, frame, payload = item
+            sink(frame, payload)
+            count += 1
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    return count
+
+
+def measure_transport(
+    transport: str, video_path: str, queue_size: int, num_slots: int, output_path: Optional[str]
+) -> Dict[str, float]:
+    """
+    Прогон конвейера с одним способом передачи кадров
+
+    Args:
+        transport: "queue" или "ring"
+        video_path: путь до видео
+        queue_size: размер очередей между процессами
+        num_slots: число слотов кольца
+        output_path: путь записи итогового видео (None - без кодирования)
+
+    Returns:
+        Dict[str, float]: frames, fps, ms_per_frame, ipc_mb_per_frame
+            (объём кадров, сериализуемых между процессами) и peak_rss_mb
+            основного процесса
+    """
+    w, h, fps = get_video_properties(video_path)
+    writer = create_video_writer(output_path, fps, (w, h)) if output_path else None
+    times: List[float] = []
+    peak_rss = rss_mb()
+
+    def sink(frame: np.ndarray, payload: Any) -> None:
+        nonlocal peak_rss
+        if writer is not None:
+            writer.write(frame)
+        times.append(time.perf_counter())
+        if len(times) % 50 == 0:
+            peak_rss = max(peak_rss, rss_mb())
+
+    try:
+        if transport == "ring":
+            frames = run_ring_pipeline(video_path, STAGES, sink, num_slots, queue_size)
+        else:
+            frames = run_queue_pipeline(video_path, STAGES, sink, queue_size)
+    finally:
+        if writer is not None:
+            writer.release()
+
+    elapsed = times[-1] - times[0] if len(times) > 1 else float("nan")
+    hops = len(STAGES) + 1 if transport == "queue" else 0
+    return {
+        "frames": frames,
+        "fps": (len(times) - 1) / elapsed,
+        "ms_per_frame": elapsed * 1000 / (len(times) - 1),
+        "ipc_mb_per_frame": hops * w * h * 3 / 1024 ** 2,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    w, h = value.lower().split('x')
+    return int(w), int(h)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Inter-process frame transport: multiprocessing.Queue vs shared-memory ring')
+    parser.add_argument('--source', type=str, help='Recorded video (default: synthetic video per resolution)')
+    parser.add_argument('--resolutions', type=str, nargs='+', default=['640x480', '1280x720', '1920x1080'],
+                        help='Frame sizes WxH for synthetic videos (ignored with --source)')
+    parser.add_argument('--frames', type=int, default=300, help='Frames per synthetic video')
+    parser.add_argument('--queue_size', type=int, default=PipelineConfig.QUEUE_SIZE)
+    parser.add_argument('--slots', type=int, default=PipelineConfig.RING_SLOTS, help='Ring slots')
+    parser.add_argument('--encode', action='store_true', help='Encode the output video in the sink')
+    parser.add_argument('--output', type=str, help='Optional path to save the JSON report')
+    args = parser.parse_args()
+
+    # импорт здесь: процессы конвейера (spawn) импортируют этот модуль, а stage_latency тянет torch
+    from benchmarks.stage_latency import make_synthetic_video
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.source:
+            w, h, _ = get_video_properties(args.source)
+            videos = [(f"{w}x{h}", args.source)]
+        else:
+            videos = []
+            for resolution in args.resolutions:
+                w, h = parse_resolution(resolution)
+                path = os.path.join(tmp_dir, f"{w}x{h}.avi")
+                videos.append((f"{w}x{h}", make_synthetic_video(path, (w, h), args.frames)))
+
+        output_path = os.path.join(tmp_dir, "encoded.mp4") if args.encode else None
+        for resolution, video_path in videos:
+            results[resolution] = {}
+            for transport in ("queue", "ring"):
+                print(f"Замер {resolution} через {transport}...")
+                results[resolution][transport] = measure_transport(
+                    transport, video_path, args.queue_size, args.slots, output_path
+                )
+
+    print(f"\n{'resolution':>12} {'transport':>10} {'FPS':>8} {'мс/кадр':>9} {'IPC, МБ/кадр':>13} {'RSS, МБ':>9}")
+    for resolution, by_transport in results.items():
+        for transport, r in by_transport.items():
+            print(
+                f"{resolution:>12} {transport:>10} {r['fps']:>8.1f} {r['ms_per_frame']:>9.2f} "
+                f"{r['ipc_mb_per_frame']:>13.2f} {r['peak_rss_mb']:>9.0f}"
+            )
+        speedup = by_transport["ring"]["fps"] / by_transport["queue"]["fps"]
+        print(f"{resolution:>12} {'ring/queue':>10} {speedup:>8.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
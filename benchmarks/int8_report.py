@@ -0,0 +1,152 @@
+"""
+Отчёт по INT8 квантизации: задержка и согласованность детекций относительно FP32.
+
+Если INT8 модели ещё нет в кэше моделей, она строится статической квантизацией
+с калибровкой на кадрах из --calibration_dir. Сравнение идёт на кадрах
+из --source (желательно не тех же видео, что использовались для калибровки):
+FP32 детекции считаются эталоном, для INT8 считаются precision, recall
+и средний IoU совпавших boxes.
+
+Пример:
+    python benchmarks/int8_report.py --calibration_dir recordings/calib --source recordings/test.mp4
+"""
+
+import argparse
+import json
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from config.settings import ModelConfig
+from src.models.yolo_detector import YOLODetector
+from src.pipeline.video_io import iter_frames
+from src.utils.boxes import box_iou, match_detections
+from src.utils.profiling import latency_summary
+
+
+def run_model(detector: YOLODetector, frames: List[np.ndarray], warmup_runs: int = 3) -> Dict:
+    """
+    Прогон модели по кадрам с замером задержки.
+
+    Args:
+        detector: детектор
+        frames: кадры для прогона
+        warmup_runs: количество прогонов для разогрева
+
+    Returns:
+        Dict: задержки в мс и детекции (xyxy, cls) по каждому кадру
+    """
+    for frame in frames[:warmup_runs]:
+        detector.model(frame, device="cpu", verbose=False)
+
+    latencies, detections = [], []
+    for frame in frames:
+        start_time = time.perf_counter()
+        result = detector.model(frame, device="cpu", verbose=False)[0]
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        detections.append(
+            (result.boxes.xyxy.cpu().numpy(), result.boxes.cls.cpu().numpy())
+        )
+
+    return {"latencies": np.array(latencies), "detections": detections}
+
+
+def detection_agreement(reference: List, candidate: List, iou_threshold: float = 0.5) -> Dict[str, float]:
+    """
+    Согласованность детекций candidate с эталонными детекциями reference.
+
+    Args:
+        reference: список (xyxy, cls) эталонной модели по кадрам
+        candidate: список (xyxy, cls) сравниваемой модели по кадрам
+        iou_threshold: минимальный IoU для совпадения
+
+    Returns:
+        Dict[str, float]: precision, recall, f1 и средний IoU совпавших boxes
+    """
+    total_ref, total_cand, total_matched = 0, 0, 0
+    matched_ious = []
+    for (ref_xyxy, ref_cls), (xyxy, cls) in zip(reference, candidate):
+        ref_idx, idx = match_detections(ref_xyxy, ref_cls, xyxy, cls, iou_threshold)
+        total_ref += len(ref_xyxy)
+        total_cand += len(xyxy)
+        total_matched += len(ref_idx)
+        if len(ref_idx):
+            matched_ious.extend(box_iou(ref_xyxy[ref_idx], xyxy[idx]).diagonal().tolist())
+
+    precision = total_matched / total_cand if total_cand else 1.0
+    recall = total_matched / total_ref if total_ref else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "mean_iou": float(np.mean(matched_ious)) if matched_ious else 0.0,
+        "reference_boxes": total_ref,
+        "candidate_boxes": total_cand,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='INT8 vs FP32 latency and detection agreement report')
+    parser.add_argument('--source', type=str, required=True, help='Video used for the comparison')
+    parser.add_argument('--calibration_dir', type=str, default=ModelConfig.CALIBRATION_DIR)
+    parser.add_argument('--calibration_frames', type=int, default=ModelConfig.CALIBRATION_FRAMES)
+    parser.add_argument('--max_frames', type=int, default=200)
+    parser.add_argument('--iou_threshold', type=float, default=0.5)
+    parser.add_argument('--report_path', type=str, help='Optional path to save the report as JSON')
+    args = parser.parse_args()
+
+    if args.calibration_dir is None:
+        parser.error("укажите --calibration_dir")
+    ModelConfig.CALIBRATION_DIR = args.calibration_dir
+    ModelConfig.CALIBRATION_FRAMES = args.calibration_frames
+
+    fp32_detector = YOLODetector(batch_size=1, int8=False)
+    int8_detector = YOLODetector(batch_size=1, int8=True)
+
+    frames = list(islice(iter_frames(args.source), args.max_frames))
+    if not frames:
+        raise ValueError(f"В видео {args.source} нет кадров")
+
+    fp32 = run_model(fp32_detector, frames)
+    int8 = run_model(int8_detector, frames)
+
+    report = {
+        "frames": len(frames),
+        "img_size": ModelConfig.IMG_SIZE,
+        "fp32": latency_summary(fp32["latencies"]),
+        "int8": latency_summary(int8["latencies"]),
+        "speedup": float(fp32["latencies"].mean() / int8["latencies"].mean()),
+        "agreement": detection_agreement(
+            fp32["detections"], int8["detections"], args.iou_threshold
+        ),
+    }
+
+    print(f"Кадров: {report['frames']}, IMG_SIZE: {report['img_size']}")
+    print(f"{'':>6} {'mean, мс':>10} {'p50, мс':>10} {'p95, мс':>10}")
+    for name in ("fp32", "int8"):
+        stats = report[name]
+        print(f"{name:>6} {stats['mean_ms']:>10.2f} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f}")
+    print(f"Ускорение INT8: {report['speedup']:.2f}x")
+
+    agreement = report["agreement"]
+    print(
+        f"Согласованность с FP32 (IoU >= {args.iou_threshold}): "
+        f"precision {agreement['precision']:.3f}, recall {agreement['recall']:.3f}, "
+        f"F1 {agreement['f1']:.3f}, средний IoU {agreement['mean_iou']:.3f}"
+    )
+
+    if args.report_path:
+        with open(args.report_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Бенчмарк задержки по стадиям обработки кадра.
+
+Для каждой пары (разрешение кадра, IMG_SIZE) кадры проходят стадии
+decode -> preprocess -> inference -> postprocess -> draw -> encode, и
+каждая стадия замеряется отдельно. В отчёт попадают p50/p95/p99 задержки
+каждой стадии и всего кадра, пропускная способность и пиковый RSS.
+Модель загружается один раз на IMG_SIZE. Если --source не указан,
+для каждого разрешения генерируется синтетическое видео.
+
+Отчёт сохраняется в JSON. С --baseline отчёт сравнивается с сохранённым
+ранее, и при ухудшении больше чем на --max_regression процентов скрипт
+завершается с кодом 1.
+
+Пример:
+    python benchmarks/stage_latency.py --resolutions 640x480 1280x720 --img_sizes 320 640 --output latency.json
+    cp latency.json latency_baseline.json
+    python benchmarks/stage_latency.py --resolutions 640x480 1280x720 --img_sizes 320 640 --baseline latency_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import torch
+from ultralytics import YOLO, __version__ as ultralytics_version
+
+from config.settings import ModelConfig, VideoWriterConfig
+from src.models.distance_estimator import create_distance_estimator
+from src.models.yolo_detector import YOLODetector, model_backend
+from src.pipeline.video_io import create_video_writer, get_video_properties
+from src.utils.profiling import StageTimer, find_regressions, latency_summary, rss_mb
+from src.utils.visualization import OverlayRenderer
+
+STAGES = ("decode", "preprocess", "inference", "postprocess", "draw", "encode")
+
+
+def load_model(img_size: int) -> YOLO:
+    """
+    Загрузка модели с входом img_size x img_size (ONNX модель берётся из
+    кэша моделей или экспортируется для этого размера входа)
+
+    Args:
+        img_size: размер стороны входа модели
+
+    Returns:
+        YOLO: модель
+    """
+    # стадии замеряются через предиктор ultralytics, поэтому OrtEngine заменяется той же ONNX моделью в YOLO
+    backend = "onnx" if model_backend() == "ort" else None
+    return YOLODetector(batch_size=1, int8=False, img_size=img_size, backend=backend).model
+
+
+def make_synthetic_video(path: str, size: Tuple[int, int], frames: int, fps: float = 25.0) -> str:
+    """
+    Синтетическое видео с движущимися прямоугольниками на градиентном фоне
+
+    Args:
+        path: путь сохранения видео
+        size: (ширина, высота) кадра
+        frames: количество кадров
+        fps: частота кадров
+
+    Returns:
+        str: путь до видео
+    """
+    w, h = size
+    rng = np.random.default_rng(0)
+    background = np.zeros((h, w, 3), dtype=np.uint8)
+    background[..., 0] = np.linspace(40, 200, w, dtype=np.uint8)[None, :]
+    background[..., 1] = np.linspace(60, 160, h, dtype=np.uint8)[:, None]
+
+    boxes = rng.uniform(0, 0.7, (6, 2)) * (w, h)
+    sizes = rng.uniform(0.05, 0.25, (6, 2)) * (w, h)
+    speeds = rng.uniform(-0.01, 0.01, (6, 2)) * (w, h)
+    colors = rng.integers(0, 255, (6, 3)).tolist()
+
+    writer = create_video_writer(path, fps, (w, h))
+    try:
+        for i in range(frames):
+            frame = background.copy()
+            for (x, y), (bw, bh), (dx, dy), color in zip(boxes, sizes, speeds, colors):
+                x1, y1 = int((x + dx * i) % w), int((y + dy * i) % h)
+                cv2.rectangle(frame, (x1, y1), (int(x1 + bw), int(y1 + bh)), color, -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def measure_stages(
+    model: YOLO,
+    img_size: int,
+    video_path: str,
+    output_path: str,
+    max_frames: int,
+    warmup_frames: int,
+    writer_backend: Optional[str] = None,
+) -> Dict:
+    """
+    Замер задержки каждой стадии на кадрах одного видео
+
+    Preprocess, inference и postprocess вызываются у предиктора ultralytics
+    напрямую, то есть это те же шаги, что выполняются при model(frame).
+
+    Args:
+        model: модель
+        img_size: размер стороны входа модели
+        video_path: путь до видео
+        output_path: путь для записи итогового видео (стадия encode)
+        max_frames: максимальное количество замеряемых кадров
+        warmup_frames: количество кадров для разогрева (в замер не входят)
+        writer_backend: backend записи видео (см. create_video_writer)
+
+    Returns:
+        Dict: сводки по стадиям, итоговая задержка кадра, fps и peak_rss_mb
+    """
+    w, h, fps = get_video_properties(video_path)
+    estimator = create_distance_estimator(model.names)
+    renderer = OverlayRenderer(model.names)
+    timer = StageTimer()
+
+    cap = cv2.VideoCapture(video_path)
+    writer = create_video_writer(output_path, fps, (w, h), writer_backend)
+    peak_rss = rss_mb()
+    try:
+        with torch.inference_mode():
+            for i in range(warmup_frames + max_frames):
+                if i == warmup_frames:
+                    timer = StageTimer()
+
+                with timer.stage("decode"):
+                    ret, frame = cap.read()
+                if not ret:
+                    timer.samples["decode"].pop()
+                    break
+                if i == 0:
+                    model(frame, device="cpu", verbose=False, imgsz=img_size)
+                    predictor = model.predictor
+
+                with timer.stage("preprocess"):
+                    im = predictor.preprocess([frame])
+                with timer.stage("inference"):
+                    preds = predictor.inference(im)
+                with timer.stage("postprocess"):
+                    boxes = predictor.postprocess(preds, im, [frame])[0].boxes
+                    xyxy = boxes.xyxy.cpu().numpy()
+                    confs = boxes.conf.cpu().numpy()
+                    cls_ids = boxes.cls.cpu().numpy().astype(np.int32)
+                    distances = estimator.estimate_batch(cls_ids, xyxy, (w, h))
+                with timer.stage("draw"):
+                    frame = renderer.render(frame, xyxy, cls_ids, confs, distances)
+                with timer.stage("encode"):
+                    writer.write(frame)
+
+                peak_rss = max(peak_rss, rss_mb())
+    finally:
+        cap.release()
+        writer.release()
+
+    frames = len(timer.samples["encode"])
+    if frames == 0:
+        raise ValueError(f"В видео {video_path} меньше {warmup_frames + 1} кадров")
+
+    totals = np.sum([timer.samples[stage][:frames] for stage in STAGES], axis=0)
+    return {
+        "frames": frames,
+        "stages": timer.summary(),
+        "total": latency_summary(totals),
+        "fps": float(frames / (totals.sum() / 1000)),
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    w, h = value.lower().split('x')
+    return int(w), int(h)
+
+
+def print_report(results: Dict[str, Dict]) -> None:
+    for config, result in results.items():
+        print(
+            f"\n{config}: {result['frames']} кадров, {result['fps']:.1f} FPS, "
+            f"peak RSS {result['peak_rss_mb']:.0f} МБ"
+        )
+        print(f"{'stage':>12} {'mean, мс':>10} {'p50, мс':>10} {'p95, мс':>10} {'p99, мс':>10}")
+        for stage, stats in {**result["stages"], "total": result["total"]}.items():
+            print(
+                f"{stage:>12} {stats['mean_ms']:>10.2f} {stats['p50_ms']:>10.2f} "
+                f"{stats['p95_ms']:>10.2f} {stats['p99_ms']:>10.2f}"
+            )
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description='Per-stage latency benchmark with regression gating')
+    parser.add_argument('--source', type=str, help='Recorded video (default: synthetic video per resolution)')
+    parser.add_argument('--resolutions', type=str, nargs='+', default=['640x480', '1280x720', '1920x1080'],
+                        help='Frame sizes WxH for synthetic videos (ignored with --source)')
+    parser.add_argument('--img_sizes', type=int, nargs='+', default=[ModelConfig.IMG_SIZE])
+    parser.add_argument('--frames', type=int, default=100, help='Measured frames per configuration')
+    parser.add_argument('--warmup', type=int, default=10, help='Warmup frames per configuration')
+    parser.add_argument('--writer', choices=['auto', 'ffmpeg', 'opencv'], help='Output video encoder for the encode stage')
+    parser.add_argument('--output', type=str, default='stage_latency.json', help='Path to save the JSON report')
+    parser.add_argument('--baseline', type=str, help='Saved JSON report to compare against')
+    parser.add_argument('--max_regression', type=float, default=10.0,
+                        help='Allowed degradation against the baseline, percent')
+    parser.add_argument('--min_delta_ms', type=float, default=0.5,
+                        help='Latency changes below this are never regressions')
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.source:
+            w, h, _ = get_video_properties(args.source)
+            videos: List[Tuple[str, str]] = [(f"{w}x{h}", args.source)]
+        else:
+            videos = []
+            for resolution in args.resolutions:
+                w, h = parse_resolution(resolution)
+                path = os.path.join(tmp_dir, f"{w}x{h}.mp4")
+                videos.append((f"{w}x{h}", make_synthetic_video(path, (w, h), args.warmup + args.frames)))
+
+        for img_size in args.img_sizes:
+            model = load_model(img_size)
+            for resolution, video_path in videos:
+                config = f"{resolution}@{img_size}"
+                print(f"Замер {config}...")
+                results[config] = measure_stages(
+                    model, img_size, video_path, os.path.join(tmp_dir, "encoded.mp4"),
+                    args.frames, args.warmup, args.writer,
+                )
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "ultralytics": ultralytics_version,
+            "opencv": cv2.__version__,
+            "quantization": ModelConfig.QUANTIZATION,
+            "backend": model_backend(),
+            "model_path": ModelConfig.MODEL_PATH,
+            "writer": args.writer or VideoWriterConfig.BACKEND,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(results)
+    print(f"\nОтчёт сохранён в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(
+            results, baseline["results"], args.max_regression, args.min_delta_ms
+        )
+        if regressions:
+            print(f"\nРегрессии относительно {args.baseline} (больше {args.max_regression}%):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nРегрессий относительно {args.baseline} нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
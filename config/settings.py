@@ -3,7 +3,28 @@ class ModelConfig:
 
     MODEL_PATH = "yolo11n.pt"
     QUANTIZATION = True
+    BACKEND = None  # "pt", "onnx", "ort" или "openvino"; None - "onnx" при QUANTIZATION, иначе "pt"
     IMG_SIZE = 320
+    BATCH_SIZE = 1
+    INT8 = False  # только для формата "onnx" или "ort", с "pt" и "openvino" - ValueError
+    CALIBRATION_DIR = None
+    CALIBRATION_FRAMES = 200
+    CACHE_DIR = "model_cache"
+    CACHE_MAX_BYTES = 1024 ** 3
+    CACHE_LOCK_TIMEOUT = 1800
+
+
+class OrtConfig:
+    """Настройки ONNX Runtime движка без обёртки ultralytics (ModelConfig.BACKEND = "ort")"""
+
+    INTRA_OP_THREADS = None  # None - по числу ядер
+    INTER_OP_THREADS = 1
+    GRAPH_OPTIMIZATION = "all"  # "disable", "basic", "extended" или "all"
+    CONF = 0.25
+    IOU = 0.7
+    MAX_DET = 300
+    # кандидатов в NMS после порога (как max_nms в ultralytics)
+    MAX_NMS = 30000
 
 
 class DistanceConfig:
@@ -15,5 +36,144 @@ class DistanceConfig:
         "bus": 2.5,
         "truck": 2.2,
     }
+    DEFAULT_WIDTH = 0.5
+    MIN_PIXEL_WIDTH = 1
     FOCAL_LENGTH = 800
+    METHOD = "width"  # "width" - по известной ширине, "ground" - по нижней кромке box на плоскости дороги
+    CAMERA_HEIGHT = 2.5  # высота камеры над дорогой, м
+    CAMERA_PITCH_DEG = 5.0  # наклон оптической оси вниз от горизонта, градусы
+    PRINCIPAL_POINT = None  # (cx, cy) в пикселях, None - центр кадра
+    CALIBRATION_SIZE = None  # (ширина, высота) кадра, для которого заданы FOCAL_LENGTH и PRINCIPAL_POINT
+    MAX_GROUND_DISTANCE = 150.0  # дальше этого расстояния (у горизонта) используется оценка по ширине
+
+
+class PipelineConfig:
+    """Настройки пайплайна обработки видео"""
+
+    QUEUE_SIZE = 4
+    NUM_WORKERS = 2
+    THREADS_PER_WORKER = None
+    PROGRESS_EVERY = 100
+    SHOW_STATS = True
+    RESULTS_BUFFER_FRAMES = 256
+    # обработка одного видео по частям (см. src/pipeline/chunked.py)
+    CHUNKS_PER_WORKER = 1
+    MIN_CHUNK_FRAMES = 250
+    # кольцо кадров в общей памяти между процессами (см. src/pipeline/shared_frames.py)
+    RING_SLOTS = 8
+
+
+class TrackerConfig:
+    """Настройки режима детекции раз в N кадров с трекингом между детекциями"""
+
+    DETECT_EVERY = 1
+    HIGH_THRESH = 0.5
+    LOW_THRESH = 0.1
+    MATCH_IOU = 0.2
+    LOW_MATCH_IOU = 0.5
+    MAX_AGE = 30
+    CONFIDENCE_DECAY = 0.95
+    REDETECT_CONFIDENCE = 0.5
+    VELOCITY_SMOOTHING = 0.5
+
+
+class MetricsConfig:
+    """Настройки метрик пайплайна (см. src/utils/metrics.py)"""
+
+    PREFIX = "tram_cv"
+    EXPORT_EVERY = 100
+    LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 35, 50, 75, 100, 200, 500, 1000)
+    OBJECTS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+    PROMETHEUS_PATH = None
+    PROMETHEUS_PORT = None
+
+
+class ServerConfig:
+    """Настройки сервера инференса (см. src/pipeline/server.py)"""
+
+    HOST = "127.0.0.1"
+    PORT = 8765
+    UNIX_SOCKET = None
+    BATCH_SIZE = 4
+    MAX_BATCH_DELAY_MS = 5
+    MAX_JOBS = 4
+    MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+class TilingConfig:
+    """Настройки тайлового инференса для мелких дальних объектов"""
+
+    ENABLED = False
+    TILE_SIZE = 320
+    OVERLAP = 0.2
+    REGION = None  # (x1, y1, x2, y2) в долях кадра, None - весь кадр
+    INCLUDE_FULL_FRAME = True
+    NMS_THRESHOLD = 0.6
+    NMS_METRIC = "ios"
+    BATCH_SIZE = 16  # все тайлы кадра за один вызов модели: сетка 5x3 тайлов 320 на 1280x720 и весь кадр
+
+
+class MotionConfig:
+    """Настройки пропуска детекции на статичных кадрах (см. src/models/motion_gate.py)"""
+
+    ENABLED = False
+    SIZE = (64, 36)  # (ширина, высота) уменьшенного кадра для сравнения
+    PIXEL_THRESHOLD = 12  # изменение яркости пикселя, считающееся движением
+    CHANGED_FRACTION = 0.005  # доля изменившихся пикселей, при которой детектор запускается
+    REFRESH_EVERY = 25
+
+
+class AdaptiveConfig:
+    """Настройки подстройки размера входа модели под бюджет задержки (см. src/models/resolution.py)"""
+
+    ENABLED = False
+    LADDER = (416, 320, 256)  # размеры входа от большего к меньшему; модель готовится для каждого
+    LATENCY_BUDGET_MS = 50.0  # бюджет задержки детектора на кадр
+    PERCENTILE = 95
+    WINDOW = 30  # кадров в скользящем окне; решение принимается только по полному окну
+    HEADROOM = 0.7  # шаг вверх, только если ожидаемая задержка на большем размере ниже HEADROOM * бюджет
+
+
+class DetectionCacheConfig:
+    """Настройки кэша детекций для повторной отрисовки без инференса (см. src/pipeline/detection_cache.py)"""
+
+    ENABLED = False
+    CACHE_DIR = "detection_cache"
+    FINGERPRINT_BYTES = 4 * 1024 ** 2  # сколько байт с начала и с конца видео хэшируется для ключа
+
+
+class VideoWriterConfig:
+    """Настройки записи итогового видео (см. src/pipeline/video_io.py)"""
+
+    # "auto" - ffmpeg, если он установлен (кодек CODEC вместо FOURCC OpenCV), иначе OpenCV; "ffmpeg";
+    # "opencv" - прежнее поведение (mp4v через cv2.VideoWriter)
+    BACKEND = "auto"
+    FFMPEG_BINARY = "ffmpeg"
+    CODEC = "libx264"
+    PRESET = "ultrafast"
+    CRF = 23
+    THREADS = 0  # 0 - ffmpeg выбирает сам
+    OUTPUT_SIZE = None  # (ширина, высота) итогового видео, None - размер исходного
+    FOURCC = "mp4v"  # кодек OpenCV writer
+
+
+class LiveConfig:
+    """Настройки обработки живого источника (камера, поток) - см. src/pipeline/live.py"""
+
+    REPLAY_FPS = None  # частота проигрывания файла вместо камеры, None - fps файла
+    READ_TIMEOUT = 5.0  # секунд без новых кадров, после которых источник считается завершённым
+
+
+class AutotuneConfig:
+    """Настройки подбора конфигурации под машину (см. src/utils/autotune.py)"""
 
+    PROFILE_PATH = "host_profile.json"
+    AUTO_LOAD = False  # применять профиль хоста в main.py без флага --host_profile
+    LATENCY_TARGET_MS = 50.0  # p95 задержки вызова детектора
+    BACKENDS = ("pt", "onnx", "ort", "openvino")  # недоступные на машине пропускаются
+    IMG_SIZES = (256, 320, 416)
+    BATCH_SIZES = (1, 4)
+    THREADS = None  # потоки torch и OpenCV; None - 1, половина и все ядра
+    INTEROP_THREADS = (1, 2)
+    SAMPLE_FRAMES = 48
+    WARMUP_FRAMES = 4
@@ -1,15 +1,159 @@
 import argparse
+import time
+from config.settings import AdaptiveConfig, AutotuneConfig, DetectionCacheConfig, LiveConfig, MetricsConfig, MotionConfig, PipelineConfig, TilingConfig, VideoWriterConfig
+from src.models.yolo_detector import YOLODetector
+from src.pipeline.multi_stream import expand_sources, process_sources
 from src.pipeline.processor import VideoProcessor
+from src.utils.host_profile import apply_host_profile
+from src.utils.metrics import PipelineMetrics, serve_metrics
 
 def main():
     parser = argparse.ArgumentParser(description='Tram CV System - Object Detection and Distance Estimation')
-    parser.add_argument('--source', type=str, help='Video source (path to video file)')
+    parser.add_argument('--source', type=str, nargs='+', help='Video source(s): paths to video files or glob patterns')
     parser.add_argument('--output_path', type=str)
     parser.add_argument('--verbose', type=bool, default=True)
+    parser.add_argument('--pipelined', action='store_true', help='Run decode, inference, render and encode in separate threads')
+    parser.add_argument('--detect_every', type=int, help='Run the detector every N frames and track objects in between')
+    parser.add_argument('--no_stats', action='store_true', help='Do not draw the performance stats overlay')
+    parser.add_argument('--headless', action='store_true', help='Skip drawing and encoding, write detections only')
+    parser.add_argument('--results_path', type=str, default='results.jsonl', help='Headless output: .jsonl for JSONL, any other extension for the NumPy columnar format')
+    parser.add_argument('--results_format', choices=['jsonl', 'bin'], default='jsonl', help='Headless output format when several sources are given')
+    parser.add_argument('--output_dir', type=str, default='outputs', help='Output directory when several sources are given')
+    parser.add_argument('--workers', type=int, default=PipelineConfig.NUM_WORKERS, help='Worker processes for several sources')
+    parser.add_argument('--threads_per_worker', type=int, help='Threads per worker process (default: cores / workers)')
+    parser.add_argument('--metrics_path', type=str, default=MetricsConfig.PROMETHEUS_PATH, help='Write pipeline metrics in Prometheus text format to this file')
+    parser.add_argument('--metrics_port', type=int, default=MetricsConfig.PROMETHEUS_PORT, help='Serve pipeline metrics at http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--serve', action='store_true', help='Keep the model loaded and serve detection and video jobs over HTTP')
+    parser.add_argument('--port', type=int, help='Server TCP port (default: ServerConfig.PORT)')
+    parser.add_argument('--unix_socket', type=str, help='Server Unix socket path (TCP is not opened unless --port is given)')
+    parser.add_argument('--tiled', action='store_true', default=TilingConfig.ENABLED, help='Detect on overlapping tiles of the frame (or TilingConfig.REGION) to find small distant objects')
+    parser.add_argument('--motion_gate', action='store_true', default=MotionConfig.ENABLED, help='Skip the detector on frames where the scene has not changed and reuse the previous detections')
+    parser.add_argument('--adaptive', action='store_true', default=AdaptiveConfig.ENABLED, help='Step the model input size down the AdaptiveConfig.LADDER when the p95 detector latency exceeds the budget and back up when there is headroom')
+    parser.add_argument('--detection_cache', action='store_true', default=DetectionCacheConfig.ENABLED, help='Save raw detections to DetectionCacheConfig.CACHE_DIR and, when the same video is processed again with the same model, re-render from them without inference')
+    parser.add_argument('--writer', choices=['auto', 'ffmpeg', 'opencv'], default=VideoWriterConfig.BACKEND, help='Output video encoder: ffmpeg pipe (codec, preset and CRF in VideoWriterConfig, libx264 by default) or OpenCV (mp4v); auto picks ffmpeg when it is installed')
+    parser.add_argument('--chunked', action='store_true', help='Split one long video into frame ranges, process them in --workers processes and stitch the outputs in order')
+    parser.add_argument('--live', action='store_true', help='Live source (camera index, stream URL): always process the newest frame, drop the backlog')
+    parser.add_argument('--replay', action='store_true', help='With --live: replay a video file in real time instead of a camera')
+    parser.add_argument('--replay_fps', type=float, default=LiveConfig.REPLAY_FPS, help='Replay rate for --replay (default: file FPS)')
+    parser.add_argument('--autotune', action='store_true', help='Measure model formats, input sizes, batch sizes and thread counts on --source and save the fastest setup as the host profile')
+    parser.add_argument('--latency_target', type=float, default=AutotuneConfig.LATENCY_TARGET_MS, help='With --autotune: p95 detector latency target in ms')
+    parser.add_argument('--host_profile', action='store_true', default=AutotuneConfig.AUTO_LOAD, help='Apply the host profile saved by --autotune (AutotuneConfig.PROFILE_PATH) as the default model format, input size, batch size and thread counts')
+    parser.add_argument('--prebuild', action='store_true', help='Build the model for the current ModelConfig into the model cache, warm it up and exit')
     args = parser.parse_args()
-    
-    processor = VideoProcessor()
-    processor.process_video(args.source, args.output_path, args.verbose)
+    if args.source is None and not (args.serve or args.prebuild):
+        parser.error('--source is required (except with --serve and --prebuild)')
+    if args.live and args.detection_cache:
+        parser.error('--detection_cache cannot be used with --live')
+    if args.live and args.chunked:
+        parser.error('--chunked cannot be used with --live')
+
+    if args.host_profile and not args.autotune:
+        profile = apply_host_profile()
+        if profile is not None:
+            print(f"Применён профиль хоста {AutotuneConfig.PROFILE_PATH}: {profile}")
+
+    if args.serve:
+        from src.pipeline.server import InferenceServer
+
+        InferenceServer().run(port=args.port, unix_socket=args.unix_socket)
+        return
+
+    if args.autotune:
+        from src.utils.autotune import autotune
+
+        profile = autotune(expand_sources(args.source)[0], args.latency_target)
+        if profile is None:
+            print("Ни одна конфигурация не запустилась, профиль не сохранён")
+        else:
+            print(f"Профиль хоста сохранён в {AutotuneConfig.PROFILE_PATH}: {profile}")
+        return
+
+    if args.prebuild:
+        start_time = time.perf_counter()
+        detector = YOLODetector()
+        detector.warmup()
+        print(f"Модель готова за {time.perf_counter() - start_time:.1f} с: {detector.model_path}")
+        return
+
+    sources = args.source if args.live else expand_sources(args.source)
+    if len(sources) > 1:
+        process_sources(
+            sources,
+            args.output_dir,
+            args.workers,
+            args.threads_per_worker,
+            args.pipelined,
+            args.detect_every,
+            results_format=args.results_format if args.headless else None,
+            show_stats=not args.no_stats,
+            tiled=args.tiled,
+            motion_gate=args.motion_gate,
+            adaptive=args.adaptive,
+            detection_cache=args.detection_cache,
+            writer_backend=args.writer,
+        )
+        return
+
+    if args.chunked:
+        from src.pipeline.chunked import process_chunked
+
+        result = process_chunked(
+            sources[0],
+            (args.results_path if args.headless else args.output_path) or 'output.avi',
+            args.workers,
+            args.threads_per_worker,
+            args.pipelined,
+            args.detect_every,
+            headless=args.headless,
+            show_stats=not args.no_stats,
+            tiled=args.tiled,
+            motion_gate=args.motion_gate,
+            adaptive=args.adaptive,
+            detection_cache=args.detection_cache,
+            writer_backend=args.writer,
+        )
+        if result["error"] is not None:
+            raise SystemExit(1)
+        return
+
+    metrics = PipelineMetrics(textfile_path=args.metrics_path)
+    if args.metrics_port is not None:
+        serve_metrics(metrics, args.metrics_port)
+
+    processor = VideoProcessor(
+        show_stats=not args.no_stats,
+        metrics=metrics,
+        tiled=args.tiled,
+        motion_gate=args.motion_gate,
+        adaptive=args.adaptive,
+        detection_cache=args.detection_cache,
+        writer_backend=args.writer,
+    )
+    if args.live:
+        stats = processor.process_live(
+            sources[0],
+            args.output_path,
+            args.results_path if args.headless else None,
+            args.verbose,
+            replay=args.replay,
+            replay_fps=args.replay_fps,
+        )
+        latency = stats["latency"]
+        print(
+            f"Обработано {stats['frames']} из {stats['captured']} кадров (пропущено {stats['dropped']}), "
+            f"задержка захват-результат p50 {latency['p50_ms']:.0f} мс, p99 {latency['p99_ms']:.0f} мс"
+        )
+    elif args.headless:
+        processor.process_results(sources[0], args.results_path, args.verbose, args.pipelined, detect_every=args.detect_every)
+    else:
+        processor.process_video(sources[0], args.output_path, args.verbose, args.pipelined, detect_every=args.detect_every)
+
+    if args.motion_gate:
+        snapshot = metrics.snapshot()
+        print(f"Детекции переиспользованы на {snapshot['reused'] / max(snapshot['frames'], 1):.0%} кадров")
+    if args.adaptive:
+        snapshot = metrics.snapshot()
+        print(f"Размер входа модели: {snapshot['input_size']}, смен размера: {snapshot['input_size_changes']}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
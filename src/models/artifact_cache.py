@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from config.settings import ModelConfig
+
+ARTIFACT_NAMES = {"onnx": "model.onnx", "openvino": "model_openvino_model"}
+MANIFEST_NAME = "manifest.json"
+LOCK_POLL_INTERVAL = 0.5
+
+_weights_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+@dataclass(frozen=True)
+class ArtifactSpec:
+    """
+    Описание собранной модели: всё, от чего зависит содержимое файла.
+
+    calibration - отпечаток калибровочных данных для INT8 (пустая строка
+    для FP32).
+    """
+
+    weights_hash: str
+    img_size: int
+    format: str
+    precision: str
+    batch: str
+    runtime: str
+    calibration: str = ""
+
+    @property
+    def key(self) -> str:
+        digest = hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()
+        return (
+            f"{self.format}_{self.img_size}_{self.batch}_{self.precision}_{digest[:16]}"
+        )
+
+
+def file_hash(path: str) -> str:
+    """
+    SHA-256 файла (кэшируется в процессе по пути, размеру и времени изменения)
+
+    Для каталога (модель OpenVINO) - SHA-256 относительных путей и
+    хэшей всех его файлов.
+
+    Args:
+        path: путь до файла или каталога
+
+    Returns:
+        str: hex-дайджест
+    """
+    if os.path.isdir(path):
+        sha = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                sha.update(os.path.relpath(file_path, path).encode())
+                sha.update(file_hash(file_path).encode())
+        return sha.hexdigest()
+
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if cache_key not in _weights_hashes:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        _weights_hashes[cache_key] = sha.hexdigest()
+    return _weights_hashes[cache_key]
+
+
+def calibration_fingerprint(calibration_dir: str, num_frames: int) -> str:
+    """
+    Отпечаток калибровочных данных: имена, размеры и время изменения видео
+
+    Args:
+        calibration_dir: директория с видео для калибровки
+        num_frames: количество кадров для калибровки
+
+    Returns:
+        str: hex-дайджест
+    """
+    from src.models.quantization import list_videos
+
+    sha = hashlib.sha256(str(num_frames).encode())
+    for video in list_videos(calibration_dir):
+        stat = os.stat(video)
+        sha.update(f"{os.path.relpath(video, calibration_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return sha.hexdigest()
+
+
+def runtime_version() -> str:
+    """Версии пакетов, от которых зависит собранная модель."""
+    versions = []
+    for names in (("ultralytics",), ("torch",), ("onnx",), ("onnxruntime", "onnxruntime-gpu"), ("openvino",)):
+        for name in names:
+            try:
+                versions.append(f"{name}-{metadata.version(name)}")
+                break
+            except metadata.PackageNotFoundError:
+                continue
+    return "_".join(versions)
+
+
+class ArtifactCache:
+    """
+    Кэш собранных моделей (ONNX и OpenVINO экспорт, INT8 квантизация).
+
+    Каждая модель лежит в своей директории cache_dir/<spec.key>/ вместе
+    с файлом внешних данных (если он есть) и manifest.json. Сборка идёт во
+    временную директорию, которая затем атомарно переименовывается, поэтому
+    загружающий процесс никогда не видит недособранную модель. Параллельные
+    процессы, которым нужна одна и та же модель, собирают её один раз:
+    остальные ждут на lock-файле. После добавления модели старые по
+    времени последнего использования модели удаляются, пока размер кэша
+    больше max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or ModelConfig.CACHE_DIR)
+        self.max_bytes = ModelConfig.CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def path(self, spec: ArtifactSpec) -> str:
+        """
+        Путь до модели в кэше (файл может ещё не существовать)
+
+        Args:
+            spec: описание модели
+
+        Returns:
+            str: путь до модели (ONNX файл или директория OpenVINO)
+        """
+        return str(self.cache_dir / spec.key / ARTIFACT_NAMES[spec.format])
+
+    def get(self, spec: ArtifactSpec) -> Optional[str]:
+        """
+        Путь до готовой модели с отметкой об использовании
+
+        Args:
+            spec: описание модели
+
+        Returns:
+            Optional[str]: путь до модели или None, если модели нет в кэше
+        """
+        path = self.path(spec)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(os.path.dirname(path))
+        except OSError:
+            pass  # модель удаляется другим процессом - файл уже открыт загрузчиком
+        return path
+
+    def get_or_build(
+        self,
+        spec: ArtifactSpec,
+        build: Callable[[str], None],
+        lock_timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Путь до модели, при отсутствии в кэше модель собирается
+
+        Args:
+            spec: описание модели
+            build: функция, записывающая модель по переданному пути
+                (рядом можно положить файлы внешних данных)
+            lock_timeout: через сколько секунд чужой lock-файл считается
+                брошенным (по умолчанию ModelConfig.CACHE_LOCK_TIMEOUT)
+
+        Returns:
+            str: путь до модели
+        """
+        lock_timeout = ModelConfig.CACHE_LOCK_TIMEOUT if lock_timeout is None else lock_timeout
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.cache_dir / f"{spec.key}.lock"
+
+        while True:
+            path = self.get(spec)
+            if path is not None:
+                return path
+            if _try_lock(lock_path):
+                break
+            if _lock_age(lock_path) > lock_timeout:
+                _unlink(lock_path)
+                continue
+            time.sleep(LOCK_POLL_INTERVAL)
+
+        try:
+            path = self.get(spec)
+            if path is None:
+                path = self._build(spec, build)
+        finally:
+            _unlink(lock_path)
+
+        self.evict(keep=spec.key)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """
+        Удаление давно не использованных моделей, пока кэш больше max_bytes
+
+        Args:
+            keep: ключ модели, которую удалять нельзя
+        """
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and not entry.name.startswith(".") and (entry / MANIFEST_NAME).exists():
+                size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+                entries.append((entry.stat().st_mtime, entry, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, entry, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def _build(self, spec: ArtifactSpec, build: Callable[[str], None]) -> str:
+        target = self.cache_dir / spec.key
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{spec.key}.", dir=self.cache_dir))
+        try:
+            start_time = time.perf_counter()
+            build(str(tmp_dir / ARTIFACT_NAMES[spec.format]))
+            manifest = {
+                **asdict(spec),
+                "build_seconds": round(time.perf_counter() - start_time, 2),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            with open(tmp_dir / MANIFEST_NAME, "w") as f:
+                json.dump(manifest, f, indent=2)
+            try:
+                os.replace(tmp_dir, target)
+            except OSError:
+                if not (target / MANIFEST_NAME).exists():
+                    raise  # иначе модель уже собрал процесс, посчитавший наш lock брошенным
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return self.path(spec)
+
+
+def _try_lock(lock_path: Path) -> bool:
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as f:
+        f.write(str(os.getpid()))
+    return True
+
+
+def _lock_age(lock_path: Path) -> float:
+    try:
+        return time.time() - lock_path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
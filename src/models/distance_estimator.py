@@ -1,26 +1,198 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
 from config.settings import DistanceConfig
 
 
 class DistanceEstimator:
 
-    def __init__(self):
+    def __init__(self, id2name: Optional[Dict[int, str]] = None):
         self.known_widths = DistanceConfig.KNOWN_WIDTHS
         self.focal_length = DistanceConfig.FOCAL_LENGTH
+        self.width_table = (
+            self.build_width_table(id2name) if id2name is not None else None
+        )
+
+    def build_width_table(self, id2name: Dict[int, str]) -> np.ndarray:
+        """
+        Построение таблицы известных ширин, индексируемой id класса
+
+        Args:
+            id2name: словарь id класса -> имя класса (model.names)
+
+        Returns:
+            np.ndarray: ширина объекта в метрах для каждого id класса
+        """
+        table = np.full(
+            max(id2name) + 1, DistanceConfig.DEFAULT_WIDTH, dtype=np.float32
+        )
+        for cls_id, class_name in id2name.items():
+            table[cls_id] = self.known_widths.get(
+                class_name, DistanceConfig.DEFAULT_WIDTH
+            )
+        return table
+
+    def calibration_scale(self, image_size: Optional[Tuple[int, int]]) -> float:
+        """
+        Масштаб FOCAL_LENGTH и PRINCIPAL_POINT для разрешения кадра
+
+        Args:
+            image_size: (ширина, высота) кадра
+
+        Returns:
+            float: отношение высоты кадра к высоте DistanceConfig.CALIBRATION_SIZE
+                (1.0, если размер калибровки или кадра не задан)
+        """
+        if not DistanceConfig.CALIBRATION_SIZE or image_size is None:
+            return 1.0
+        return image_size[1] / DistanceConfig.CALIBRATION_SIZE[1]
 
     def estimate(self, class_name: str, x1: int, x2: int) -> float:
         """
         Оценка расстояния до объекта
 
         Args:
-            detection: словарь с информацией об обнаружении
+            class_name: имя класса объекта
+            x1: левая граница bounding box
+            x2: правая граница bounding box
 
         Returns:
             float: расстояние в метрах
         """
-        pixel_width = x2 - x1
+        pixel_width = max(x2 - x1, DistanceConfig.MIN_PIXEL_WIDTH)
 
-        known_width = self.known_widths.get(class_name, 0.5)
+        known_width = self.known_widths.get(class_name, DistanceConfig.DEFAULT_WIDTH)
 
         distance = (known_width * self.focal_length) / pixel_width
 
         return distance
+
+    def estimate_batch(
+        self,
+        cls_ids: np.ndarray,
+        xyxy: np.ndarray,
+        image_size: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """
+        Векторная оценка расстояния сразу для всех объектов кадра
+
+        Args:
+            cls_ids: массив id классов формы (N,)
+            xyxy: массив bounding boxes формы (N, 4)
+            image_size: (ширина, высота) кадра (без него FOCAL_LENGTH не
+                пересчитывается под разрешение, см. calibration_scale)
+
+        Returns:
+            np.ndarray: расстояния в метрах формы (N,)
+        """
+        if self.width_table is None:
+            raise RuntimeError(
+                "Таблица ширин не построена: передайте id2name в DistanceEstimator"
+            )
+
+        cls_ids = np.asarray(cls_ids).astype(np.intp, copy=False)
+        xyxy = np.asarray(xyxy, dtype=np.float32)
+
+        pixel_width = np.maximum(
+            xyxy[:, 2] - xyxy[:, 0], DistanceConfig.MIN_PIXEL_WIDTH
+        )
+        known_width = self.width_table[cls_ids]
+
+        return known_width * self.focal_length * self.calibration_scale(image_size) / pixel_width
+
+
+class GroundPlaneDistanceEstimator(DistanceEstimator):
+    """
+    Оценка расстояния по строке нижней кромки box: точка касания объекта
+    с дорогой проецируется на плоскость дороги по высоте и наклону камеры.
+
+    Не зависит от класса и ширины объекта, поэтому работает для классов
+    без KNOWN_WIDTHS и для частично перекрытых объектов. Расстояние для
+    каждой строки изображения считается один раз на разрешение кадра,
+    оценка для box - одна индексация таблицы. Для строк у горизонта и
+    выше него используется оценка по ширине.
+    """
+
+    def __init__(self, id2name: Optional[Dict[int, str]] = None):
+        super().__init__(id2name)
+        self.camera_height = DistanceConfig.CAMERA_HEIGHT
+        self.pitch = np.deg2rad(DistanceConfig.CAMERA_PITCH_DEG)
+        self._row_tables: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def build_row_table(self, image_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Построение таблицы расстояний по строкам изображения
+
+        Args:
+            image_size: (ширина, высота) кадра
+
+        Returns:
+            np.ndarray: расстояние в метрах для каждой строки формы (H,),
+                NaN для строк, где оценка по плоскости дороги ненадёжна
+        """
+        w, h = image_size
+        scale = self.calibration_scale(image_size)
+        focal_length = self.focal_length * scale
+        cy = DistanceConfig.PRINCIPAL_POINT[1] * scale if DistanceConfig.PRINCIPAL_POINT else h / 2
+
+        rows = np.arange(h, dtype=np.float64) + 0.5
+        depression = self.pitch + np.arctan((rows - cy) / focal_length)
+        with np.errstate(divide="ignore"):
+            distances = self.camera_height / np.tan(depression)
+
+        valid = (depression > 0) & (distances <= DistanceConfig.MAX_GROUND_DISTANCE)
+        return np.where(valid, distances, np.nan).astype(np.float32)
+
+    def row_table(self, image_size: Tuple[int, int]) -> np.ndarray:
+        """Таблица расстояний по строкам для разрешения кадра (строится один раз)."""
+        table = self._row_tables.get(image_size)
+        if table is None:
+            table = self._row_tables[image_size] = self.build_row_table(image_size)
+        return table
+
+    def estimate_batch(
+        self,
+        cls_ids: np.ndarray,
+        xyxy: np.ndarray,
+        image_size: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """
+        Векторная оценка расстояния по нижней кромке boxes
+
+        Args:
+            cls_ids: массив id классов формы (N,)
+            xyxy: массив bounding boxes формы (N, 4)
+            image_size: (ширина, высота) кадра
+
+        Returns:
+            np.ndarray: расстояния в метрах формы (N,)
+        """
+        if image_size is None:
+            raise ValueError("Для оценки по плоскости дороги нужен размер кадра (image_size)")
+        by_width = super().estimate_batch(cls_ids, xyxy, image_size)
+
+        table = self.row_table(tuple(image_size))
+        rows = np.asarray(xyxy, dtype=np.float32)[:, 3].astype(np.intp)
+        by_ground = table[np.clip(rows, 0, len(table) - 1)]
+        return np.where(np.isnan(by_ground), by_width, by_ground)
+
+
+def create_distance_estimator(
+    id2name: Optional[Dict[int, str]] = None,
+    method: Optional[str] = None,
+) -> DistanceEstimator:
+    """
+    Оценщик расстояния, выбранный в DistanceConfig.METHOD
+
+    Args:
+        id2name: словарь id класса -> имя класса (model.names)
+        method: "width" или "ground" (по умолчанию DistanceConfig.METHOD)
+
+    Returns:
+        DistanceEstimator: оценщик с методом estimate_batch(cls_ids, xyxy, image_size)
+    """
+    method = method or DistanceConfig.METHOD
+    if method == "width":
+        return DistanceEstimator(id2name)
+    if method == "ground":
+        return GroundPlaneDistanceEstimator(id2name)
+    raise ValueError(f"Неизвестный метод оценки расстояния: {method}")
@@ -0,0 +1,81 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import MotionConfig
+
+
+class MotionGate:
+    """
+    Дешёвый детектор изменений сцены перед моделью.
+
+    Кадр уменьшается до MotionConfig.SIZE в оттенках серого и сравнивается
+    с кадром, на котором последний раз запускался детектор (а не с
+    предыдущим кадром, поэтому медленное движение накапливается и не
+    теряется). Если изменилось меньше CHANGED_FRACTION пикселей, детекции
+    предыдущего кадра переиспользуются. Раз в refresh_every кадров детектор
+    запускается принудительно.
+    """
+
+    def __init__(
+        self,
+        size: Optional[Tuple[int, int]] = None,
+        pixel_threshold: Optional[int] = None,
+        changed_fraction: Optional[float] = None,
+        refresh_every: Optional[int] = None,
+    ):
+        self.size = size or MotionConfig.SIZE
+        self.pixel_threshold = MotionConfig.PIXEL_THRESHOLD if pixel_threshold is None else pixel_threshold
+        self.changed_fraction = MotionConfig.CHANGED_FRACTION if changed_fraction is None else changed_fraction
+        self.refresh_every = refresh_every or MotionConfig.REFRESH_EVERY
+
+        self.frames = 0
+        self.skipped = 0
+        self._reference: Optional[np.ndarray] = None
+        self._since_refresh = 0
+
+    def update(self, frame: np.ndarray) -> bool:
+        """
+        Решение, нужно ли запускать детектор на кадре
+
+        Args:
+            frame: кадр BGR
+
+        Returns:
+            bool: True - сцена изменилась (или пора обновить детекции),
+                False - можно переиспользовать детекции предыдущего кадра
+        """
+        small = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        self.frames += 1
+        self._since_refresh += 1
+
+        if (
+            self._reference is None
+            or self._since_refresh >= self.refresh_every
+            or self.change(small) > self.changed_fraction
+        ):
+            self._reference = small
+            self._since_refresh = 0
+            return True
+
+        self.skipped += 1
+        return False
+
+    def change(self, small: np.ndarray) -> float:
+        """
+        Доля пикселей уменьшенного кадра, изменившихся относительно опорного
+
+        Args:
+            small: уменьшенный кадр в оттенках серого
+
+        Returns:
+            float: доля от 0 до 1
+        """
+        diff = cv2.absdiff(small, self._reference)
+        return cv2.countNonZero(cv2.compare(diff, self.pixel_threshold, cv2.CMP_GT)) / diff.size
+
+    @property
+    def skip_ratio(self) -> float:
+        """Доля кадров, на которых детектор не запускался."""
+        return self.skipped / self.frames if self.frames else 0.0
@@ -0,0 +1,213 @@
+import ast
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import OrtConfig
+from src.models.preprocessing import PAD_VALUE
+from src.pipeline.records import FrameDetections
+from src.utils.boxes import nms
+
+_STRIDES = (8, 16, 32)
+
+
+class OrtEngine:
+    """
+    Инференс ONNX модели YOLO напрямую через onnxruntime.InferenceSession,
+    без обёртки ultralytics: кадр через letterbox пишется сразу в заранее
+    выделенный входной буфер, вход и выход привязываются к сессии через
+    IO binding, а декодирование и NMS делаются на NumPy. Результат -
+    FrameDetections, без torch-тензоров и Results.
+
+    Boxes совпадают с путём через YOLO: те же letterbox (у модели с
+    динамическими размерностями - прямоугольный, с паддингом только до
+    кратности шагу сетки), порог уверенности, NMS по классам и max_det.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        img_size: int,
+        batch_size: int = 1,
+        threads: Optional[int] = None,
+        interop_threads: Optional[int] = None,
+    ):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }[OrtConfig.GRAPH_OPTIMIZATION]
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        threads = OrtConfig.INTRA_OP_THREADS if threads is None else threads
+        if threads:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = interop_threads or OrtConfig.INTER_OP_THREADS
+
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+        # у модели с фиксированным батчем (экспорт с batch_size = 1) размерности заданы числами
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else batch_size
+        self.dynamic = not isinstance(model_input.shape[2], int)
+        self.img_size = img_size if self.dynamic else model_input.shape[2]
+        self.names = ast.literal_eval(self.session.get_modelmeta().custom_metadata_map["names"])
+
+        # буферы под самый большой вход (квадрат img_size), вход меньшего размера - их начало
+        anchors = sum((self.img_size // stride) ** 2 for stride in _STRIDES)
+        self._input = np.empty(self.batch_size * 3 * self.img_size ** 2, dtype=np.float32)
+        self._output = np.empty(self.batch_size * (4 + len(self.names)) * anchors, dtype=np.float32)
+        self._canvas = np.empty((0, 0, 3), dtype=np.uint8)
+        self._geometry: Optional[Tuple[int, int, int, int]] = None
+        self._binding = self.session.io_binding()
+
+    def __call__(
+        self,
+        frames: List[np.ndarray],
+        conf: Optional[float] = None,
+        iou: Optional[float] = None,
+        max_det: Optional[int] = None,
+        **kwargs,
+    ) -> List[FrameDetections]:
+        """
+        Детекция на кадрах
+
+        Args:
+            frames: кадры BGR (любое количество, в модель идут по batch_size)
+            conf: порог уверенности (по умолчанию OrtConfig.CONF)
+            iou: порог NMS (по умолчанию OrtConfig.IOU)
+            max_det: максимум детекций на кадр (по умолчанию OrtConfig.MAX_DET)
+            **kwargs: аргументы предикта ultralytics, не влияющие на движок (verbose)
+
+        Returns:
+            List[FrameDetections]: детекции в порядке кадров; speed - время
+                стадий на кадр в мс
+        """
+        conf = OrtConfig.CONF if conf is None else conf
+        iou = OrtConfig.IOU if iou is None else iou
+        max_det = max_det or OrtConfig.MAX_DET
+
+        detections = []
+        for start in range(0, len(frames), self.batch_size):
+            batch = frames[start:start + self.batch_size]
+            n = len(batch)
+
+            start_time = time.perf_counter()
+            input_h, input_w = self._input_shape(batch)
+            inputs = self._input[:n * 3 * input_h * input_w].reshape(n, 3, input_h, input_w)
+            transforms = [self._preprocess(frame, inputs[i]) for i, frame in enumerate(batch)]
+            preprocess_time = time.perf_counter()
+
+            anchors = sum((input_h // stride) * (input_w // stride) for stride in _STRIDES)
+            channels = 4 + len(self.names)
+            output = self._output[:n * channels * anchors].reshape(n, channels, anchors)
+            self._binding.bind_cpu_input(self.input_name, inputs)
+            self._binding.bind_output(
+                self.output_name, "cpu", 0, np.float32, output.shape, output.ctypes.data
+            )
+            self.session.run_with_iobinding(self._binding)
+            inference_time = time.perf_counter()
+
+            decoded = [
+                self._decode(output[i], transform, conf, iou, max_det)
+                for i, transform in enumerate(transforms)
+            ]
+            end_time = time.perf_counter()
+
+            speed = {
+                "preprocess": (preprocess_time - start_time) * 1000 / n,
+                "inference": (inference_time - preprocess_time) * 1000 / n,
+                "postprocess": (end_time - inference_time) * 1000 / n,
+            }
+            cur_time = sum(speed.values())
+            for frame, (xyxy, confs, cls_ids) in zip(batch, decoded):
+                detections.append(FrameDetections(frame, xyxy, confs, cls_ids, cur_time=cur_time, speed=speed))
+        return detections
+
+    def _input_shape(self, frames: List[np.ndarray]) -> Tuple[int, int]:
+        """
+        Размер входа (высота, ширина) для батча: квадрат img_size или, для
+        модели с динамическими размерностями и кадров одного размера, кадр
+        после масштабирования с паддингом до кратности шагу сетки (как
+        LetterBox(auto=True) в ultralytics)
+        """
+        if not self.dynamic or len({frame.shape[:2] for frame in frames}) != 1:
+            return self.img_size, self.img_size
+        h, w = frames[0].shape[:2]
+        ratio = min(self.img_size / h, self.img_size / w)
+        new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+        stride = _STRIDES[-1]
+        return new_h + (self.img_size - new_h) % stride, new_w + (self.img_size - new_w) % stride
+
+    def _preprocess(self, frame: np.ndarray, out: np.ndarray) -> Tuple[float, int, int, int, int]:
+        """
+        Letterbox кадра (как в src/models/preprocessing.py) в переиспользуемый
+        холст и запись в out как RGB float32 в [0, 1] формы (3, H, W)
+
+        Returns:
+            Tuple[float, int, int, int, int]: масштаб, отступы (left, top) и
+                размер кадра (w, h) для перевода boxes обратно
+        """
+        h, w = frame.shape[:2]
+        input_h, input_w = out.shape[1:]
+        ratio = min(self.img_size / h, self.img_size / w)
+        new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+        left = int(round((input_w - new_w) / 2 - 0.1))
+        top = int(round((input_h - new_h) / 2 - 0.1))
+
+        if self._geometry != (w, h, input_w, input_h):
+            # поля паддинга одинаковы для кадров одного размера, холст создаётся только при смене размера
+            self._canvas = np.full((input_h, input_w, 3), PAD_VALUE, dtype=np.uint8)
+            self._geometry = (w, h, input_w, input_h)
+        region = self._canvas[top:top + new_h, left:left + new_w]
+        if (new_w, new_h) != (w, h):
+            cv2.resize(frame, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+        else:
+            region[:] = frame
+
+        np.multiply(
+            self._canvas[..., ::-1].transpose(2, 0, 1), np.float32(1 / 255), out=out, dtype=np.float32
+        )
+        return ratio, left, top, w, h
+
+    def _decode(
+        self,
+        output: np.ndarray,
+        transform: Tuple[float, int, int, int, int],
+        conf: float,
+        iou: float,
+        max_det: int,
+        max_nms: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Разбор выхода модели формы (4 + классы, anchors) одного кадра:
+        порог уверенности, не больше max_nms самых уверенных кандидатов
+        (по умолчанию OrtConfig.MAX_NMS), NMS по классам и перевод boxes
+        в координаты кадра
+        """
+        ratio, left, top, w, h = transform
+        scores = output[4:]
+        cls_ids = scores.argmax(axis=0)
+        confs = np.take_along_axis(scores, cls_ids[None], axis=0)[0]
+
+        candidates = np.flatnonzero(confs > conf)
+        if not len(candidates):
+            return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32)
+        max_nms = max_nms or OrtConfig.MAX_NMS
+        if len(candidates) > max_nms:
+            candidates = candidates[np.argsort(-confs[candidates], kind="stable")[:max_nms]]
+        cx, cy, bw, bh = output[:4, candidates]
+        xyxy = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        confs, cls_ids = confs[candidates], cls_ids[candidates]
+
+        keep = nms(xyxy, confs, cls_ids, iou, max_det=max_det)
+        xyxy = (xyxy[keep] - np.array([left, top, left, top], np.float32)) / ratio
+        np.clip(xyxy[:, 0::2], 0, w, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, h, out=xyxy[:, 1::2])
+        return xyxy.astype(np.float32), confs[keep], cls_ids[keep].astype(np.int32)
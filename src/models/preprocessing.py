@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+from typing import Tuple
+
+PAD_VALUE = 114
+
+
+def letterbox(frame: np.ndarray, img_size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Приведение кадра к квадрату img_size x img_size с сохранением пропорций
+
+    Повторяет LetterBox из ultralytics (центрированный паддинг значением 114),
+    чтобы вход совпадал с тем, что модель видит при инференсе через YOLO.
+
+    Args:
+        frame: кадр в формате BGR
+        img_size: размер стороны входа модели
+
+    Returns:
+        Tuple[np.ndarray, float, Tuple[int, int]]: кадр после letterbox,
+            коэффициент масштабирования и отступы (left, top)
+    """
+    h, w = frame.shape[:2]
+    ratio = min(img_size / h, img_size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    dw, dh = (img_size - new_w) / 2, (img_size - new_h) / 2
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+
+    frame = cv2.copyMakeBorder(
+        frame, top, bottom, left, right, cv2.BORDER_CONSTANT,
+        value=(PAD_VALUE, PAD_VALUE, PAD_VALUE),
+    )
+    return frame, ratio, (left, top)
+
+
+def to_input_tensor(frame: np.ndarray) -> np.ndarray:
+    """
+    Перевод кадра после letterbox во вход модели
+
+    Args:
+        frame: кадр BGR формы (H, W, 3) в uint8
+
+    Returns:
+        np.ndarray: тензор RGB формы (1, 3, H, W) в float32 в диапазоне [0, 1]
+    """
+    tensor = frame[..., ::-1].transpose(2, 0, 1)[None]
+    return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
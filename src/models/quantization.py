@@ -0,0 +1,150 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+import onnx
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    CalibrationMethod,
+    QuantFormat,
+    QuantType,
+    quant_pre_process,
+    quantize_static,
+)
+
+from config.settings import ModelConfig
+from src.models.preprocessing import letterbox, to_input_tensor
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+def list_videos(video_dir: str) -> List[Path]:
+    """
+    Список видео в директории (без рекурсии), отсортированный по имени
+
+    Args:
+        video_dir: директория с видео
+
+    Returns:
+        List[Path]: пути до видео
+    """
+    if not os.path.isdir(video_dir):
+        raise FileNotFoundError(f"Директория с видео не найдена: {video_dir}")
+
+    videos = sorted(
+        p for p in Path(video_dir).iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS
+    )
+    if not videos:
+        raise FileNotFoundError(f"В директории {video_dir} нет видео {VIDEO_EXTENSIONS}")
+    return videos
+
+
+def sample_frames(video_dir: str, num_frames: int) -> Iterator[np.ndarray]:
+    """
+    Равномерная выборка кадров из всех видео директории
+
+    Кадры берутся с постоянным шагом по каждому видео, чтобы в калибровку
+    попали разные сцены (остановки, движение, разное освещение),
+    а не только начало первой записи.
+
+    Args:
+        video_dir: директория с записанными видео
+        num_frames: общее количество кадров для выборки
+
+    Yields:
+        np.ndarray: кадр в формате BGR
+    """
+    videos = list_videos(video_dir)
+    per_video = max(num_frames // len(videos), 1)
+
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = max(total // per_video, 1)
+
+        taken, index = 0, 0
+        while taken < per_video:
+            ok = cap.grab()
+            if not ok:
+                break
+            if index % step == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    taken += 1
+                    yield frame
+            index += 1
+        cap.release()
+
+
+class VideoCalibrationDataReader(CalibrationDataReader):
+    """Поставщик калибровочных данных для ONNX Runtime из кадров записанных видео."""
+
+    def __init__(self, input_name: str, video_dir: str, num_frames: int, img_size: int):
+        self.input_name = input_name
+        self._frames = sample_frames(video_dir, num_frames)
+        self.img_size = img_size
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        frame = next(self._frames, None)
+        if frame is None:
+            return None
+        image, _, _ = letterbox(frame, self.img_size)
+        return {self.input_name: to_input_tensor(image)}
+
+
+def quantize_int8(
+    fp32_path: str,
+    int8_path: str,
+    calibration_dir: str,
+    num_frames: Optional[int] = None,
+    img_size: Optional[int] = None,
+) -> str:
+    """
+    Статическая пост-тренировочная INT8 квантизация ONNX модели (формат QDQ)
+
+    Квантизуются только свёртки: остальные операции (sigmoid, concat,
+    декодирование boxes) дешёвые, но чувствительны к точности, поэтому
+    остаются в FP32.
+
+    Args:
+        fp32_path: путь до исходной FP32 ONNX модели
+        int8_path: путь сохранения INT8 модели
+        calibration_dir: директория с записанными видео для калибровки
+        num_frames: количество кадров для калибровки
+            (по умолчанию ModelConfig.CALIBRATION_FRAMES)
+        img_size: размер стороны входа модели (по умолчанию ModelConfig.IMG_SIZE)
+
+    Returns:
+        str: путь до INT8 модели
+    """
+    input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+    reader = VideoCalibrationDataReader(
+        input_name,
+        calibration_dir,
+        num_frames or ModelConfig.CALIBRATION_FRAMES,
+        img_size or ModelConfig.IMG_SIZE,
+    )
+
+    target = Path(int8_path)
+    with tempfile.TemporaryDirectory(dir=target.parent) as tmp_dir:
+        prepared = os.path.join(tmp_dir, "prepared.onnx")
+        quant_pre_process(fp32_path, prepared, skip_optimization=False)
+
+        quantized = os.path.join(tmp_dir, target.name)
+        quantize_static(
+            prepared,
+            quantized,
+            reader,
+            quant_format=QuantFormat.QDQ,
+            op_types_to_quantize=["Conv"],
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax,
+        )
+        os.replace(quantized, target)
+
+    return str(target)
@@ -0,0 +1,74 @@
+from collections import deque
+from typing import Optional, Sequence
+
+import numpy as np
+
+from config.settings import AdaptiveConfig
+
+
+class ResolutionController:
+    """
+    Выбор размера входа модели по скользящему перцентилю задержки.
+
+    Задержки детектора на кадр копятся в окне из window кадров. По полному
+    окну: если перцентиль выше бюджета, размер входа уменьшается на шаг
+    лестницы; если задержка, пересчитанная на больший размер (пропорционально
+    числу пикселей), укладывается в headroom * бюджет, размер увеличивается.
+    После смены размера окно очищается, и следующее решение принимается
+    только по window кадрам на новом размере - вместе с запасом headroom
+    это не даёт размеру колебаться между соседними ступенями.
+    """
+
+    def __init__(
+        self,
+        ladder: Optional[Sequence[int]] = None,
+        budget_ms: Optional[float] = None,
+        percentile: Optional[float] = None,
+        window: Optional[int] = None,
+        headroom: Optional[float] = None,
+        start: Optional[int] = None,
+    ):
+        self.ladder = tuple(sorted(ladder or AdaptiveConfig.LADDER, reverse=True))
+        self.budget_ms = budget_ms or AdaptiveConfig.LATENCY_BUDGET_MS
+        self.percentile = percentile or AdaptiveConfig.PERCENTILE
+        self.headroom = headroom or AdaptiveConfig.HEADROOM
+
+        self.changes = 0
+        self._index = self.ladder.index(start) if start in self.ladder else 0
+        self._samples = deque(maxlen=window or AdaptiveConfig.WINDOW)
+
+    @property
+    def img_size(self) -> int:
+        """Текущий размер входа модели."""
+        return self.ladder[self._index]
+
+    def observe(self, latency_ms: float, count: int = 1) -> Optional[int]:
+        """
+        Учёт задержки детектора и решение о смене размера входа
+
+        Args:
+            latency_ms: задержка детектора на один кадр в миллисекундах
+            count: на скольких кадрах наблюдалась эта задержка (для батчей)
+
+        Returns:
+            Optional[int]: новый размер входа или None, если размер не меняется
+        """
+        self._samples.extend([latency_ms] * count)
+        if len(self._samples) < self._samples.maxlen:
+            return None
+
+        latency = float(np.percentile(self._samples, self.percentile))
+        if latency > self.budget_ms and self._index < len(self.ladder) - 1:
+            self._index += 1
+        elif self._index > 0 and latency * self._scale_up() < self.budget_ms * self.headroom:
+            self._index -= 1
+        else:
+            return None
+
+        self._samples.clear()
+        self.changes += 1
+        return self.img_size
+
+    def _scale_up(self) -> float:
+        """Во сколько раз вырастет задержка на следующем по величине размере."""
+        return (self.ladder[self._index - 1] / self.ladder[self._index]) ** 2
@@ -0,0 +1,192 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import ModelConfig, TilingConfig
+from src.pipeline.records import FrameDetections
+from src.utils.boxes import nmm, nms
+
+Tile = Tuple[int, int, int, int]
+
+
+def _tile_positions(start: int, end: int, tile: int, stride: int, limit: int) -> List[int]:
+    length = end - start
+    if length <= tile:
+        return [min(max(start + (length - tile) // 2, 0), max(limit - tile, 0))]
+    return list(range(start, end - tile, stride)) + [end - tile]
+
+
+def tiled_batch_size(batch_size: Optional[int] = None) -> int:
+    """
+    Размер батча детектора в тайловом режиме: все тайлы кадра должны
+    проходить через модель одним вызовом
+
+    Args:
+        batch_size: запрошенный размер батча (по умолчанию ModelConfig.BATCH_SIZE)
+
+    Returns:
+        int: размер батча не меньше TilingConfig.BATCH_SIZE
+    """
+    return max(batch_size or ModelConfig.BATCH_SIZE, TilingConfig.BATCH_SIZE)
+
+
+def make_tiles(
+    frame_size: Tuple[int, int],
+    tile_size: int,
+    overlap: float,
+    region: Optional[Sequence[float]] = None,
+) -> List[Tile]:
+    """
+    Сетка перекрывающихся тайлов, покрывающая кадр или его область
+
+    Тайлы квадратные со стороной tile_size и сдвигом tile_size * (1 - overlap);
+    крайние тайлы прижимаются к границе области. Если область меньше тайла,
+    тайл центрируется на ней (насколько позволяет кадр).
+
+    Args:
+        frame_size: (ширина, высота) кадра
+        tile_size: сторона тайла в пикселях кадра
+        overlap: доля перекрытия соседних тайлов
+        region: (x1, y1, x2, y2) в долях кадра, None - весь кадр
+
+    Returns:
+        List[Tile]: тайлы (x1, y1, x2, y2) в пикселях кадра
+    """
+    w, h = frame_size
+    rx1, ry1, rx2, ry2 = region or (0.0, 0.0, 1.0, 1.0)
+    region_px = (int(rx1 * w), int(ry1 * h), int(round(rx2 * w)), int(round(ry2 * h)))
+    stride = max(int(tile_size * (1 - overlap)), 1)
+
+    xs = _tile_positions(region_px[0], region_px[2], tile_size, stride, w)
+    ys = _tile_positions(region_px[1], region_px[3], tile_size, stride, h)
+    return [(x, y, min(x + tile_size, w), min(y + tile_size, h)) for y in ys for x in xs]
+
+
+class TiledInference:
+    """
+    Тайловый инференс: кадр (или его область, например коридор перед
+    трамваем) режется на перекрывающиеся тайлы, которые идут в модель
+    батчами без уменьшения, поэтому мелкие дальние объекты сохраняют
+    разрешение. Опционально добавляется весь кадр целиком для крупных
+    близких объектов. Boxes переводятся в координаты кадра и сливаются
+    межтайловым NMS (см. merge_detections).
+
+    В predict тайлы идут только целыми кадрами: вызов содержит тайлы
+    стольких кадров, сколько помещается в batch_size, но не меньше одного
+    кадра, поэтому тайлы кадра не делятся между вызовами модели.
+    """
+
+    def __init__(
+        self,
+        predict: Callable[..., List[FrameDetections]],
+        batch_size: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        overlap: Optional[float] = None,
+        region: Optional[Sequence[float]] = None,
+        include_full_frame: Optional[bool] = None,
+    ):
+        self.predict = predict
+        self.batch_size = tiled_batch_size(batch_size)
+        self.tile_size = tile_size or TilingConfig.TILE_SIZE
+        self.overlap = TilingConfig.OVERLAP if overlap is None else overlap
+        self.region = region or TilingConfig.REGION
+        self.include_full_frame = (
+            TilingConfig.INCLUDE_FULL_FRAME if include_full_frame is None else include_full_frame
+        )
+        self._tiles: Dict[Tuple[int, int], List[Tile]] = {}
+
+    def tiles_for(self, frame: np.ndarray) -> List[Tile]:
+        """Тайлы для кадра данного размера (сетка кэшируется по размеру)."""
+        h, w = frame.shape[:2]
+        if (w, h) not in self._tiles:
+            tiles = make_tiles((w, h), self.tile_size, self.overlap, self.region)
+            if self.include_full_frame and tiles != [(0, 0, w, h)]:
+                tiles.append((0, 0, w, h))
+            self._tiles[(w, h)] = tiles
+        return self._tiles[(w, h)]
+
+    def __call__(self, frames: List[np.ndarray], **kwargs: Any) -> List[FrameDetections]:
+        """
+        Детекция на кадрах через тайлы
+
+        Args:
+            frames: кадры BGR
+            **kwargs: аргументы predict
+
+        Returns:
+            List[FrameDetections]: по одному результату на кадр с boxes в координатах кадра
+        """
+        crops, owners, crop_results = [], [], []
+        for i, frame in enumerate(frames):
+            tiles = self.tiles_for(frame)
+            if crops and len(crops) + len(tiles) > self.batch_size:
+                crop_results.extend(self.predict(crops[len(crop_results):], **kwargs))
+            for x1, y1, x2, y2 in tiles:
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((i, x1, y1))
+        crop_results.extend(self.predict(crops[len(crop_results):], **kwargs))
+
+        per_frame = [[] for _ in frames]
+        speeds = [{"preprocess": 0.0, "inference": 0.0, "postprocess": 0.0} for _ in frames]
+        for (i, x1, y1), result in zip(owners, crop_results):
+            data = np.empty((len(result), 6), dtype=np.float32)
+            data[:, :4] = result.xyxy + np.array([x1, y1, x1, y1], dtype=np.float32)
+            data[:, 4] = result.confs
+            data[:, 5] = result.cls_ids
+            per_frame[i].append(data)
+            for stage in speeds[i]:
+                speeds[i][stage] += (result.speed or {}).get(stage) or 0.0
+
+        results = []
+        for frame, parts, speed in zip(frames, per_frame, speeds):
+            start_time = time.perf_counter()
+            merged = merge_detections(np.concatenate(parts) if parts else np.zeros((0, 6), np.float32))
+            speed["postprocess"] += (time.perf_counter() - start_time) * 1000
+
+            results.append(
+                FrameDetections(
+                    frame,
+                    np.ascontiguousarray(merged[:, :4]),
+                    np.ascontiguousarray(merged[:, 4]),
+                    merged[:, 5].astype(np.int32),
+                    cur_time=sum(speed.values()),
+                    speed=speed,
+                )
+            )
+        return results
+
+
+def merge_detections(
+    data: np.ndarray,
+    threshold: Optional[float] = None,
+    metric: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Слияние детекций со всех тайлов кадра межтайловым NMS
+
+    С метрикой "ios" дубли объединяются (nmm): box, обрезанный границей
+    тайла, почти целиком лежит внутри полного box того же объекта, и
+    обычный NMS оставил бы более уверенный из них, даже обрезанный, а
+    расстояние по ширине box было бы завышено. Уверенность и класс
+    берутся у самого уверенного box группы.
+
+    Args:
+        data: детекции формы (N, 6): x1, y1, x2, y2, conf, cls в координатах кадра
+        threshold: порог подавления (по умолчанию TilingConfig.NMS_THRESHOLD)
+        metric: "iou" или "ios" (по умолчанию TilingConfig.NMS_METRIC)
+
+    Returns:
+        np.ndarray: оставшиеся детекции формы (M, 6) по убыванию уверенности
+    """
+    if len(data) == 0:
+        return data.reshape(0, 6).astype(np.float32)
+    threshold = TilingConfig.NMS_THRESHOLD if threshold is None else threshold
+    metric = metric or TilingConfig.NMS_METRIC
+    if metric == "ios":
+        keep, merged = nmm(data[:, :4], data[:, 4], data[:, 5], threshold, metric)
+        result = np.array(data[keep], dtype=np.float32)
+        result[:, :4] = merged
+        return result
+    keep = nms(data[:, :4], data[:, 4], data[:, 5], threshold, metric)
+    return np.ascontiguousarray(data[keep], dtype=np.float32)
@@ -0,0 +1,184 @@
+import lap
+import numpy as np
+from typing import List, Tuple
+from config.settings import TrackerConfig
+from src.utils.boxes import box_iou
+
+
+class Track:
+    """
+    Трек одного объекта.
+
+    score - уверенность последней сопоставленной детекции, confidence -
+    уверенность трекера в перенесённом box: 1 сразу после детекции и
+    затухает на каждом кадре без неё.
+    """
+
+    __slots__ = (
+        "track_id", "xyxy", "velocity", "cls_id", "score", "confidence",
+        "last_xyxy", "frames_since_update", "lost",
+    )
+
+    def __init__(self, track_id: int, xyxy: np.ndarray, cls_id: int, score: float):
+        self.track_id = track_id
+        self.xyxy = xyxy.astype(np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.cls_id = cls_id
+        self.score = score
+        self.confidence = 1.0
+        self.last_xyxy = self.xyxy.copy()
+        self.frames_since_update = 0
+        self.lost = False
+
+    def predict(self) -> None:
+        self.xyxy += self.velocity
+        self.confidence *= TrackerConfig.CONFIDENCE_DECAY
+        self.frames_since_update += 1
+
+    def update(self, xyxy: np.ndarray, score: float) -> None:
+        gap = max(self.frames_since_update, 1)
+        velocity = (xyxy - self.last_xyxy) / gap
+        alpha = TrackerConfig.VELOCITY_SMOOTHING
+        self.velocity = alpha * velocity + (1 - alpha) * self.velocity
+
+        self.xyxy = xyxy.astype(np.float32)
+        self.last_xyxy = self.xyxy.copy()
+        self.score = score
+        self.confidence = 1.0
+        self.frames_since_update = 0
+        self.lost = False
+
+
+class ByteTracker:
+    """
+    Лёгкий multi-object трекер в стиле ByteTrack.
+
+    На кадрах с детекцией треки сопоставляются сначала с уверенными
+    детекциями, затем оставшиеся треки - с неуверенными (это удерживает
+    частично перекрытые объекты). Между детекциями boxes переносятся
+    вперёд с постоянной скоростью, а уверенность трекера в них затухает.
+    """
+
+    def __init__(self):
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    def predict(self) -> None:
+        """Перенос всех треков на следующий кадр."""
+        for track in self.tracks:
+            track.predict()
+        self.tracks = [
+            t for t in self.tracks if t.frames_since_update <= TrackerConfig.MAX_AGE
+        ]
+
+    def needs_detection(self) -> bool:
+        """
+        Нужна ли внеочередная детекция
+
+        Returns:
+            bool: True, если уверенность трекера в каком-то видимом треке
+                упала ниже TrackerConfig.REDETECT_CONFIDENCE
+        """
+        return any(
+            t.confidence < TrackerConfig.REDETECT_CONFIDENCE for t in self._active()
+        )
+
+    def update(self, xyxy: np.ndarray, confs: np.ndarray, cls_ids: np.ndarray) -> None:
+        """
+        Обновление треков детекциями текущего кадра
+
+        Args:
+            xyxy: boxes формы (N, 4)
+            confs: уверенности формы (N,)
+            cls_ids: id классов формы (N,)
+        """
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        confs = np.asarray(confs, dtype=np.float32).reshape(-1)
+        cls_ids = np.asarray(cls_ids).astype(np.int32).reshape(-1)
+
+        high = np.nonzero(confs >= TrackerConfig.HIGH_THRESH)[0]
+        low = np.nonzero(
+            (confs >= TrackerConfig.LOW_THRESH) & (confs < TrackerConfig.HIGH_THRESH)
+        )[0]
+
+        unmatched_tracks = list(range(len(self.tracks)))
+        unmatched_tracks, unmatched_high = self._associate(
+            unmatched_tracks, high, xyxy, confs, cls_ids, TrackerConfig.MATCH_IOU
+        )
+        unmatched_tracks, _ = self._associate(
+            unmatched_tracks, low, xyxy, confs, cls_ids, TrackerConfig.LOW_MATCH_IOU
+        )
+
+        for i in unmatched_tracks:
+            self.tracks[i].lost = True
+
+        for i in unmatched_high:
+            self.tracks.append(Track(self._next_id, xyxy[i], int(cls_ids[i]), float(confs[i])))
+            self._next_id += 1
+
+    def get_tracks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Видимые треки текущего кадра
+
+        Трек видим, если он сопоставлен с последней детекцией; потерянные
+        треки продолжают переноситься вперёд для повторного сопоставления
+        (до TrackerConfig.MAX_AGE кадров), но не выводятся.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                boxes (N, 4), уверенности (N,), id классов (N,), id треков (N,)
+        """
+        active = self._active()
+        if not active:
+            return (
+                np.zeros((0, 4), dtype=np.float32),
+                np.zeros(0, dtype=np.float32),
+                np.zeros(0, dtype=np.int32),
+                np.zeros(0, dtype=np.int32),
+            )
+        return (
+            np.stack([t.xyxy for t in active]),
+            np.array([t.score for t in active], dtype=np.float32),
+            np.array([t.cls_id for t in active], dtype=np.int32),
+            np.array([t.track_id for t in active], dtype=np.int32),
+        )
+
+    def _active(self) -> List[Track]:
+        return [t for t in self.tracks if not t.lost]
+
+    def _associate(
+        self,
+        track_indices: List[int],
+        det_indices: np.ndarray,
+        xyxy: np.ndarray,
+        confs: np.ndarray,
+        cls_ids: np.ndarray,
+        min_iou: float,
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Сопоставление треков и детекций венгерским алгоритмом по IoU
+
+        Returns:
+            Tuple[List[int], List[int]]: несопоставленные треки и детекции
+        """
+        if not track_indices or len(det_indices) == 0:
+            return track_indices, list(det_indices)
+
+        tracks = [self.tracks[i] for i in track_indices]
+        iou = box_iou(np.stack([t.xyxy for t in tracks]), xyxy[det_indices])
+        track_cls = np.array([t.cls_id for t in tracks])
+        iou[track_cls[:, None] != cls_ids[det_indices][None, :]] = 0.0
+
+        _, track_to_det, _ = lap.lapjv(1.0 - iou, extend_cost=True, cost_limit=1.0 - min_iou)
+
+        unmatched_tracks, matched_dets = [], set()
+        for row, col in enumerate(track_to_det):
+            if col < 0:
+                unmatched_tracks.append(track_indices[row])
+                continue
+            det = det_indices[col]
+            tracks[row].update(xyxy[det], float(confs[det]))
+            matched_dets.add(col)
+
+        unmatched_dets = [d for j, d in enumerate(det_indices) if j not in matched_dets]
+        return unmatched_tracks, unmatched_dets
@@ -1,13 +1,269 @@
 import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional
+import numpy as np
 from ultralytics import YOLO
 from config.settings import ModelConfig
+from src.models.ort_engine import OrtEngine
+from src.pipeline.records import FrameDetections
+from src.models.artifact_cache import (
+    ArtifactCache,
+    ArtifactSpec,
+    calibration_fingerprint,
+    file_hash,
+    runtime_version,
+)
+
+INT8_BACKENDS = ("onnx", "ort")  # INT8 - статическая квантизация ONNX модели
 
 class YOLODetector:
-    
-    def __init__(self):
-        if ModelConfig.QUANTIZATION:
-            if not os.path.exists(ModelConfig.MODEL_PATH.replace('.pt', '') + '.onnx'):
-                YOLO('yolo11n.pt').export(format='onnx', imgsz=ModelConfig.IMG_SIZE, half=False)
-            self.model = YOLO(ModelConfig.MODEL_PATH.replace('.pt', '') + '.onnx', task='detect')    
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        int8: Optional[bool] = None,
+        img_size: Optional[int] = None,
+        cache: Optional[ArtifactCache] = None,
+        backend: Optional[str] = None,
+    ):
+        self.batch_size = batch_size or ModelConfig.BATCH_SIZE
+        self.int8 = ModelConfig.INT8 if int8 is None else int8
+        self.img_size = img_size or ModelConfig.IMG_SIZE
+        self.backend = backend or model_backend()
+
+        self.model_path = prepare_model(self.backend, self.batch_size, self.int8, self.img_size, cache)
+        if self.backend == "ort":
+            # ONNX модель напрямую через onnxruntime, без обёртки YOLO (self.model нет)
+            self.model = None
+            self.engine = OrtEngine(self.model_path, self.img_size, self.batch_size)
+            self.names = self.engine.names
         else:
-            self.model = YOLO(ModelConfig.MODEL_PATH, task='detect')
\ No newline at end of file
+            self.model = YOLO(self.model_path, task='detect')
+            # ONNX с динамическими размерностями не задаёт размер входа, без этого ultralytics берёт 640
+            self.model.overrides['imgsz'] = self.img_size
+            self.engine = None
+            self.names = self.model.names
+
+    def detect(self, frames: List[np.ndarray], verbose: bool = False, **kwargs: Any) -> List[FrameDetections]:
+        """
+        Детекция на батче кадров для любого формата модели
+
+        Args:
+            frames: кадры BGR
+            verbose: выводить ли информацию по каждому кадру (только через YOLO)
+            **kwargs: дополнительные аргументы предикта (например, conf)
+
+        Returns:
+            List[FrameDetections]: детекции в порядке кадров
+        """
+        if self.engine is not None:
+            return self.engine(frames, **kwargs)
+        return [
+            FrameDetections.from_results(result)
+            for result in self.model(frames, device="cpu", verbose=verbose, **kwargs)
+        ]
+
+    def warmup(self, runs: int = 1) -> None:
+        """
+        Прогон модели на пустом кадре: создание сессии и предиктора
+        ultralytics до обработки первого настоящего кадра
+
+        Args:
+            runs: количество прогонов
+        """
+        frame = np.zeros((self.img_size, self.img_size, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.detect([frame])
+
+
+def model_backend() -> str:
+    """
+    Формат модели по настройкам: ModelConfig.BACKEND, а если он не задан -
+    "onnx" при ModelConfig.QUANTIZATION, иначе "pt". "ort" - та же ONNX
+    модель, но через OrtEngine без обёртки ultralytics
+    """
+    return ModelConfig.BACKEND or ("onnx" if ModelConfig.QUANTIZATION else "pt")
+
+
+def prepare_model(
+    backend: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    int8: Optional[bool] = None,
+    img_size: Optional[int] = None,
+    cache: Optional[ArtifactCache] = None,
+) -> str:
+    """
+    Путь до модели нужного формата (экспорт через кэш моделей при необходимости)
+
+    Args:
+        backend: "pt", "onnx", "ort" или "openvino" (по умолчанию model_backend())
+        batch_size: размер батча инференса
+        int8: INT8 модель (только для INT8_BACKENDS, по умолчанию ModelConfig.INT8)
+        img_size: размер стороны входа модели
+        cache: кэш моделей
+
+    Returns:
+        str: путь до модели для YOLO
+
+    Raises:
+        ValueError: INT8 запрошена для формата не из INT8_BACKENDS (например,
+            "pt" при ModelConfig.QUANTIZATION = False)
+    """
+    backend = backend or model_backend()
+    if (ModelConfig.INT8 if int8 is None else int8) and backend not in INT8_BACKENDS:
+        raise ValueError(f"INT8 поддерживается только для форматов {INT8_BACKENDS}, формат модели: {backend}")
+    if backend == "pt":
+        return ModelConfig.MODEL_PATH
+    if backend in ("onnx", "ort"):
+        return prepare_onnx(batch_size, int8, img_size, cache)
+    if backend == "openvino":
+        return prepare_openvino(batch_size, img_size, cache)
+    raise ValueError(f"Неизвестный формат модели: {backend}")
+
+
+def artifact_spec(
+    batch_size: int, img_size: int, int8: bool = False, model_format: str = 'onnx'
+) -> ArtifactSpec:
+    """
+    Описание экспортированной модели для кэша: хэш весов ModelConfig.MODEL_PATH,
+    формат, размер входа, батч, точность и версии пакетов сборки
+
+    Модель с batch_size > 1 экспортируется с динамической размерностью
+    батча, с batch_size = 1 - с фиксированной.
+
+    Args:
+        batch_size: размер батча инференса
+        img_size: размер стороны входа модели
+        int8: описание INT8 (QDQ) модели вместо FP32
+        model_format: "onnx" или "openvino"
+
+    Returns:
+        ArtifactSpec: описание модели
+    """
+    calibration = ""
+    if int8:
+        if ModelConfig.CALIBRATION_DIR is None:
+            raise ValueError(
+                "Для INT8 модели укажите в ModelConfig.CALIBRATION_DIR "
+                "директорию с видео для калибровки"
+            )
+        calibration = calibration_fingerprint(
+            ModelConfig.CALIBRATION_DIR, ModelConfig.CALIBRATION_FRAMES
+        )
+
+    return ArtifactSpec(
+        weights_hash=file_hash(ModelConfig.MODEL_PATH),
+        img_size=img_size,
+        format=model_format,
+        precision='int8' if int8 else 'fp32',
+        batch='dynamic' if batch_size > 1 else '1',
+        runtime=runtime_version(),
+        calibration=calibration,
+    )
+
+
+def prepare_onnx(
+    batch_size: Optional[int] = None,
+    int8: Optional[bool] = None,
+    img_size: Optional[int] = None,
+    cache: Optional[ArtifactCache] = None,
+) -> str:
+    """
+    Экспорт (и при необходимости INT8 квантизация) ONNX модели через кэш
+    моделей; если модель уже собрана, только возвращается путь до неё
+
+    Args:
+        batch_size: размер батча инференса (по умолчанию ModelConfig.BATCH_SIZE)
+        int8: INT8 модель (по умолчанию ModelConfig.INT8)
+        img_size: размер стороны входа модели (по умолчанию ModelConfig.IMG_SIZE)
+        cache: кэш моделей (по умолчанию ModelConfig.CACHE_DIR)
+
+    Returns:
+        str: путь до готовой к загрузке ONNX модели
+    """
+    batch_size = batch_size or ModelConfig.BATCH_SIZE
+    int8 = ModelConfig.INT8 if int8 is None else int8
+    img_size = img_size or ModelConfig.IMG_SIZE
+    cache = cache or ArtifactCache()
+
+    export_kwargs = {'imgsz': img_size}
+    if batch_size > 1:
+        export_kwargs.update(dynamic=True, batch=batch_size)
+
+    onnx_path = cache.get_or_build(
+        artifact_spec(batch_size, img_size), lambda path: export_onnx(path, **export_kwargs)
+    )
+    if not int8:
+        return onnx_path
+
+    from src.models.quantization import quantize_int8
+
+    return cache.get_or_build(
+        artifact_spec(batch_size, img_size, int8=True),
+        lambda path: quantize_int8(onnx_path, path, ModelConfig.CALIBRATION_DIR, img_size=img_size),
+    )
+
+
+def prepare_openvino(
+    batch_size: Optional[int] = None,
+    img_size: Optional[int] = None,
+    cache: Optional[ArtifactCache] = None,
+) -> str:
+    """
+    Экспорт модели OpenVINO через кэш моделей (нужен пакет openvino)
+
+    Args:
+        batch_size: размер батча инференса (по умолчанию ModelConfig.BATCH_SIZE)
+        img_size: размер стороны входа модели (по умолчанию ModelConfig.IMG_SIZE)
+        cache: кэш моделей (по умолчанию ModelConfig.CACHE_DIR)
+
+    Returns:
+        str: путь до директории модели OpenVINO
+    """
+    batch_size = batch_size or ModelConfig.BATCH_SIZE
+    img_size = img_size or ModelConfig.IMG_SIZE
+    cache = cache or ArtifactCache()
+
+    export_kwargs = {'format': 'openvino', 'imgsz': img_size}
+    if batch_size > 1:
+        export_kwargs.update(dynamic=True, batch=batch_size)
+
+    return cache.get_or_build(
+        artifact_spec(batch_size, img_size, model_format='openvino'),
+        lambda path: export_onnx(path, **export_kwargs),
+    )
+
+
+def export_onnx(onnx_path: str, **export_kwargs) -> str:
+    """
+    Экспорт весов ModelConfig.MODEL_PATH в ONNX по заданному пути
+
+    С format='openvino' в export_kwargs так же экспортируется директория
+    модели OpenVINO. Ultralytics всегда кладёт модель рядом с весами, поэтому экспорт
+    выполняется из копии весов во временной директории рядом с onnx_path,
+    а результат (вместе с файлом внешних данных, если он есть)
+    переносится в onnx_path.
+
+    Args:
+        onnx_path: путь сохранения ONNX модели
+        **export_kwargs: дополнительные аргументы YOLO.export (могут
+            переопределять imgsz, по умолчанию ModelConfig.IMG_SIZE)
+
+    Returns:
+        str: путь до ONNX модели
+    """
+    target = Path(onnx_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=target.parent) as tmp_dir:
+        weights = Path(tmp_dir) / (target.stem + '.pt')
+        shutil.copyfile(ModelConfig.MODEL_PATH, weights)
+
+        export_kwargs = {'format': 'onnx', 'imgsz': ModelConfig.IMG_SIZE, 'half': False, **export_kwargs}
+        exported = Path(YOLO(str(weights)).export(**export_kwargs))
+        for file in exported.parent.glob(exported.name + '*'):
+            os.replace(file, target.parent / (target.name + file.name[len(exported.name):]))
+
+    return str(target)
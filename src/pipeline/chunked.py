@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import PipelineConfig
+from src.pipeline.multi_stream import prebuild_model, run_tasks, worker_counts
+from src.pipeline.video_io import concat_videos, get_frame_count
+
+FrameRange = Tuple[int, Optional[int]]
+
+
+def chunk_ranges(frame_count: int, num_chunks: int, min_chunk_frames: Optional[int] = None) -> List[FrameRange]:
+    """
+    Разбиение видео на смежные диапазоны кадров примерно равной длины
+
+    Последний диапазон открыт (stop=None) и читается до конца видео:
+    CAP_PROP_FRAME_COUNT у многих контейнеров - оценка, и так кадры в
+    хвосте не теряются.
+
+    Args:
+        frame_count: количество кадров видео
+        num_chunks: желаемое количество частей
+        min_chunk_frames: минимальная длина части (по умолчанию PipelineConfig.MIN_CHUNK_FRAMES)
+
+    Returns:
+        List[FrameRange]: диапазоны (start, stop) по порядку
+    """
+    min_chunk_frames = min_chunk_frames or PipelineConfig.MIN_CHUNK_FRAMES
+    num_chunks = max(min(num_chunks, frame_count // min_chunk_frames), 1)
+    bounds = [round(i * frame_count / num_chunks) for i in range(num_chunks)] + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def concat_files(paths: List[str], output_path: str) -> None:
+    """
+    Побайтовая склейка файлов результатов: и JSONL, и колоночный формат
+    NumpyResultsWriter (последовательность пачек) склеиваются без разбора
+
+    Args:
+        paths: пути до частей по порядку
+        output_path: путь итогового файла
+    """
+    with open(output_path, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as part:
+                shutil.copyfileobj(part, out)
+
+
+def process_chunked(
+    video_path: str,
+    output_path: str,
+    num_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    pipelined: bool = False,
+    detect_every: Optional[int] = None,
+    headless: bool = False,
+    pin_cores: bool = True,
+    **processor_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Обработка одного длинного видео по частям пулом процессов
+
+    Видео делится на смежные диапазоны кадров (см. chunk_ranges), каждый
+    процесс перематывает видео к началу своего диапазона и обрабатывает
+    его своим детектором, а части (видео или результаты по кадрам)
+    склеиваются по порядку. Номера кадров в результатах - номера в
+    исходном видео. Трекер (detect_every > 1) и пропуск статичных кадров
+    начинают каждую часть заново с детекции.
+
+    Args:
+        video_path: путь до исходного видео
+        output_path: путь итогового видео (или результатов при headless)
+        num_workers: количество процессов (по умолчанию PipelineConfig.NUM_WORKERS)
+        threads_per_worker: потоков на процесс (по умолчанию ядра / процессы)
+        pipelined: многопоточный режим обработки внутри каждого процесса
+        detect_every: запускать детектор раз в detect_every кадров
+        headless: писать только детекции по кадрам (формат по расширению
+            output_path, см. VideoProcessor.process_results)
+        pin_cores: привязать каждый процесс к своему набору ядер
+        **processor_kwargs: аргументы VideoProcessor в каждом процессе
+
+    Returns:
+        Dict[str, Any]: source, output_path, frames, seconds, chunks и
+            error (первая ошибка части или None)
+    """
+    frame_count = get_frame_count(video_path)
+    num_workers = num_workers or PipelineConfig.NUM_WORKERS
+    ranges = chunk_ranges(frame_count, num_workers * PipelineConfig.CHUNKS_PER_WORKER)
+    num_workers, threads_per_worker = worker_counts(len(ranges), num_workers, threads_per_worker)
+    prebuild_model(processor_kwargs)
+
+    print(
+        f"{video_path}: {frame_count} кадров, частей: {len(ranges)}, процессов: {num_workers}, "
+        f"потоков на процесс: {threads_per_worker}"
+    )
+
+    start_time = time.perf_counter()
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    suffix = Path(output_path).suffix
+    with tempfile.TemporaryDirectory(dir=output_dir) as parts_dir:
+        part_paths = [os.path.join(parts_dir, f"part_{i:04d}{suffix}") for i in range(len(ranges))]
+        results = run_tasks(
+            [
+                (video_path, part_path, pipelined, detect_every, headless, frame_range)
+                for part_path, frame_range in zip(part_paths, ranges)
+            ],
+            num_workers,
+            threads_per_worker,
+            pin_cores,
+            processor_kwargs,
+        )
+
+        errors = [r["error"] for r in results if r["error"] is not None]
+        if not errors:
+            written = [path for path, result in zip(part_paths, results) if result["frames"] > 0]
+            if headless:
+                concat_files(written, output_path)
+            elif written:
+                concat_videos(written, output_path)
+
+    seconds = time.perf_counter() - start_time
+    frames = sum(r["frames"] for r in results)
+    print(
+        f"Итого: {frames} кадров за {seconds:.1f} с ({frames / max(seconds, 1e-9):.1f} FPS) -> "
+        f"{output_path if not errors else 'ошибка: ' + errors[0]}"
+    )
+    return {
+        "source": video_path,
+        "output_path": output_path,
+        "frames": frames,
+        "seconds": seconds,
+        "chunks": len(ranges),
+        "error": errors[0] if errors else None,
+    }
@@ -0,0 +1,117 @@
+import http.client
+import io
+import json
+import socket
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config.settings import ServerConfig
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class InferenceClient:
+    """
+    Клиент сервера инференса (см. src/pipeline/server.py).
+
+    Соединение переиспользуется между запросами (HTTP keep-alive), поэтому
+    накладные расходы запроса - сериализация кадра и один обмен по
+    локальному сокету.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        unix_socket: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        if unix_socket:
+            self._connection = _UnixHTTPConnection(unix_socket, timeout=timeout)
+        else:
+            self._connection = http.client.HTTPConnection(
+                host or ServerConfig.HOST,
+                ServerConfig.PORT if port is None else port,
+                timeout=timeout,
+            )
+
+    def health(self) -> Dict[str, Any]:
+        """Состояние сервера и статистика батчей."""
+        return self._request("GET", "/health")
+
+    def detect(self, frame: np.ndarray) -> Dict[str, Any]:
+        """
+        Детекция на одном кадре
+
+        Args:
+            frame: кадр BGR формы (H, W, 3) в uint8
+
+        Returns:
+            Dict[str, Any]: boxes, cls, conf и distance
+        """
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(frame), allow_pickle=False)
+        return self._request("POST", "/detect", buffer.getvalue(), "application/x-npy")
+
+    def process_video(
+        self,
+        source: str,
+        output_path: Optional[str] = None,
+        results_path: Optional[str] = None,
+        detect_every: Optional[int] = None,
+        pipelined: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Обработка видео на сервере (пути - в файловой системе сервера)
+
+        Args:
+            source: путь до исходного видео
+            output_path: путь сохранения итогового видео
+            results_path: путь сохранения результатов (headless-режим вместо видео)
+            detect_every: запускать детектор раз в detect_every кадров
+            pipelined: многопоточный режим обработки
+
+        Returns:
+            Dict[str, Any]: source, output_path, frames, seconds и metrics
+                (снимок метрик задачи)
+        """
+        job = {"source": source, "pipelined": pipelined}
+        for name, value in (
+            ("output_path", output_path),
+            ("results_path", results_path),
+            ("detect_every", detect_every),
+        ):
+            if value is not None:
+                job[name] = value
+        return self._request("POST", "/jobs", json.dumps(job).encode(), "application/json")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "InferenceClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _request(
+        self, method: str, path: str, body: Optional[bytes] = None, content_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        headers = {"Content-Type": content_type} if content_type else {}
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        payload = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path}: {response.status} {payload.get('error')}")
+        return payload
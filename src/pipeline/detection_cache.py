@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import DetectionCacheConfig
+from src.pipeline.records import FrameDetections
+
+MANIFEST_NAME = "manifest.json"
+NPY_HEADER_BYTES = 128  # с запасом под форму (N, 4) с N до 10^18
+# offsets[i]:offsets[i + 1] - строки boxes, conf, cls и track кадра i; time - по кадрам
+COLUMNS = {
+    "offsets": np.int64,
+    "boxes": np.float32,
+    "conf": np.float32,
+    "cls": np.int32,
+    "track": np.int64,
+    "time": np.float32,
+}
+
+
+@dataclass(frozen=True)
+class DetectionCacheSpec:
+    """
+    Описание закэшированных детекций: всё, от чего зависят детекции кадров
+    до оценки расстояний и отрисовки.
+
+    source - отпечаток видео (см. source_fingerprint), model - хэш весов,
+    формат и точность модели, img_size - размер входа (или лестница
+    размеров в режиме adaptive), mode - режим детекции и его настройки
+    (трекинг, тайлы, пропуск статичных кадров), frame_range - обработанный
+    диапазон кадров.
+    """
+
+    source: str
+    model: str
+    img_size: str
+    mode: str
+    frame_range: str = ""
+
+    @property
+    def key(self) -> str:
+        digest = hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()
+        return f"{self.source[:12]}_{self.img_size}_{digest[:16]}"
+
+
+def source_fingerprint(path: str, sample_bytes: Optional[int] = None) -> str:
+    """
+    Отпечаток видео: размер файла и SHA-256 первых и последних sample_bytes
+    байт (хэш всей многогигабайтной записи смены занимал бы заметное время)
+
+    Args:
+        path: путь до видео
+        sample_bytes: сколько байт хэшировать с начала и с конца файла
+            (по умолчанию DetectionCacheConfig.FINGERPRINT_BYTES)
+
+    Returns:
+        str: hex-дайджест
+    """
+    sample_bytes = sample_bytes or DetectionCacheConfig.FINGERPRINT_BYTES
+    size = os.path.getsize(path)
+    sha = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        sha.update(f.read(sample_bytes))
+        if size > sample_bytes:
+            f.seek(max(size - sample_bytes, sample_bytes))
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+class CachedDetections:
+    """
+    Детекции видео из кэша. Колонки открываются через np.load(mmap_mode="r"),
+    поэтому в память читаются только страницы обрабатываемых кадров.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS
+        }
+        self.tracked = self.manifest["tracked"]
+
+    def __len__(self) -> int:
+        return len(self.columns["time"])
+
+    def get(self, index: int, frame: Optional[np.ndarray]) -> FrameDetections:
+        """
+        Детекции кадра
+
+        Args:
+            index: номер кадра от начала обработанного диапазона
+            frame: декодированный кадр
+
+        Returns:
+            FrameDetections: детекции кадра (cur_time - время детекции
+                при исходной обработке)
+        """
+        if index >= len(self):
+            raise ValueError(f"В кэше детекций {len(self)} кадров, запрошен кадр {index}")
+        c = self.columns
+        rows = slice(c["offsets"][index], c["offsets"][index + 1])
+        return FrameDetections(
+            frame,
+            np.array(c["boxes"][rows]),
+            np.array(c["conf"][rows]),
+            np.array(c["cls"][rows]),
+            np.array(c["track"][rows]) if self.tracked else None,
+            float(c["time"][index]),
+        )
+
+
+class DetectionCacheWriter:
+    """
+    Потоковая запись детекций в кэш с атомарной публикацией по commit.
+
+    Каждая колонка сразу дописывается в свой .npy файл во временной
+    директории (в памяти держится только текущий батч), заголовок .npy
+    фиксированной длины с настоящей формой массива записывается в commit.
+    Затем директория переименовывается в cache_dir/<spec.key>/, поэтому
+    прерванная обработка не оставляет в кэше неполных детекций.
+    """
+
+    def __init__(self, cache_dir: Path, spec: DetectionCacheSpec):
+        self.cache_dir = cache_dir
+        self.spec = spec
+        self.frames = 0
+        self.rows = 0
+        self.tracked = False
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._tmp_dir = Path(tempfile.mkdtemp(prefix=f".{spec.key}.", dir=self.cache_dir))
+        self._files = {}
+        for name in COLUMNS:
+            f = self._files[name] = open(self._tmp_dir / f"{name}.npy", "wb")
+            f.write(b"\0" * NPY_HEADER_BYTES)
+        self._write("offsets", np.zeros(1))
+
+    def add(self, detections: List[FrameDetections]) -> None:
+        """
+        Дозапись детекций очередных кадров в колонки
+
+        Args:
+            detections: детекции кадров в порядке видео
+        """
+        if not detections:
+            return
+        counts = np.array([len(d) for d in detections], dtype=np.int64)
+        self._write("offsets", self.rows + np.cumsum(counts))
+        self._write("boxes", np.concatenate([np.asarray(d.xyxy).reshape(-1, 4) for d in detections]))
+        self._write("conf", np.concatenate([np.asarray(d.confs).reshape(-1) for d in detections]))
+        self._write("cls", np.concatenate([np.asarray(d.cls_ids).reshape(-1) for d in detections]))
+        self._write("track", np.concatenate([
+            np.asarray(d.track_ids).reshape(-1) if d.track_ids is not None else np.full(len(d), -1)
+            for d in detections
+        ]))
+        self._write("time", np.array([d.cur_time for d in detections]))
+
+        self.frames += len(detections)
+        self.rows += int(counts.sum())
+        self.tracked = self.tracked or any(d.track_ids is not None for d in detections)
+
+    def commit(self) -> str:
+        """
+        Запись заголовков колонок и manifest.json и публикация детекций в кэше
+
+        Returns:
+            str: путь до директории с детекциями
+        """
+        shapes = {
+            "offsets": (self.frames + 1,),
+            "boxes": (self.rows, 4),
+            "conf": (self.rows,),
+            "cls": (self.rows,),
+            "track": (self.rows,),
+            "time": (self.frames,),
+        }
+        target = self.cache_dir / self.spec.key
+        try:
+            for name, f in self._files.items():
+                f.seek(0)
+                f.write(_npy_header(COLUMNS[name], shapes[name]))
+                f.close()
+            manifest = {
+                **asdict(self.spec),
+                "frames": self.frames,
+                "tracked": self.tracked,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            with open(self._tmp_dir / MANIFEST_NAME, "w") as f:
+                json.dump(manifest, f, indent=2)
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(self._tmp_dir, target)
+        finally:
+            self.discard()
+        return str(target)
+
+    def discard(self) -> None:
+        """Закрытие файлов и удаление временной директории (детекции в кэш не попадают)."""
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def _write(self, name: str, values: np.ndarray) -> None:
+        self._files[name].write(np.ascontiguousarray(values, dtype=COLUMNS[name]).tobytes())
+
+
+class DetectionCache:
+    """
+    Кэш детекций по кадрам: повторная обработка того же видео той же
+    моделью (например, с новыми DistanceConfig или стилем отрисовки)
+    берёт детекции из кэша и пересчитывает только расстояния и отрисовку.
+
+    Детекции видео лежат в cache_dir/<spec.key>/ колонками .npy (см.
+    COLUMNS) вместе с manifest.json.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or DetectionCacheConfig.CACHE_DIR)
+
+    def load(self, spec: DetectionCacheSpec) -> Optional[CachedDetections]:
+        """
+        Детекции из кэша
+
+        Args:
+            spec: описание детекций
+
+        Returns:
+            Optional[CachedDetections]: детекции или None, если их нет в кэше
+        """
+        path = self.cache_dir / spec.key
+        if not (path / MANIFEST_NAME).exists():
+            return None
+        return CachedDetections(str(path))
+
+    def writer(self, spec: DetectionCacheSpec) -> DetectionCacheWriter:
+        """
+        Writer детекций для записи в кэш по завершении обработки
+
+        Args:
+            spec: описание детекций
+
+        Returns:
+            DetectionCacheWriter: writer
+        """
+        return DetectionCacheWriter(self.cache_dir, spec)
+
+
+def detection_mode(**settings: Any) -> str:
+    """
+    Режим детекции для DetectionCacheSpec.mode
+
+    Args:
+        **settings: параметры режима и настройки, от которых зависят детекции
+
+    Returns:
+        str: JSON с отсортированными ключами
+    """
+    return json.dumps(settings, sort_keys=True, default=str)
+
+
+def _npy_header(dtype: type, shape: Tuple[int, ...]) -> bytes:
+    """
+    Заголовок .npy версии 1.0 длиной ровно NPY_HEADER_BYTES: данные колонки
+    пишутся сразу после места под заголовок, форма известна только в конце
+    """
+    header = repr({
+        "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        "fortran_order": False,
+        "shape": tuple(shape),
+    })
+    preamble = np.lib.format.MAGIC_PREFIX + bytes([1, 0])
+    length = NPY_HEADER_BYTES - len(preamble) - 2
+    return preamble + struct.pack("<H", length) + header.ljust(length - 1).encode("latin1") + b"\n"
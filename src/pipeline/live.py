@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import LiveConfig
+
+
+class FileReplayCapture:
+    """
+    Проигрывание видеофайла в реальном времени вместо камеры: read()
+    отдаёт кадр не раньше его момента по расписанию fps, как это делала
+    бы камера. Интерфейс совпадает с cv2.VideoCapture (read, release, get).
+    """
+
+    def __init__(self, video_path: str, fps: Optional[float] = None):
+        self._cap = cv2.VideoCapture(video_path)
+        if not self._cap.isOpened():
+            raise FileNotFoundError(f"Не удалось открыть видео: {video_path}")
+        self.fps = fps or self._cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self._index = 0
+        self._start_time: Optional[float] = None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+        delay = self._start_time + self._index / self.fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._index += 1
+        return self._cap.read()
+
+    def get(self, prop: int) -> float:
+        return self.fps if prop == cv2.CAP_PROP_FPS else self._cap.get(prop)
+
+    def release(self) -> None:
+        self._cap.release()
+
+
+def open_live_source(source: str, replay_fps: Optional[float] = None, replay: bool = False) -> Any:
+    """
+    Открытие живого источника
+
+    Args:
+        source: индекс камеры ("0"), URL потока (rtsp://, http://) или путь до файла
+        replay_fps: частота проигрывания файла (по умолчанию LiveConfig.REPLAY_FPS или fps файла)
+        replay: проигрывать файл в реальном времени (см. FileReplayCapture)
+
+    Returns:
+        Any: источник с интерфейсом cv2.VideoCapture
+    """
+    if replay:
+        return FileReplayCapture(source, replay_fps or LiveConfig.REPLAY_FPS)
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Не удалось открыть источник: {source}")
+    # в буфере драйвера держим минимум кадров, чтобы не отставать от камеры
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class LatestFrameGrabber:
+    """
+    Поток захвата, который хранит только самый свежий кадр.
+
+    Кадры читаются из источника без остановки; если обработка не успевает,
+    необработанный кадр заменяется новым и считается пропущенным. Поэтому
+    задержка от захвата до результата ограничена временем обработки одного
+    кадра и не растёт при отставании детектора.
+    """
+
+    def __init__(self, capture: Any):
+        self.capture = capture
+        self.captured = 0
+        self.dropped = 0
+
+        self._condition = threading.Condition()
+        self._latest: Optional[Tuple[int, float, np.ndarray]] = None
+        self._finished = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._grab_loop, name="grab", daemon=True)
+
+    def start(self) -> "LatestFrameGrabber":
+        self._thread.start()
+        return self
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Ожидание кадра, более свежего, чем отданный в прошлый раз
+
+        Args:
+            timeout: максимальное ожидание в секундах (по умолчанию LiveConfig.READ_TIMEOUT)
+
+        Returns:
+            Optional[Tuple[int, float, np.ndarray]]: (номер кадра, время захвата
+                по time.perf_counter, кадр) или None, если источник закончился
+        """
+        timeout = LiveConfig.READ_TIMEOUT if timeout is None else timeout
+        with self._condition:
+            self._condition.wait_for(lambda: self._latest is not None or self._finished, timeout)
+            if self._error is not None:
+                raise self._error
+            latest, self._latest = self._latest, None
+            return latest
+
+    def stop(self) -> None:
+        """Остановка захвата и освобождение источника."""
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        with self._condition:
+            if self._latest is not None:
+                self.dropped += 1
+                self._latest = None
+
+    def _grab_loop(self) -> None:
+        try:
+            while not self._finished:
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                capture_time = time.perf_counter()
+                with self._condition:
+                    if self._latest is not None:
+                        self.dropped += 1
+                    self._latest = (self.captured, capture_time, frame)
+                    self.captured += 1
+                    self._condition.notify_all()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.capture.release()
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def __enter__(self) -> "LatestFrameGrabber":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
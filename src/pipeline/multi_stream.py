@@ -0,0 +1,378 @@
+import glob
+import multiprocessing as mp
+import os
+import queue
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+
+from config.settings import AdaptiveConfig, ModelConfig, OrtConfig, PipelineConfig, TilingConfig
+from src.pipeline.video_io import get_frame_count
+
+_processor = None
+_processor_kwargs: Dict[str, Any] = {}
+_progress_queue = None
+# настройки ModelConfig родительского процесса (например, из профиля хоста), которые получают процессы пула
+_MODEL_SETTINGS = ("BACKEND", "IMG_SIZE", "BATCH_SIZE")
+
+
+def expand_sources(sources: List[str]) -> List[str]:
+    """
+    Раскрытие glob-шаблонов в списке источников с сохранением порядка
+
+    Args:
+        sources: пути до видео и/или glob-шаблоны (например, "fleet/*/cam.mp4")
+
+    Returns:
+        List[str]: уникальные пути до видео
+    """
+    expanded = []
+    for source in sources:
+        if glob.has_magic(source):
+            matches = sorted(glob.glob(source, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"По шаблону {source} не найдено ни одного видео")
+            expanded.extend(matches)
+        else:
+            expanded.append(source)
+    return list(dict.fromkeys(expanded))
+
+
+def output_paths_for(sources: List[str], output_dir: str, suffix: str = "_processed.avi") -> List[str]:
+    """
+    Пути итоговых файлов для источников без коллизий имён
+
+    Args:
+        sources: пути до исходных видео
+        output_dir: директория для итоговых файлов
+        suffix: окончание имени итогового файла
+
+    Returns:
+        List[str]: пути итоговых видео в порядке источников
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    paths, used = [], set()
+    for source in sources:
+        stem = Path(source).stem
+        name, index = stem, 1
+        while name in used:
+            name = f"{stem}_{index}"
+            index += 1
+        used.add(name)
+        paths.append(os.path.join(output_dir, f"{name}{suffix}"))
+    return paths
+
+
+def configure_threads(num_threads: int, cores: Optional[List[int]] = None) -> None:
+    """
+    Ограничение числа потоков OpenCV, torch и OrtEngine в текущем процессе
+
+    ONNX Runtime внутри ultralytics создаёт сессию с настройками по
+    умолчанию, поэтому для него ограничение делается привязкой процесса
+    к набору ядер (только Linux).
+
+    Args:
+        num_threads: количество потоков на процесс
+        cores: ядра, к которым привязать процесс
+    """
+    import torch
+
+    cv2.setNumThreads(num_threads)
+    torch.set_num_threads(num_threads)
+    OrtConfig.INTRA_OP_THREADS = num_threads
+
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+def _claim_slot(owners: Any) -> int:
+    """
+    Номер набора ядер для процесса пула: первый слот, не занятый живым
+    процессом. Процесс, пересозданный пулом после падения, получает слот
+    упавшего и не делит ядра с другим процессом.
+
+    Args:
+        owners: multiprocessing.Array с pid владельца каждого слота (0 - свободен)
+
+    Returns:
+        int: номер слота
+    """
+    with owners.get_lock():
+        for slot, pid in enumerate(owners):
+            if pid == 0 or not _pid_alive(pid):
+                owners[slot] = os.getpid()
+                return slot
+    # процессов в пуле не больше, чем слотов, а завершившиеся пул забирает до пересоздания
+    raise RuntimeError("Нет свободного набора ядер для процесса пула")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def _init_worker(
+    slots: Any,
+    progress_queue: "mp.Queue",
+    threads_per_worker: int,
+    pin_cores: bool,
+    processor_kwargs: Dict[str, Any],
+    model_settings: Dict[str, Any],
+) -> None:
+    global _progress_queue, _processor_kwargs
+    _progress_queue = progress_queue
+    _processor_kwargs = processor_kwargs
+
+    cores = None
+    if pin_cores and hasattr(os, "sched_getaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+        start = _claim_slot(slots) * threads_per_worker % len(available)
+        cores = [available[(start + i) % len(available)] for i in range(threads_per_worker)]
+    # процесс пула запущен через spawn и видит ModelConfig по умолчанию
+    for name, value in model_settings.items():
+        setattr(ModelConfig, name, value)
+    configure_threads(threads_per_worker, cores)
+
+
+def _process_source(
+    source: str,
+    output_path: str,
+    pipelined: bool,
+    detect_every: Optional[int],
+    headless: bool,
+    frame_range: Optional[Tuple[int, Optional[int]]] = None,
+) -> Dict[str, Any]:
+    global _processor
+    if _processor is None:
+        from src.pipeline.processor import VideoProcessor
+
+        _processor = VideoProcessor(**_processor_kwargs)
+
+    if frame_range is None:
+        label, total = source, get_frame_count(source)
+    else:
+        start, stop = frame_range
+        label = f"{source} [{start}:{'' if stop is None else stop}]"
+        total = (stop if stop is not None else get_frame_count(source)) - start
+    last_reported = 0
+
+    def report(frames_done: int) -> None:
+        nonlocal last_reported
+        if frames_done - last_reported >= PipelineConfig.PROGRESS_EVERY:
+            last_reported = frames_done
+            _progress_queue.put((label, frames_done, total))
+
+    process = _processor.process_results if headless else _processor.process_video
+    start_time = time.perf_counter()
+    try:
+        frames = process(
+            source,
+            output_path,
+            verbose=False,
+            pipelined=pipelined,
+            progress_callback=report,
+            detect_every=detect_every,
+            frame_range=frame_range,
+        )
+        error = None
+    except Exception as e:
+        frames, error = last_reported, f"{type(e).__name__}: {e}"
+
+    return {
+        "source": label,
+        "output_path": output_path,
+        "frames": frames,
+        "seconds": time.perf_counter() - start_time,
+        "error": error,
+    }
+
+
+def prebuild_model(processor_kwargs: Dict[str, Any]) -> None:
+    """
+    Сборка модели до запуска пула, чтобы процессы только загружали её из кэша
+
+    Args:
+        processor_kwargs: аргументы VideoProcessor в процессах пула
+    """
+    from src.models.yolo_detector import model_backend, prepare_model
+
+    if model_backend() != "pt":
+        from src.models.tiling import tiled_batch_size
+
+        batch_size = processor_kwargs.get("batch_size")
+        if processor_kwargs.get("tiled", TilingConfig.ENABLED):
+            batch_size = tiled_batch_size(batch_size)
+        prepare_model(batch_size=batch_size)
+        if processor_kwargs.get("adaptive", AdaptiveConfig.ENABLED):
+            for img_size in AdaptiveConfig.LADDER:
+                prepare_model(batch_size=batch_size, img_size=img_size)
+
+
+def run_tasks(
+    tasks: List[Tuple],
+    num_workers: int,
+    threads_per_worker: int,
+    pin_cores: bool,
+    processor_kwargs: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    Выполнение задач обработки видео пулом процессов с выводом прогресса
+
+    Args:
+        tasks: аргументы _process_source для каждой задачи
+        num_workers: количество процессов
+        threads_per_worker: потоков на процесс
+        pin_cores: привязать каждый процесс к своему набору ядер
+        processor_kwargs: аргументы VideoProcessor в каждом процессе
+
+    Returns:
+        List[Dict[str, Any]]: результаты задач в порядке tasks
+    """
+    ctx = mp.get_context("spawn")
+    slots = ctx.Array("i", num_workers)
+    progress_queue = ctx.Queue()
+
+    with ctx.Pool(
+        num_workers,
+        initializer=_init_worker,
+        initargs=(
+            slots,
+            progress_queue,
+            threads_per_worker,
+            pin_cores,
+            processor_kwargs,
+            {name: getattr(ModelConfig, name) for name in _MODEL_SETTINGS},
+        ),
+    ) as pool:
+        pending = [pool.apply_async(_process_source, task) for task in tasks]
+        reported = set()
+        while len(reported) < len(pending):
+            _print_progress(progress_queue)
+            for i, task in enumerate(pending):
+                if i not in reported and task.ready():
+                    reported.add(i)
+                    _print_result(task.get())
+        return [task.get() for task in pending]
+
+
+def worker_counts(
+    num_tasks: int, num_workers: Optional[int] = None, threads_per_worker: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Количество процессов и потоков на процесс, чтобы
+    num_workers * threads_per_worker не превышало число ядер
+
+    Args:
+        num_tasks: количество задач (процессов не больше, чем задач)
+        num_workers: количество процессов (по умолчанию PipelineConfig.NUM_WORKERS)
+        threads_per_worker: потоков на процесс (по умолчанию ядра / процессы)
+
+    Returns:
+        Tuple[int, int]: (процессы, потоки на процесс)
+    """
+    num_workers = max(min(num_workers or PipelineConfig.NUM_WORKERS, num_tasks), 1)
+    cpu_count = os.cpu_count() or 1
+    threads_per_worker = (
+        threads_per_worker
+        or PipelineConfig.THREADS_PER_WORKER
+        or max(cpu_count // num_workers, 1)
+    )
+    return num_workers, threads_per_worker
+
+
+def process_sources(
+    sources: List[str],
+    output_dir: str,
+    num_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    pipelined: bool = False,
+    detect_every: Optional[int] = None,
+    results_format: Optional[str] = None,
+    pin_cores: bool = True,
+    **processor_kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Обработка нескольких видео пулом процессов
+
+    Каждый процесс один раз загружает детектор и переиспользует его для всех
+    доставшихся ему видео. Потоки на процесс ограничиваются так, чтобы
+    num_workers * threads_per_worker не превышало число ядер.
+
+    Args:
+        sources: пути до исходных видео
+        output_dir: директория для итоговых видео
+        num_workers: количество процессов (по умолчанию PipelineConfig.NUM_WORKERS)
+        threads_per_worker: потоков на процесс (по умолчанию ядра / процессы)
+        pipelined: многопоточный режим обработки внутри каждого процесса
+        detect_every: запускать детектор раз в detect_every кадров
+        results_format: "jsonl" или "bin" - headless-режим: вместо видео
+            пишутся только детекции (см. VideoProcessor.process_results)
+        pin_cores: привязать каждый процесс к своему набору ядер
+        **processor_kwargs: аргументы VideoProcessor в каждом процессе
+
+    Returns:
+        List[Dict[str, Any]]: результаты по каждому источнику в порядке sources
+    """
+    num_workers, threads_per_worker = worker_counts(len(sources), num_workers, threads_per_worker)
+    prebuild_model(processor_kwargs)
+
+    headless = results_format is not None
+    suffix = f"_results.{results_format}" if headless else "_processed.avi"
+    output_paths = output_paths_for(sources, output_dir, suffix)
+
+    print(
+        f"Источников: {len(sources)}, процессов: {num_workers}, "
+        f"потоков на процесс: {threads_per_worker}"
+    )
+
+    start_time = time.perf_counter()
+    results = run_tasks(
+        [
+            (source, output_path, pipelined, detect_every, headless)
+            for source, output_path in zip(sources, output_paths)
+        ],
+        num_workers,
+        threads_per_worker,
+        pin_cores,
+        processor_kwargs,
+    )
+
+    _print_summary(results, time.perf_counter() - start_time)
+    return results
+
+
+def _print_progress(progress_queue: "mp.Queue") -> None:
+    try:
+        source, frames_done, total = progress_queue.get(timeout=0.5)
+    except queue.Empty:
+        return
+    if total:
+        print(f"[{source}] {frames_done}/{total} кадров ({frames_done / total:.0%})")
+    else:
+        print(f"[{source}] {frames_done} кадров")
+
+
+def _print_result(result: Dict[str, Any]) -> None:
+    if result["error"] is not None:
+        print(f"[{result['source']}] ошибка: {result['error']}")
+        return
+    fps = result["frames"] / result["seconds"] if result["seconds"] else 0.0
+    print(
+        f"[{result['source']}] готово: {result['frames']} кадров за "
+        f"{result['seconds']:.1f} с ({fps:.1f} FPS) -> {result['output_path']}"
+    )
+
+
+def _print_summary(results: List[Dict[str, Any]], wall_time: float) -> None:
+    total_frames = sum(r["frames"] for r in results)
+    failed = sum(r["error"] is not None for r in results)
+    print(
+        f"Итого: {len(results)} источников ({failed} с ошибкой), {total_frames} кадров "
+        f"за {wall_time:.1f} с, суммарно {total_frames / max(wall_time, 1e-9):.1f} FPS"
+    )
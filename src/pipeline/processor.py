@@ -1,52 +1,613 @@
+import time
 import cv2
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from config.settings import (
+    AdaptiveConfig,
+    DetectionCacheConfig,
+    ModelConfig,
+    MotionConfig,
+    OrtConfig,
+    PipelineConfig,
+    TilingConfig,
+    TrackerConfig,
+)
+from src.models.artifact_cache import file_hash
 from src.models.yolo_detector import YOLODetector
-from src.models.distance_estimator import DistanceEstimator
-from src.utils.visualization import draw_detections, draw_performance_stats
+from src.models.distance_estimator import create_distance_estimator
+from src.models.motion_gate import MotionGate
+from src.models.resolution import ResolutionController
+from src.models.tiling import TiledInference, tiled_batch_size
+from src.models.tracker import ByteTracker
+from src.pipeline.detection_cache import (
+    CachedDetections,
+    DetectionCache,
+    DetectionCacheSpec,
+    DetectionCacheWriter,
+    detection_mode,
+    source_fingerprint,
+)
+from src.pipeline.live import LatestFrameGrabber, open_live_source
+from src.pipeline.records import FrameDetections
+from src.pipeline.results_writer import create_results_writer
+from src.pipeline.threaded import StagePipeline
+from src.pipeline.video_io import (
+    create_video_writer,
+    get_video_properties,
+    iter_batches,
+    iter_frames,
+)
+from src.utils.metrics import PipelineMetrics
+from src.utils.profiling import latency_summary
+from src.utils.visualization import OverlayRenderer
 
 
 class VideoProcessor:
 
-    def __init__(self):
-        self.detector = YOLODetector()
-        self.distance_estimator = DistanceEstimator()
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        show_stats: Optional[bool] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        detector: Optional[YOLODetector] = None,
+        tiled: Optional[bool] = None,
+        motion_gate: Optional[bool] = None,
+        writer_backend: Optional[str] = None,
+        adaptive: Optional[bool] = None,
+        detection_cache: Optional[bool] = None,
+    ):
+        tiled = TilingConfig.ENABLED if tiled is None else tiled
+        if tiled:
+            batch_size = tiled_batch_size(batch_size)
 
-    def process_video(self, video_path: str, output_path: str = 'output.avi', verbose: bool = False) -> None:
+        self.metrics = metrics or PipelineMetrics()
+        self.detector = detector or YOLODetector(batch_size)
+        # с adaptive размер входа модели подстраивается под бюджет задержки (см. src/models/resolution.py)
+        adaptive = AdaptiveConfig.ENABLED if adaptive is None else adaptive
+        self.resolution = ResolutionController(start=self.detector.img_size) if adaptive else None
+        self.detectors = {self.detector.img_size: self.detector}
+        if adaptive:
+            self.detectors = self._prepare_ladder()
+            self.detector = self.detectors[self.resolution.img_size]
+            self.metrics.set_input_size(self.detector.img_size)
+        # в тайловом режиме кадр детектируется по перекрывающимся тайлам (см. src/models/tiling.py)
+        self.tiler = TiledInference(self._predict, self.detector.batch_size) if tiled else None
+        self.motion_gate = MotionConfig.ENABLED if motion_gate is None else motion_gate
+        # с detection_cache детекции видео сохраняются и при повторной обработке берутся из кэша
+        detection_cache = DetectionCacheConfig.ENABLED if detection_cache is None else detection_cache
+        self.detection_cache = DetectionCache() if detection_cache else None
+        self.writer_backend = writer_backend
+        self.distance_estimator = create_distance_estimator(self.detector.names)
+        self.renderer = OverlayRenderer(
+            self.detector.names,
+            show_stats=PipelineConfig.SHOW_STATS if show_stats is None else show_stats,
+        )
+
+    def process_video(
+        self,
+        video_path: str,
+        output_path: str = 'output.avi',
+        verbose: bool = False,
+        pipelined: bool = False,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        detect_every: Optional[int] = None,
+        frame_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> int:
+        """
+        Обработка видео: детекция, оценка расстояний и запись итогового видео
+
+        Args:
+            video_path: путь до исходного видео
+            output_path: путь сохранения итогового видео
+            verbose: выводить ли информацию по каждому кадру
+            pipelined: разнести декодирование, инференс, отрисовку и
+                кодирование по отдельным потокам
+            progress_callback: вызывается с числом записанных кадров
+                после записи каждого батча
+            detect_every: запускать детектор раз в detect_every кадров
+                (по умолчанию TrackerConfig.DETECT_EVERY), между детекциями
+                boxes переносятся трекером
+            frame_range: (start, stop) - обработать только кадры
+                start..stop-1 (stop=None - до конца видео)
+
+        Кадры подаются в модель батчами по ModelConfig.BATCH_SIZE,
+        результаты разбираются обратно по кадрам в исходном порядке.
+        В режиме detect_every > 1 кадры обрабатываются по одному.
+        С motion_gate детектор не запускается на кадрах, где сцена не
+        изменилась, и детекции берутся с предыдущего кадра.
+
+        Returns:
+            int: количество записанных кадров
+        """
+        w, h, fps = get_video_properties(video_path)
 
-        cap = cv2.VideoCapture(video_path)
-        w, h, fps = (
-            int(cap.get(x))
-            for x in (
-                cv2.CAP_PROP_FRAME_WIDTH,
-                cv2.CAP_PROP_FRAME_HEIGHT,
-                cv2.CAP_PROP_FPS,
+        video_writer = create_video_writer(output_path, fps, (w, h), self.writer_backend)
+        counter = _FrameCounter(progress_callback)
+
+        def write_batch(frames: List[np.ndarray]) -> None:
+            for frame in frames:
+                video_writer.write(frame)
+            counter.add(len(frames))
+
+        try:
+            self._run(
+                video_path, verbose, pipelined, detect_every, ("draw", self._render), write_batch,
+                frame_range=frame_range,
             )
-        )
+        finally:
+            video_writer.release()
 
-        video_writer = cv2.VideoWriter(
-            output_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h)
-        )
+        return counter.count
 
-        cap.release()
-        for detections in self.detector.model(
-            video_path,
-            stream=True,
-            device="cpu",
-            verbose=verbose,
-            show_labels=False,
-            show_conf=False,
-            show_boxes=False,
-        ):
-
-            frame = detections.plot(boxes=False, labels=False)
-
-            processed_frame = draw_detections(
-                frame, detections, self.detector.model.names
+    def process_results(
+        self,
+        video_path: str,
+        results_path: str = 'results.jsonl',
+        verbose: bool = False,
+        pipelined: bool = False,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        detect_every: Optional[int] = None,
+        frame_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> int:
+        """
+        Headless-обработка видео: только детекции и расстояния, без отрисовки
+        и кодирования видео
+
+        Для каждого кадра пишется запись (номер кадра, метка времени, boxes,
+        id классов, уверенности, расстояния): в JSONL, если results_path
+        оканчивается на .jsonl, иначе в колоночный NumPy формат
+        (см. src/pipeline/results_writer.py).
+
+        Args:
+            video_path: путь до исходного видео
+            results_path: путь сохранения результатов
+            verbose: выводить ли информацию по каждому кадру
+            pipelined: разнести декодирование, инференс и запись по потокам
+            progress_callback: вызывается с числом обработанных кадров
+            detect_every: запускать детектор раз в detect_every кадров
+            frame_range: (start, stop) - обработать только кадры
+                start..stop-1, номера кадров в записях - номера в исходном видео
+
+        Returns:
+            int: количество обработанных кадров
+        """
+        _, _, fps = get_video_properties(video_path)
+        counter = _FrameCounter(progress_callback)
+        first_frame = frame_range[0] if frame_range else 0
+
+        with create_results_writer(results_path, fps, first_frame) as results_writer:
+            def write_batch(records: List[Tuple]) -> None:
+                for record in records:
+                    results_writer.write(*record)
+                counter.add(len(records))
+
+            self._run(
+                video_path, verbose, pipelined, detect_every, ("record", self._to_record), write_batch,
+                keep_frames=False, frame_range=frame_range,
             )
 
-            cur_time = sum(detections.speed.values())
-            processed_frame = draw_performance_stats(
-                processed_frame, cur_time, len(detections)
+        return counter.count
+
+    def process_live(
+        self,
+        source: str,
+        output_path: Optional[str] = None,
+        results_path: Optional[str] = None,
+        verbose: bool = False,
+        replay: bool = False,
+        replay_fps: Optional[float] = None,
+        max_frames: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Обработка живого источника (камера, поток) с ограниченной задержкой
+
+        Поток захвата держит только самый свежий кадр (см. LatestFrameGrabber),
+        детектор всегда берёт последний доступный кадр, а кадры, пришедшие
+        за время его работы, пропускаются. Задержка от захвата кадра до
+        готового результата пишется в метрику стадии capture_to_result,
+        пропущенные кадры - в счётчик dropped.
+
+        Args:
+            source: индекс камеры, URL потока или путь до файла
+            output_path: путь сохранения итогового видео (None - не писать)
+            results_path: путь сохранения результатов по кадрам (None - не писать)
+            verbose: выводить ли информацию по каждому кадру
+            replay: проигрывать файл source в реальном времени вместо камеры
+            replay_fps: частота проигрывания файла
+            max_frames: остановиться после стольких обработанных кадров
+
+        Returns:
+            Dict[str, Any]: frames (обработано), captured, dropped и latency
+                (mean/p50/p95/p99 задержки от захвата до результата в мс)
+        """
+        capture = open_live_source(source, replay_fps, replay)
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        video_writer = None
+        results_writer = create_results_writer(results_path, fps) if results_path else None
+        latencies_ms = []
+
+        grabber = LatestFrameGrabber(capture).start()
+        try:
+            while max_frames is None or len(latencies_ms) < max_frames:
+                item = grabber.read()
+                if item is None:
+                    break
+                index, capture_time, frame = item
+
+                detection = self._infer([frame], verbose)[0]
+                if output_path is not None:
+                    if video_writer is None:
+                        video_writer = create_video_writer(
+                            output_path, fps, frame.shape[1::-1], self.writer_backend
+                        )
+                    video_writer.write(self._render(detection))
+                if results_writer is not None:
+                    results_writer.write(*self._to_record(detection), frame_index=index)
+
+                latency = time.perf_counter() - capture_time
+                latencies_ms.append(latency * 1000)
+                self.metrics.observe("capture_to_result", latency)
+                self.metrics.observe_objects([len(detection)])
+                self.metrics.add_frames(1)
+        finally:
+            grabber.stop()
+            self.metrics.add_dropped(grabber.dropped)
+            self.metrics.export()
+            if video_writer is not None:
+                video_writer.release()
+            if results_writer is not None:
+                results_writer.close()
+
+        return {
+            "frames": len(latencies_ms),
+            "captured": grabber.captured,
+            "dropped": grabber.dropped,
+            "latency": latency_summary(latencies_ms),
+        }
+
+    def _run(
+        self,
+        video_path: str,
+        verbose: bool,
+        pipelined: bool,
+        detect_every: Optional[int],
+        finish: Tuple[str, Callable[[FrameDetections], Any]],
+        write_batch: Callable[[List[Any]], None],
+        keep_frames: bool = True,
+        frame_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> None:
+        """
+        Общий цикл обработки: detect превращает элемент источника в список
+        FrameDetections, finish - (имя стадии, отрисовка или запись
+        результатов кадра), write_batch - приёмник готовых кадров
+
+        С keep_frames=False кадр освобождается сразу после детекции и не
+        держится в очередях до записи результатов.
+        Задержки стадий, счётчики кадров и глубины очередей пишутся в self.metrics.
+        """
+        batch_size = self.detector.batch_size
+        detect_every = detect_every or TrackerConfig.DETECT_EVERY
+        metrics = self.metrics
+        finish_stage, finish_frame = finish
+        frames = iter_frames(video_path, *(frame_range or ()))
+
+        cached, cache_writer = None, None
+        if self.detection_cache is not None:
+            spec = self._cache_spec(video_path, detect_every, frame_range)
+            cached = self.detection_cache.load(spec)
+            cache_writer = self.detection_cache.writer(spec) if cached is None else None
+
+        if cached is not None:
+            source = iter_batches(frames, batch_size)
+            detect = self._make_cached_detect(cached)
+        elif detect_every > 1:
+            source = enumerate(frames)
+            detect = self._make_tracking_detect(detect_every, verbose)
+        elif self.motion_gate:
+            source = iter_batches(frames, batch_size)
+            detect = self._make_gated_detect(verbose)
+        else:
+            source = iter_batches(frames, batch_size)
+            detect = lambda frames: self._infer(frames, verbose)
+        if cache_writer is not None:
+            detect = _recording(detect, cache_writer)
+        if not keep_frames:
+            detect = _releasing_frames(detect)
+
+        def finish_all(items: List[FrameDetections]) -> List[Any]:
+            start_time = time.perf_counter()
+            finished = [finish_frame(item) for item in items]
+            metrics.observe(finish_stage, (time.perf_counter() - start_time) / len(items), len(items))
+            metrics.observe_objects(len(item) for item in items)
+            return finished
+
+        def write(items: List[Any]) -> None:
+            start_time = time.perf_counter()
+            write_batch(items)
+            metrics.observe("write", (time.perf_counter() - start_time) / len(items), len(items))
+            metrics.add_frames(len(items))
+
+        try:
+            if pipelined:
+                stages = [("detect", detect), (finish_stage, finish_all)]
+                pipeline = StagePipeline(
+                    source=self._timed_source(source),
+                    stages=stages,
+                    sink=lambda items: self._write_with_queue_depths(pipeline, stages, write, items),
+                    queue_size=PipelineConfig.QUEUE_SIZE,
+                )
+                pipeline.run()
+            else:
+                for item in self._timed_source(source):
+                    write(finish_all(detect(item)))
+            if cache_writer is not None:
+                cache_writer.commit()
+                cache_writer = None
+        finally:
+            if cache_writer is not None:
+                cache_writer.discard()
+            metrics.export()
+
+    def _timed_source(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Источник с замером времени декодирования (на кадр)
+        """
+        iterator = iter(items)
+        while True:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            frames = len(item) if isinstance(item, list) else 1
+            self.metrics.observe("decode", (time.perf_counter() - start_time) / frames, frames)
+            yield item
+
+    def _write_with_queue_depths(
+        self,
+        pipeline: StagePipeline,
+        stages: List[Tuple[str, Callable]],
+        write: Callable[[List[Any]], None],
+        items: List[Any],
+    ) -> None:
+        names = [name for name, _ in stages] + ["write"]
+        self.metrics.set_queue_depths({name: q.qsize() for name, q in zip(names, pipeline.queues)})
+        write(items)
+
+    def _cache_spec(
+        self, video_path: str, detect_every: int, frame_range: Optional[Tuple[int, Optional[int]]]
+    ) -> DetectionCacheSpec:
+        """
+        Описание детекций видео для кэша: отпечаток видео, хэш загруженного
+        артефакта модели (перекалибровка INT8 даёт другой ключ), размер
+        входа и режим детекции вместе с настройками, от которых зависят
+        детекции (настройки расстояний и отрисовки в ключ не входят)
+        """
+        d = self.detector
+        mode = {"detect_every": detect_every, "motion_gate": self.motion_gate, "tiled": self.tiler is not None}
+        if detect_every > 1:
+            mode["tracker"] = _config_values(TrackerConfig)
+        elif self.motion_gate:
+            mode["motion"] = _config_values(MotionConfig)
+        if self.tiler is not None:
+            mode["tiling"] = _config_values(TilingConfig)
+        if d.backend == "ort":
+            mode["ort"] = _config_values(OrtConfig)
+
+        return DetectionCacheSpec(
+            source=source_fingerprint(video_path),
+            model=f"{file_hash(d.model_path)}_{d.backend}_{'int8' if d.int8 else 'fp32'}",
+            img_size="-".join(str(size) for size in self.detectors),
+            mode=detection_mode(**mode),
+            frame_range="-".join(str(i) for i in frame_range) if frame_range else "",
+        )
+
+    def _make_cached_detect(self, cached: CachedDetections) -> Callable[[List[np.ndarray]], List[FrameDetections]]:
+        """
+        Детекции из кэша вместо инференса: кадры батча получают
+        детекции по порядку
+        """
+        next_index = 0
+
+        def detect(frames: List[np.ndarray]) -> List[FrameDetections]:
+            nonlocal next_index
+            start_time = time.perf_counter()
+            items = [cached.get(next_index + i, frame) for i, frame in enumerate(frames)]
+            next_index += len(frames)
+            self.metrics.observe("cache", (time.perf_counter() - start_time) / len(frames), len(frames))
+            return items
+
+        return detect
+
+    def _make_tracking_detect(
+        self, detect_every: int, verbose: bool
+    ) -> Callable[[Tuple[int, np.ndarray]], List[FrameDetections]]:
+        """
+        Детекция раз в detect_every кадров (или при падении уверенности
+        трекера) с переносом boxes трекером на промежуточных кадрах
+        """
+        tracker = ByteTracker()
+
+        def track(indexed_frame: Tuple[int, np.ndarray]) -> List[FrameDetections]:
+            index, frame = indexed_frame
+            start_time = time.perf_counter()
+
+            inference_time = 0.0
+            tracker.predict()
+            if index % detect_every == 0 or tracker.needs_detection():
+                detections = self._infer([frame], verbose, conf=TrackerConfig.LOW_THRESH)[0]
+                inference_time = detections.cur_time / 1000
+                tracker.update(detections.xyxy, detections.confs, detections.cls_ids)
+
+            xyxy, confs, cls_ids, track_ids = tracker.get_tracks()
+            elapsed = time.perf_counter() - start_time
+            self.metrics.observe("track", max(elapsed - inference_time, 0.0))
+            return [FrameDetections(frame, xyxy, confs, cls_ids, track_ids, elapsed * 1000)]
+
+        return track
+
+    def _make_gated_detect(self, verbose: bool) -> Callable[[List[np.ndarray]], List[FrameDetections]]:
+        """
+        Детекция только на кадрах, где сцена изменилась (см. MotionGate);
+        остальные кадры батча получают детекции последнего
+        продетектированного кадра, поэтому и расстояния у них те же
+        """
+        gate = MotionGate()
+        last: Optional[FrameDetections] = None
+
+        def detect(frames: List[np.ndarray]) -> List[FrameDetections]:
+            nonlocal last
+            start_time = time.perf_counter()
+            changed = [gate.update(frame) for frame in frames]
+            gate_time = (time.perf_counter() - start_time) / len(frames)
+            self.metrics.observe("motion", gate_time, len(frames))
+
+            to_detect = [frame for frame, is_changed in zip(frames, changed) if is_changed]
+            detected = iter(self._infer(to_detect, verbose) if to_detect else [])
+            self.metrics.add_reused(len(frames) - len(to_detect))
+
+            items = []
+            for frame, is_changed in zip(frames, changed):
+                if is_changed:
+                    item = last = next(detected)
+                else:
+                    item = last.reuse(frame, gate_time * 1000)
+                items.append(item)
+            return items
+
+        return detect
+
+    def _infer(self, frames: List[np.ndarray], verbose: bool, **kwargs) -> List[FrameDetections]:
+        """
+        Инференс батча кадров одним вызовом модели
+
+        Args:
+            frames: список кадров (не больше batch_size детектора)
+            verbose: выводить ли информацию по каждому кадру
+            **kwargs: дополнительные аргументы предикта (например, conf)
+
+        В тайловом режиме каждый кадр режется на тайлы, а результаты
+        по тайлам сливаются в один результат на кадр.
+
+        Returns:
+            List[FrameDetections]: детекции в порядке кадров
+        """
+        predict = self.tiler or self._predict
+        start_time = time.perf_counter()
+        detections = predict(frames, verbose=verbose, **kwargs)
+        if self.resolution is not None:
+            self._adapt((time.perf_counter() - start_time) * 1000 / len(frames), len(frames))
+        # speed - общий словарь на вызов модели; тайлы и батчи больше батча модели дают несколько вызовов
+        calls: Dict[int, list] = {}
+        for d in detections:
+            calls.setdefault(id(d.speed), [d.speed, 0])[1] += 1
+        for speed, count in calls.values():
+            for stage, ms in (speed or {}).items():
+                self.metrics.observe(stage, (ms or 0.0) / 1000, count)
+        self.metrics.add_detector_runs(len(detections))
+        return detections
+
+    def _prepare_ladder(self) -> Dict[int, YOLODetector]:
+        """
+        Детекторы для каждого размера входа лестницы AdaptiveConfig.LADDER
+
+        Модели с фиксированным входом экспортируются (или берутся из кэша)
+        и прогреваются здесь, поэтому смена размера во время обработки -
+        только переключение на готовый детектор, без экспорта и загрузки.
+        Переданный детектор используется для своего размера.
+
+        Returns:
+            Dict[int, YOLODetector]: детектор по размеру входа
+        """
+        detectors = {}
+        for img_size in self.resolution.ladder:
+            if img_size == self.detector.img_size:
+                detectors[img_size] = self.detector
+                continue
+            detector = YOLODetector(
+                self.detector.batch_size, self.detector.int8, img_size, backend=self.detector.backend
             )
-            video_writer.write(processed_frame)
+            detector.warmup()
+            detectors[img_size] = detector
+        return detectors
+
+    def _adapt(self, latency_ms: float, frames: int) -> None:
+        """
+        Учёт задержки детектора на кадр и переключение размера входа
+        по решению self.resolution
+        """
+        img_size = self.resolution.observe(latency_ms, frames)
+        if img_size is not None:
+            self.detector = self.detectors[img_size]
+            self.metrics.set_input_size(img_size)
+
+    def _predict(self, frames: List[np.ndarray], verbose: bool, **kwargs) -> List[FrameDetections]:
+        return self.detector.detect(frames, verbose=verbose, **kwargs)
+
+    def _render(self, detections: FrameDetections) -> np.ndarray:
+        """
+        Отрисовка детекций прямо в декодированный кадр; после отрисовки
+        запись кадра больше не держит
+        """
+        d, frame = detections, detections.frame
+        d.release_frame()
+        distances = self.distance_estimator.estimate_batch(d.cls_ids, d.xyxy, d.image_size)
+        return self.renderer.render(
+            frame, d.xyxy, d.cls_ids, d.confs, distances, d.track_ids, d.cur_time
+        )
+
+    def _to_record(
+        self, detections: FrameDetections
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Запись результатов кадра без самого кадра (кадр сразу освобождается)
+        """
+        d = detections
+        d.release_frame()
+        distances = self.distance_estimator.estimate_batch(d.cls_ids, d.xyxy, d.image_size)
+        return d.xyxy, d.cls_ids, d.confs, distances
+
+
+def _releasing_frames(
+    detect: Callable[[Any], List[FrameDetections]]
+) -> Callable[[Any], List[FrameDetections]]:
+    """Обёртка detect, освобождающая кадры сразу после детекции."""
+
+    def wrapped(item: Any) -> List[FrameDetections]:
+        detections = detect(item)
+        for d in detections:
+            d.release_frame()
+        return detections
+
+    return wrapped
+
+
+def _recording(
+    detect: Callable[[Any], List[FrameDetections]], cache_writer: DetectionCacheWriter
+) -> Callable[[Any], List[FrameDetections]]:
+    """Обёртка detect, сохраняющая детекции в кэш детекций."""
+
+    def wrapped(item: Any) -> List[FrameDetections]:
+        detections = detect(item)
+        cache_writer.add(detections)
+        return detections
+
+    return wrapped
+
+
+def _config_values(config: type) -> Dict[str, Any]:
+    """Настройки класса конфигурации (UPPER_CASE атрибуты)."""
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+class _FrameCounter:
+    """Счётчик обработанных кадров с вызовом progress_callback."""
+
+    def __init__(self, progress_callback: Optional[Callable[[int], None]]):
+        self.count = 0
+        self.progress_callback = progress_callback
 
-        del video_writer
+    def add(self, frames: int) -> None:
+        self.count += frames
+        if self.progress_callback is not None:
+            self.progress_callback(self.count)
@@ -0,0 +1,72 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class FrameDetections:
+    """
+    Детекции одного кадра в компактном виде - то, что передаётся между
+    стадиями пайплайна вместо ultralytics Results.
+
+    Хранит только массивы boxes, уверенностей, классов и треков и сам
+    кадр, пока он нужен для отрисовки. Results вместе с тензорами и
+    ссылкой на orig_img отбрасывается сразу после разбора, а кадр можно
+    освободить через release_frame (headless-режим делает это сразу после
+    детекции).
+    """
+
+    __slots__ = ("frame", "image_size", "xyxy", "confs", "cls_ids", "track_ids", "cur_time", "speed")
+
+    def __init__(
+        self,
+        frame: Optional[np.ndarray],
+        xyxy: np.ndarray,
+        confs: np.ndarray,
+        cls_ids: np.ndarray,
+        track_ids: Optional[np.ndarray] = None,
+        cur_time: float = 0.0,
+        image_size: Optional[Tuple[int, int]] = None,
+        speed: Optional[Dict[str, float]] = None,
+    ):
+        self.frame = frame
+        self.image_size = image_size or frame.shape[1::-1]
+        self.xyxy = xyxy
+        self.confs = confs
+        self.cls_ids = cls_ids
+        self.track_ids = track_ids
+        self.cur_time = cur_time
+        # время стадий детектора на кадр в мс (общий словарь на батч); None - детектор не запускался
+        self.speed = speed
+
+    @classmethod
+    def from_results(cls, results) -> "FrameDetections":
+        """
+        Разбор ultralytics Results: массивы копируются из тензоров, и
+        Results можно сразу отпустить
+
+        Args:
+            results: результат детекции одного кадра
+
+        Returns:
+            FrameDetections: детекции кадра (cur_time - сумма results.speed в мс)
+        """
+        data = results.boxes.data.cpu().numpy()
+        return cls(
+            results.orig_img,
+            np.ascontiguousarray(data[:, :4], dtype=np.float32),
+            np.ascontiguousarray(data[:, 4], dtype=np.float32),
+            data[:, 5].astype(np.int32),
+            cur_time=sum(v or 0.0 for v in results.speed.values()),
+            speed=results.speed,
+        )
+
+    def reuse(self, frame: np.ndarray, cur_time: float = 0.0) -> "FrameDetections":
+        """Те же детекции для другого кадра (массивы общие, не копируются)."""
+        return FrameDetections(frame, self.xyxy, self.confs, self.cls_ids, self.track_ids, cur_time)
+
+    def release_frame(self) -> None:
+        """Освобождение кадра, когда он больше не нужен."""
+        self.frame = None
+
+    def __len__(self) -> int:
+        return len(self.xyxy)
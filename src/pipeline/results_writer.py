@@ -0,0 +1,236 @@
+import abc
+import io
+import json
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from config.settings import PipelineConfig
+
+_END = None
+COLUMNS = ("frame", "timestamp", "count", "boxes", "cls", "conf", "distance")
+
+
+class ResultsWriter(abc.ABC):
+    """
+    Потоковая запись детекций по кадрам без отрисовки и кодирования видео.
+
+    Кадры копятся в памяти пачками по buffer_frames, пачка отдаётся
+    фоновому потоку, который сериализует её и пишет на диск, поэтому
+    вызывающий поток не ждёт ни сериализацию, ни файловый ввод-вывод. Номер кадра и метка
+    времени (index / fps) присваиваются по порядку вызовов write, начиная с first_frame
+    (часть видео при параллельной обработке по частям).
+
+    Формат файла задаёт подкласс через _serialize.
+    """
+
+    def __init__(
+        self, path: str, fps: float, buffer_frames: Optional[int] = None, first_frame: int = 0
+    ):
+        self.path = path
+        self.fps = fps if fps and fps > 0 else 1.0
+        self.buffer_frames = buffer_frames or PipelineConfig.RESULTS_BUFFER_FRAMES
+        self.first_frame = first_frame
+        self.frame_count = 0
+
+        self._buffer: List = []
+        self._file = open(path, "wb")
+        self._queue: queue.Queue = queue.Queue(maxsize=4)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._write_loop, name="results", daemon=True)
+        self._thread.start()
+
+    def write(
+        self,
+        xyxy: np.ndarray,
+        cls_ids: np.ndarray,
+        confs: np.ndarray,
+        distances: np.ndarray,
+        frame_index: Optional[int] = None,
+    ) -> None:
+        """
+        Добавление детекций очередного кадра
+
+        Args:
+            xyxy: bounding boxes формы (N, 4)
+            cls_ids: id классов формы (N,)
+            confs: уверенности формы (N,)
+            distances: расстояния в метрах формы (N,)
+            frame_index: номер кадра в источнике (по умолчанию - по порядку
+                вызовов; задаётся, когда часть кадров пропускается)
+        """
+        if self._error is not None:
+            raise self._error
+
+        index = self.first_frame + self.frame_count if frame_index is None else frame_index
+        self._buffer.append((index, index / self.fps, xyxy, cls_ids, confs, distances))
+        self.frame_count += 1
+        if len(self._buffer) >= self.buffer_frames:
+            self._flush()
+
+    def close(self) -> None:
+        """Запись оставшихся кадров и закрытие файла."""
+        try:
+            self._flush()
+        finally:
+            self._queue.put(_END)
+            self._thread.join()
+            self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        self._queue.put(self._buffer)
+        self._buffer = []
+
+    def _write_loop(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _END:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._file.write(self._serialize(chunk))
+            except BaseException as e:
+                self._error = e
+
+    @abc.abstractmethod
+    def _serialize(self, frames: List) -> bytes:
+        """Сериализация пачки кадров (index, timestamp, xyxy, cls_ids, confs, distances) для записи в файл."""
+
+
+class JsonlResultsWriter(ResultsWriter):
+    """Одна JSON-строка на кадр: frame, timestamp, boxes, cls, conf, distance."""
+
+    def _serialize(self, frames: List) -> bytes:
+        lines = []
+        for frame_index, timestamp, xyxy, cls_ids, confs, distances in frames:
+            lines.append(
+                json.dumps(
+                    {
+                        "frame": frame_index,
+                        "timestamp": round(timestamp, 3),
+                        **detections_to_dict(xyxy, cls_ids, confs, distances),
+                    },
+                    separators=(",", ":"),
+                )
+            )
+        return ("\n".join(lines) + "\n").encode()
+
+
+def detections_to_dict(
+    xyxy: np.ndarray, cls_ids: np.ndarray, confs: np.ndarray, distances: np.ndarray
+) -> Dict[str, List]:
+    """
+    Детекции кадра в JSON-совместимом виде (с округлением)
+
+    Args:
+        xyxy: bounding boxes формы (N, 4)
+        cls_ids: id классов формы (N,)
+        confs: уверенности формы (N,)
+        distances: расстояния в метрах формы (N,)
+
+    Returns:
+        Dict[str, List]: boxes, cls, conf и distance
+    """
+    return {
+        "boxes": np.round(np.asarray(xyxy, dtype=np.float32), 1).tolist(),
+        "cls": np.asarray(cls_ids, dtype=np.int32).tolist(),
+        "conf": np.round(np.asarray(confs, dtype=np.float32), 3).tolist(),
+        "distance": np.round(np.asarray(distances, dtype=np.float32), 2).tolist(),
+    }
+
+
+class NumpyResultsWriter(ResultsWriter):
+    """
+    Колоночный бинарный формат: последовательность пачек, каждая пачка -
+    подряд записанные .npy массивы (см. COLUMNS). Читается load_results.
+    """
+
+    def _serialize(self, frames: List) -> bytes:
+        columns = _to_columns(frames)
+        buffer = io.BytesIO()
+        for name in COLUMNS:
+            np.save(buffer, columns[name], allow_pickle=False)
+        return buffer.getvalue()
+
+
+def _to_columns(frames: List) -> Dict[str, np.ndarray]:
+    return {
+        "frame": np.array([f[0] for f in frames], dtype=np.int64),
+        "timestamp": np.array([f[1] for f in frames], dtype=np.float64),
+        "count": np.array([len(f[2]) for f in frames], dtype=np.int32),
+        "boxes": _concat([f[2] for f in frames], np.float32, (0, 4)),
+        "cls": _concat([f[3] for f in frames], np.int16, (0,)),
+        "conf": _concat([f[4] for f in frames], np.float32, (0,)),
+        "distance": _concat([f[5] for f in frames], np.float32, (0,)),
+    }
+
+
+def _concat(arrays: List[np.ndarray], dtype: type, empty_shape: tuple) -> np.ndarray:
+    arrays = [np.asarray(a, dtype=dtype).reshape((-1,) + empty_shape[1:]) for a in arrays]
+    if not arrays:
+        return np.zeros(empty_shape, dtype=dtype)
+    return np.concatenate(arrays)
+
+
+def create_results_writer(path: str, fps: float, first_frame: int = 0) -> ResultsWriter:
+    """
+    Writer результатов по расширению файла: .jsonl - JSONL, иначе колоночный NumPy
+
+    Args:
+        path: путь сохранения результатов
+        fps: частота кадров видео (для меток времени)
+        first_frame: номер первого записываемого кадра в источнике
+
+    Returns:
+        ResultsWriter: writer результатов
+    """
+    if path.endswith(".jsonl"):
+        return JsonlResultsWriter(path, fps, first_frame=first_frame)
+    return NumpyResultsWriter(path, fps, first_frame=first_frame)
+
+
+def iter_result_chunks(path: str) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Чтение пачек колоночного формата NumpyResultsWriter по одной
+
+    Args:
+        path: путь до файла результатов
+
+    Yields:
+        Dict[str, np.ndarray]: колонки пачки
+    """
+    with open(path, "rb") as f:
+        while f.peek(1):
+            yield {name: np.load(f, allow_pickle=False) for name in COLUMNS}
+
+
+def load_results(path: str) -> Dict[str, np.ndarray]:
+    """
+    Загрузка всего файла колоночного формата NumpyResultsWriter
+
+    Детекции кадра i лежат в строках offsets[i]:offsets[i + 1]
+    массивов boxes, cls, conf и distance.
+
+    Args:
+        path: путь до файла результатов
+
+    Returns:
+        Dict[str, np.ndarray]: колонки COLUMNS и offsets
+    """
+    chunks = list(iter_result_chunks(path)) or [_to_columns([])]
+    results = {name: np.concatenate([c[name] for c in chunks]) for name in COLUMNS}
+    results["offsets"] = np.concatenate([[0], np.cumsum(results["count"])])
+    return results
@@ -0,0 +1,468 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+from config.settings import ServerConfig
+from src.models.distance_estimator import create_distance_estimator
+from src.models.yolo_detector import YOLODetector
+from src.pipeline.processor import VideoProcessor
+from src.pipeline.records import FrameDetections
+from src.pipeline.results_writer import detections_to_dict
+from src.utils.metrics import PipelineMetrics
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """Ошибка запроса с HTTP-кодом ответа."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _Request:
+    __slots__ = ("frames", "kwargs", "future")
+
+    def __init__(self, frames: List[np.ndarray], kwargs: Dict[str, Any], future: asyncio.Future):
+        self.frames = frames
+        self.kwargs = kwargs
+        self.future = future
+
+
+class MicroBatcher:
+    """
+    Объединение кадров из одновременных запросов в общие батчи.
+
+    Первый запрос в очереди открывает батч; батч уходит в модель, когда
+    набрано max_batch кадров или прошло max_delay_ms с его открытия.
+    В один батч попадают только запросы с одинаковыми аргументами
+    инференса. Инференс идёт в одном отдельном потоке, event loop не
+    блокируется.
+    """
+
+    def __init__(
+        self,
+        predict: Callable[..., List[Any]],
+        max_batch: int,
+        max_delay_ms: Optional[float] = None,
+    ):
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_delay = (ServerConfig.MAX_BATCH_DELAY_MS if max_delay_ms is None else max_delay_ms) / 1000
+        self.batches = 0
+        self.frames = 0
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending: Deque[_Request] = deque()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="inference")
+
+    async def detect(self, frames: List[np.ndarray], **kwargs: Any) -> List[Any]:
+        """
+        Детекция на кадрах в составе общих батчей
+
+        Args:
+            frames: кадры BGR
+            **kwargs: аргументы предикта ultralytics (например, conf)
+
+        Returns:
+            List[Any]: результаты детекции в порядке кадров
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for i in range(0, len(frames), self.max_batch):
+            future = loop.create_future()
+            await self._queue.put(_Request(frames[i:i + self.max_batch], kwargs, future))
+            futures.append(future)
+
+        results = []
+        for chunk in await asyncio.gather(*futures):
+            results.extend(chunk)
+        return results
+
+    async def run(self) -> None:
+        """Цикл сборки и исполнения батчей (запускается задачей в event loop)."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = await self._collect(loop)
+                await self._execute(loop, batch)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _next(self, timeout: Optional[float] = None) -> _Request:
+        if self._pending:
+            return self._pending.popleft()
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    async def _collect(self, loop: asyncio.AbstractEventLoop) -> List[_Request]:
+        first = await self._next()
+        batch, size = [first], len(first.frames)
+        deadline = loop.time() + self.max_delay
+        deferred = []
+
+        while size < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                request = await self._next(timeout)
+            except asyncio.TimeoutError:
+                break
+            if request.kwargs != first.kwargs:
+                deferred.append(request)
+                continue
+            if size + len(request.frames) > self.max_batch:
+                deferred.append(request)
+                break
+            batch.append(request)
+            size += len(request.frames)
+
+        self._pending.extendleft(reversed(deferred))
+        return batch
+
+    async def _execute(self, loop: asyncio.AbstractEventLoop, batch: List[_Request]) -> None:
+        frames = [frame for request in batch for frame in request.frames]
+        try:
+            results = await loop.run_in_executor(
+                self._executor, lambda: self.predict(frames, **batch[0].kwargs)
+            )
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.frames += len(frames)
+        offset = 0
+        for request in batch:
+            n = len(request.frames)
+            if not request.future.done():
+                request.future.set_result(results[offset:offset + n])
+            offset += n
+
+
+class _BatchedVideoProcessor(VideoProcessor):
+    """
+    VideoProcessor, отправляющий кадры в общий MicroBatcher сервера. У
+    каждой задачи свои метрики, чтобы статистика одновременных задач не
+    смешивалась.
+    """
+
+    def __init__(self, server: "InferenceServer", show_stats: Optional[bool] = None):
+        super().__init__(show_stats=show_stats, metrics=PipelineMetrics(), detector=server.detector)
+        self.server = server
+
+    def _predict(self, frames: List[np.ndarray], verbose: bool, **kwargs) -> List[FrameDetections]:
+        return asyncio.run_coroutine_threadsafe(
+            self.server.batcher.detect(frames, **kwargs), self.server.loop
+        ).result()
+
+
+class InferenceServer:
+    """
+    Долгоживущий сервер инференса: детектор загружается и прогревается
+    один раз, дальше запросы обслуживаются без повторной инициализации.
+
+    HTTP API (локальный TCP порт и/или Unix socket):
+        GET  /health  - состояние сервера и статистика батчей
+        GET  /metrics - метрики запросов /detect в Prometheus text format
+        POST /detect  - детекция на одном кадре: тело - изображение
+                        (JPEG/PNG) или массив .npy (Content-Type: application/x-npy)
+        POST /jobs    - обработка видео: JSON с source и output_path
+                        или results_path (headless), detect_every, pipelined;
+                        в ответе - метрики этой задачи (PipelineMetrics.snapshot)
+
+    Кадры из одновременных /detect и /jobs объединяются в общие батчи
+    (см. MicroBatcher), видео обрабатываются в пуле из max_jobs потоков.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_delay_ms: Optional[float] = None,
+        max_jobs: Optional[int] = None,
+    ):
+        self.detector = YOLODetector(batch_size or ServerConfig.BATCH_SIZE)
+        self.detector.warmup()
+        self.distance_estimator = create_distance_estimator(self.detector.names)
+        self.metrics = PipelineMetrics()
+        self.batcher = MicroBatcher(self._predict, self.detector.batch_size, max_delay_ms)
+        self.jobs = ThreadPoolExecutor(max_jobs or ServerConfig.MAX_JOBS, thread_name_prefix="job")
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.addresses: List[Any] = []
+        self._servers: List[asyncio.AbstractServer] = []
+        self._batcher_task: Optional[asyncio.Task] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        unix_socket: Optional[str] = None,
+    ) -> None:
+        """
+        Запуск сервера в текущем event loop
+
+        Args:
+            host: адрес TCP (по умолчанию ServerConfig.HOST)
+            port: порт TCP (по умолчанию ServerConfig.PORT, 0 - любой свободный)
+            unix_socket: путь до Unix socket; если задан без port,
+                TCP не открывается
+        """
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._batcher_task = asyncio.create_task(self.batcher.run())
+
+        unix_socket = unix_socket or ServerConfig.UNIX_SOCKET
+        if unix_socket:
+            server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            self._servers.append(server)
+            self.addresses.append(unix_socket)
+        if port is not None or not unix_socket:
+            server = await asyncio.start_server(
+                self._handle,
+                host or ServerConfig.HOST,
+                ServerConfig.PORT if port is None else port,
+            )
+            self._servers.append(server)
+            self.addresses.append(server.sockets[0].getsockname()[:2])
+
+    async def stop(self) -> None:
+        """Остановка приёма запросов и цикла батчей."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._batcher_task.cancel()
+        self._stopped.set()
+
+    def run(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        unix_socket: Optional[str] = None,
+    ) -> None:
+        """Запуск сервера в текущем потоке до остановки (Ctrl+C)."""
+
+        async def main() -> None:
+            await self.start(host, port, unix_socket)
+            print(f"Сервер инференса слушает {', '.join(map(str, self.addresses))}")
+            await self._stopped.wait()
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.jobs.shutdown(wait=False)
+
+    def run_in_thread(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        unix_socket: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Запуск сервера в фоновом потоке (для тестов и встраивания)
+
+        Returns:
+            List[Any]: адреса, на которых слушает сервер
+        """
+        started = threading.Event()
+        errors = []
+
+        async def main() -> None:
+            try:
+                await self.start(host, port, unix_socket)
+            except BaseException as e:
+                errors.append(e)
+                raise
+            finally:
+                started.set()
+            await self._stopped.wait()
+
+        self._thread = threading.Thread(target=asyncio.run, args=(main(),), name="server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self.addresses
+
+    def shutdown(self) -> None:
+        """Остановка сервера, запущенного run_in_thread."""
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+        self._thread.join()
+        self.jobs.shutdown(wait=True)
+
+    def _predict(self, frames: List[np.ndarray], **kwargs: Any) -> List[FrameDetections]:
+        return self.detector.detect(frames, **kwargs)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload = 200, await self._dispatch(method, path, headers, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                if isinstance(payload, str):
+                    content_type, data = "text/plain; version=0.0.4; charset=utf-8", payload.encode()
+                else:
+                    content_type, data = "application/json", json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            data = json.dumps({"error": str(e)}).encode()
+            writer.write(
+                f"HTTP/1.1 {e.status} {_REASONS.get(e.status, '')}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+            )
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Any:
+        route = (method, urlsplit(path).path)
+        if route == ("GET", "/health"):
+            return {
+                "status": "ok",
+                "model": self.detector.model_path,
+                "max_batch": self.batcher.max_batch,
+                "batches": self.batcher.batches,
+                "frames": self.batcher.frames,
+            }
+        if route == ("GET", "/metrics"):
+            return self.metrics.to_prometheus()
+        if route == ("POST", "/detect"):
+            return await self._detect(headers, body)
+        if route == ("POST", "/jobs"):
+            return await self._run_job(body)
+        raise HTTPError(404, f"Неизвестный запрос {method} {path}")
+
+    async def _detect(self, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+        frame = decode_frame(body, headers.get("content-type", ""))
+        start_time = time.perf_counter()
+        result = (await self.batcher.detect([frame]))[0]
+        self.metrics.add_detector_runs(1)
+        self.metrics.observe("detect_request", time.perf_counter() - start_time)
+        return detections_to_dict(
+            result.xyxy, result.cls_ids, result.confs,
+            self.distance_estimator.estimate_batch(result.cls_ids, result.xyxy, result.image_size),
+        )
+
+    async def _run_job(self, body: bytes) -> Dict[str, Any]:
+        try:
+            job = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Некорректный JSON: {e}")
+        if "source" not in job:
+            raise HTTPError(400, "Не указан source")
+        unknown = set(job) - {"source", "output_path", "results_path", "detect_every", "pipelined", "show_stats"}
+        if unknown:
+            raise HTTPError(400, f"Неизвестные поля: {sorted(unknown)}")
+
+        def run() -> Dict[str, Any]:
+            processor = _BatchedVideoProcessor(self, show_stats=job.get("show_stats"))
+            start_time = time.perf_counter()
+            kwargs = {"pipelined": job.get("pipelined", False), "detect_every": job.get("detect_every")}
+            if job.get("results_path"):
+                frames = processor.process_results(job["source"], job["results_path"], **kwargs)
+            else:
+                frames = processor.process_video(
+                    job["source"], job.get("output_path") or "output.avi", **kwargs
+                )
+            return {
+                "source": job["source"],
+                "output_path": job.get("results_path") or job.get("output_path") or "output.avi",
+                "frames": frames,
+                "seconds": time.perf_counter() - start_time,
+                "metrics": processor.metrics.snapshot(),
+            }
+
+        return await asyncio.get_running_loop().run_in_executor(self.jobs, run)
+
+
+def decode_frame(body: bytes, content_type: str) -> np.ndarray:
+    """
+    Кадр из тела запроса: массив .npy или закодированное изображение
+
+    Args:
+        body: тело запроса
+        content_type: Content-Type запроса
+
+    Returns:
+        np.ndarray: кадр BGR формы (H, W, 3) в uint8
+    """
+    if content_type.startswith("application/x-npy"):
+        try:
+            frame = np.load(io.BytesIO(body), allow_pickle=False)
+        except ValueError as e:
+            raise HTTPError(400, f"Некорректный .npy: {e}")
+    else:
+        frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise HTTPError(400, "Не удалось декодировать изображение")
+
+    if frame.ndim != 3 or frame.shape[2] != 3 or frame.dtype != np.uint8:
+        raise HTTPError(400, f"Ожидается кадр (H, W, 3) uint8, получен {frame.shape} {frame.dtype}")
+    return frame
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Некорректная строка запроса")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Некорректный Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Некорректный Content-Length")
+    if length > ServerConfig.MAX_BODY_BYTES:
+        raise HTTPError(413, f"Тело запроса больше {ServerConfig.MAX_BODY_BYTES} байт")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
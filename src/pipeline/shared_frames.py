@@ -0,0 +1,288 @@
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import PipelineConfig
+from src.pipeline.video_io import get_video_properties, open_video
+
+_POLL_INTERVAL = 0.1
+
+
+class FrameRing:
+    """
+    Кольцо кадров фиксированного размера в общей памяти
+    (multiprocessing.shared_memory) для передачи кадров между процессами
+    без сериализации.
+
+    Между процессами передаётся только номер слота: процесс берёт свободный
+    слот (acquire), пишет в него кадр, передаёт номер слота дальше по
+    обычной очереди, а последняя стадия возвращает слот в кольцо (release).
+    Каждый процесс видит слот как np.ndarray поверх общей памяти, без копий.
+    Если свободных слотов нет, acquire ждёт - это backpressure для
+    процесса-декодера.
+
+    Кольцо передаётся в дочерние процессы как аргумент Process и там
+    подключается к той же памяти; удаляет память (unlink) создавший процесс.
+    """
+
+    def __init__(
+        self,
+        frame_shape: Tuple[int, ...],
+        num_slots: Optional[int] = None,
+        dtype: Any = np.uint8,
+        ctx: Optional[mp.context.BaseContext] = None,
+    ):
+        self.frame_shape = tuple(frame_shape)
+        self.num_slots = num_slots or PipelineConfig.RING_SLOTS
+        self.dtype = np.dtype(dtype)
+
+        slot_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_bytes * self.num_slots)
+        self._free = (ctx or mp.get_context("spawn")).Queue()
+        for slot in range(self.num_slots):
+            self._free.put(slot)
+        self._attach_views()
+
+    def __getstate__(self) -> dict:
+        return {
+            "frame_shape": self.frame_shape,
+            "num_slots": self.num_slots,
+            "dtype": self.dtype.str,
+            "name": self._shm.name,
+            "free": self._free,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.frame_shape = state["frame_shape"]
+        self.num_slots = state["num_slots"]
+        self.dtype = np.dtype(state["dtype"])
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._free = state["free"]
+        self._attach_views()
+
+    def _attach_views(self) -> None:
+        self._frames = np.ndarray(
+            (self.num_slots,) + self.frame_shape, dtype=self.dtype, buffer=self._shm.buf
+        )
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """
+        Свободный слот для записи кадра
+
+        Args:
+            timeout: сколько секунд ждать свободный слот (None - без ограничения)
+
+        Returns:
+            int: номер слота
+
+        Raises:
+            TimeoutError: свободный слот не появился за timeout
+        """
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Нет свободных слотов кольца кадров за {timeout} с") from None
+
+    def frame(self, slot: int) -> np.ndarray:
+        """
+        Кадр слота - view на общую память (запись в него видна всем процессам)
+
+        Args:
+            slot: номер слота
+
+        Returns:
+            np.ndarray: кадр формы frame_shape
+        """
+        return self._frames[slot]
+
+    def put(self, frame: np.ndarray, timeout: Optional[float] = None) -> int:
+        """
+        Копирование кадра в свободный слот
+
+        Args:
+            frame: кадр формы frame_shape
+            timeout: сколько секунд ждать свободный слот
+
+        Returns:
+            int: номер слота
+        """
+        slot = self.acquire(timeout)
+        np.copyto(self._frames[slot], frame)
+        return slot
+
+    def release(self, slot: int) -> None:
+        """
+        Возврат слота в кольцо, когда кадр больше не нужен
+
+        Args:
+            slot: номер слота
+        """
+        self._free.put(slot)
+
+    def close(self) -> None:
+        """Отключение от общей памяти в текущем процессе (views кадров становятся недействительны)."""
+        self._frames = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Удаление общей памяти (вызывается создавшим кольцо процессом после close)."""
+        self._shm.unlink()
+
+
+class _StageError:
+    """Ошибка процесса конвейера, передаваемая вниз по очередям вместо кадров."""
+
+    def __init__(self, stage: str, error: BaseException):
+        self.message = f"{stage}: {type(error).__name__}: {error}"
+
+
+def decode_to_ring(
+    video_path: str,
+    ring: FrameRing,
+    out_queue: "mp.Queue",
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> None:
+    """
+    Процесс-декодер: кадры декодируются прямо в слоты кольца
+    (cv2.VideoCapture.read в переданный буфер), в out_queue уходят
+    (номер кадра, слот, None), в конце - None
+
+    Args:
+        video_path: путь до видео
+        ring: кольцо кадров размера кадра видео
+        out_queue: очередь следующей стадии
+        start: номер первого кадра
+        stop: номер кадра, перед которым остановиться (None - до конца видео)
+    """
+    cap = None
+    try:
+        # в видео меньше start кадров - сразу конец
+        cap, seeked = open_video(video_path, start)
+
+        index = start
+        while seeked and (stop is None or index < stop):
+            slot = ring.acquire()
+            view = ring.frame(slot)
+            ok, frame = cap.read(view)
+            if not ok:
+                ring.release(slot)
+                break
+            if frame is not view:
+                # декодер не смог писать в переданный буфер (другой размер или формат кадра)
+                np.copyto(view, frame)
+            out_queue.put((index, slot, None))
+            index += 1
+        out_queue.put(None)
+    except BaseException as e:
+        out_queue.put(_StageError("decode", e))
+    finally:
+        if cap is not None:
+            cap.release()
+        ring.close()
+
+
+def _run_ring_stage(
+    name: str,
+    func: Callable[[np.ndarray, Any], Any],
+    ring: FrameRing,
+    in_queue: "mp.Queue",
+    out_queue: "mp.Queue",
+) -> None:
+    """Процесс стадии: func(кадр слота, результат предыдущей стадии) для каждого кадра."""
+    try:
+        while True:
+            item = in_queue.get()
+            if item is None or isinstance(item, _StageError):
+                out_queue.put(item)
+                return
+            index, slot, payload = item
+            out_queue.put((index, slot, func(ring.frame(slot), payload)))
+    except BaseException as e:
+        out_queue.put(_StageError(name, e))
+    finally:
+        ring.close()
+
+
+def run_ring_pipeline(
+    video_path: str,
+    stages: List[Tuple[str, Callable[[np.ndarray, Any], Any]]],
+    sink: Callable[[np.ndarray, Any], None],
+    num_slots: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    frame_range: Optional[Tuple[int, Optional[int]]] = None,
+) -> int:
+    """
+    Конвейер из процессов поверх FrameRing: процесс-декодер пишет кадры в
+    слоты, каждая стадия - отдельный процесс, который получает view кадра
+    и результат предыдущей стадии, а sink в текущем процессе получает
+    кадр и результат последней стадии, после чего слот возвращается
+    в кольцо. Между процессами передаются только (номер кадра, слот,
+    результат стадии).
+
+    Стадии могут менять кадр на месте (например, отрисовка детекций) -
+    изменения видны следующим стадиям без копирования. Функции стадий
+    передаются в процессы через pickle, поэтому должны быть функциями
+    модуля или picklable-объектами.
+
+    Args:
+        video_path: путь до видео
+        stages: (имя, функция кадр, результат -> результат) по порядку
+        sink: приёмник (кадр, результат последней стадии) в порядке кадров
+        num_slots: число слотов кольца (по умолчанию PipelineConfig.RING_SLOTS)
+        queue_size: размер очередей между процессами (по умолчанию PipelineConfig.QUEUE_SIZE)
+        frame_range: (start, stop) - обработать только кадры start..stop-1
+
+    Returns:
+        int: количество кадров, дошедших до sink
+    """
+    w, h, _ = get_video_properties(video_path)
+    ctx = mp.get_context("spawn")
+    ring = FrameRing((h, w, 3), num_slots, ctx=ctx)
+    queues = [ctx.Queue(maxsize=queue_size or PipelineConfig.QUEUE_SIZE) for _ in range(len(stages) + 1)]
+
+    processes = [
+        ctx.Process(target=decode_to_ring, args=(video_path, ring, queues[0], *(frame_range or ())), name="decode")
+    ]
+    for i, (name, func) in enumerate(stages):
+        processes.append(
+            ctx.Process(target=_run_ring_stage, args=(name, func, ring, queues[i], queues[i + 1]), name=name)
+        )
+
+    count = 0
+    try:
+        for process in processes:
+            process.start()
+        while True:
+            item = _get_alive(queues[-1], processes)
+            if item is None:
+                break
+            if isinstance(item, _StageError):
+                raise RuntimeError(f"Ошибка в процессе конвейера {item.message}")
+            _, slot, payload = item
+            sink(ring.frame(slot), payload)
+            ring.release(slot)
+            count += 1
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        ring.close()
+        ring.unlink()
+    return count
+
+
+def _get_alive(q: "mp.Queue", processes: List[mp.Process]) -> Any:
+    """Чтение из очереди с проверкой, что процессы конвейера не упали без сообщения."""
+    while True:
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            dead = [p for p in processes if p.exitcode not in (None, 0)]
+            if dead:
+                raise RuntimeError(f"Процесс {dead[0].name} завершился с кодом {dead[0].exitcode}")
@@ -0,0 +1,122 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+_END = object()
+_POLL_INTERVAL = 0.1
+
+
+class StagePipeline:
+    """
+    Конвейер из потоков, соединённых ограниченными очередями.
+
+    Источник, каждая стадия и приёмник работают в отдельных потоках.
+    Каждая стадия обрабатывается одним потоком, поэтому порядок кадров
+    сохраняется, а ограниченный размер очередей даёт backpressure:
+    быстрая стадия блокируется, пока медленная не освободит место.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: List[Tuple[str, Callable[[Any], Any]]],
+        sink: Callable[[Any], None],
+        queue_size: int = 4,
+    ):
+        self.source = source
+        self.stages = stages
+        self.sink = sink
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+        self._count = 0
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def run(self) -> int:
+        """
+        Запуск конвейера и ожидание его завершения
+
+        Returns:
+            int: количество элементов, дошедших до приёмника
+        """
+        threads = [threading.Thread(target=self._run_source, name="decode", daemon=True)]
+        for i, (name, func) in enumerate(self.stages):
+            threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(func, self.queues[i], self.queues[i + 1]),
+                    name=name,
+                    daemon=True,
+                )
+            )
+        threads.append(threading.Thread(target=self._run_sink, name="encode", daemon=True))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        return self._count
+
+    def _fail(self, error: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _run_source(self) -> None:
+        try:
+            for item in self.source:
+                if not self._put(self.queues[0], item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self.queues[0], _END)
+
+    def _run_stage(
+        self, func: Callable[[Any], Any], in_queue: queue.Queue, out_queue: queue.Queue
+    ) -> None:
+        try:
+            while True:
+                item = self._get(in_queue)
+                if item is _END:
+                    break
+                if not self._put(out_queue, func(item)):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(out_queue, _END)
+
+    def _run_sink(self) -> None:
+        try:
+            while True:
+                item = self._get(self.queues[-1])
+                if item is _END:
+                    break
+                self.sink(item)
+                self._count += 1
+        except BaseException as e:
+            self._fail(e)
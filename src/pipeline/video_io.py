@@ -0,0 +1,333 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import cv2
+import numpy as np
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from config.settings import VideoWriterConfig
+
+
+def get_video_properties(video_path: str) -> Tuple[int, int, int]:
+    """
+    Чтение параметров видео
+
+    Args:
+        video_path: путь до видео
+
+    Returns:
+        Tuple[int, int, int]: ширина, высота и fps видео
+    """
+    cap = cv2.VideoCapture(video_path)
+    w, h, fps = (
+        int(cap.get(x))
+        for x in (
+            cv2.CAP_PROP_FRAME_WIDTH,
+            cv2.CAP_PROP_FRAME_HEIGHT,
+            cv2.CAP_PROP_FPS,
+        )
+    )
+    cap.release()
+    return w, h, fps
+
+
+def get_frame_count(video_path: str) -> int:
+    """
+    Количество кадров в видео по метаданным контейнера (0, если неизвестно)
+
+    Args:
+        video_path: путь до видео
+
+    Returns:
+        int: количество кадров
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_count = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+    cap.release()
+    return frame_count
+
+
+def open_video(video_path: str, start: int = 0) -> Tuple[cv2.VideoCapture, bool]:
+    """
+    Открытие видео с перемоткой к кадру start
+
+    Перемотка FFmpeg-бэкенда OpenCV идёт к ключевому кадру и декодирует до
+    нужного кадра, но на длинных GOP и контейнерах без индекса (MPEG-TS)
+    может остановиться не там или сломать чтение, а CAP_PROP_POS_FRAMES
+    сразу после set просто возвращает запрошенный номер. Поэтому перемотка
+    идёт к кадру start - 1, он декодируется, и позиция проверяется уже
+    после чтения; если она не совпала, видео открывается заново и лишние
+    кадры пропускаются вручную.
+
+    Args:
+        video_path: путь до видео
+        start: номер кадра, который будет прочитан следующим
+
+    Returns:
+        Tuple[cv2.VideoCapture, bool]: открытое видео и False, если в видео
+            меньше start кадров
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Не удалось открыть видео: {video_path}")
+    if start <= 0:
+        return cap, True
+
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start - 1)
+    if cap.grab() and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+        return cap, True
+
+    cap.release()
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(start):
+        if not cap.grab():
+            return cap, False
+    return cap, True
+
+
+def iter_frames(video_path: str, start: int = 0, stop: Optional[int] = None) -> Iterator[np.ndarray]:
+    """
+    Последовательное декодирование кадров видео
+
+    Args:
+        video_path: путь до видео
+        start: номер первого кадра
+        stop: номер кадра, перед которым остановиться (None - до конца видео)
+
+    Yields:
+        np.ndarray: очередной кадр в формате BGR
+    """
+    cap, seeked = open_video(video_path, start)
+    try:
+        if not seeked:
+            return
+
+        index = start
+        while stop is None or index < stop:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def iter_batches(frames: Iterable[np.ndarray], batch_size: int) -> Iterator[List[np.ndarray]]:
+    """
+    Группировка кадров в батчи с сохранением порядка
+
+    Args:
+        frames: последовательность кадров
+        batch_size: размер батча (последний батч может быть меньше)
+
+    Yields:
+        List[np.ndarray]: очередной батч кадров
+    """
+    batch = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class OpenCVVideoWriter:
+    """
+    Запись видео через cv2.VideoWriter (кодирование в вызывающем потоке).
+    Запасной вариант, когда ffmpeg не установлен.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        size: Tuple[int, int],
+        output_size: Optional[Tuple[int, int]] = None,
+    ):
+        self.size = tuple(size)
+        self.output_size = tuple(output_size or size)
+        self._writer = cv2.VideoWriter(
+            output_path, cv2.VideoWriter_fourcc(*VideoWriterConfig.FOURCC), fps, self.output_size
+        )
+
+    def write(self, frame: np.ndarray) -> None:
+        if self.output_size != self.size:
+            frame = cv2.resize(frame, self.output_size, interpolation=cv2.INTER_AREA)
+        self._writer.write(frame)
+
+    def release(self) -> None:
+        self._writer.release()
+
+
+class FFmpegVideoWriter:
+    """
+    Запись видео через процесс ffmpeg: кадры BGR пишутся в stdin как
+    rawvideo прямо из буфера кадра (без копирования для непрерывных
+    массивов), а кодирование и уменьшение размера идут в отдельном
+    процессе и собственных потоках ffmpeg, не блокируя инференс.
+
+    Стороны итогового видео округляются вниз до чётных: yuv420p хранит
+    цветность с шагом 2 пикселя, и libx264 не кодирует кадры нечётного
+    размера.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        size: Tuple[int, int],
+        output_size: Optional[Tuple[int, int]] = None,
+        codec: Optional[str] = None,
+        preset: Optional[str] = None,
+        crf: Optional[int] = None,
+        threads: Optional[int] = None,
+        binary: Optional[str] = None,
+    ):
+        self.size = tuple(size)
+        self.output_size = tuple(max(2, side - side % 2) for side in (output_size or size))
+        w, h = self.size
+
+        command = [
+            binary or VideoWriterConfig.FFMPEG_BINARY,
+            "-y", "-loglevel", "error", "-nostats",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}",
+            "-r", str(fps if fps and fps > 0 else 25), "-i", "-",
+        ]
+        if self.output_size != self.size:
+            command += ["-vf", "scale={}:{}".format(*self.output_size)]
+        command += [
+            "-c:v", codec or VideoWriterConfig.CODEC,
+            "-preset", preset or VideoWriterConfig.PRESET,
+            "-crf", str(VideoWriterConfig.CRF if crf is None else crf),
+            "-threads", str(VideoWriterConfig.THREADS if threads is None else threads),
+            "-pix_fmt", "yuv420p",
+            output_path,
+        ]
+
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr
+        )
+
+    def write(self, frame: np.ndarray) -> None:
+        """
+        Передача кадра в ffmpeg
+
+        Args:
+            frame: кадр BGR размера size в uint8
+        """
+        if frame.shape[1::-1] != self.size or frame.dtype != np.uint8 or frame.ndim != 3:
+            raise ValueError(
+                f"Кадр {frame.shape} {frame.dtype} не совпадает с размером видео {self.size}"
+            )
+        try:
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError(f"ffmpeg завершился с ошибкой: {self._error_text()}")
+
+    def release(self) -> None:
+        """Завершение записи: ожидание, пока ffmpeg докодирует оставшиеся кадры."""
+        if self._process.stdin.closed:
+            return
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self._process.wait()
+        error = self._error_text()
+        self._stderr.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg завершился с кодом {returncode}: {error}")
+
+    def _error_text(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()
+
+
+VideoWriter = Union[OpenCVVideoWriter, FFmpegVideoWriter]
+
+
+def create_video_writer(
+    output_path: str,
+    fps: int,
+    size: Tuple[int, int],
+    backend: Optional[str] = None,
+    output_size: Optional[Tuple[int, int]] = None,
+) -> VideoWriter:
+    """
+    Создание writer для итогового видео
+
+    Args:
+        output_path: путь сохранения видео
+        fps: частота кадров
+        size: (ширина, высота) кадра
+        backend: "ffmpeg", "opencv" или "auto" (по умолчанию VideoWriterConfig.BACKEND);
+            "auto" при установленном ffmpeg кодирует VideoWriterConfig.CODEC
+            (libx264), а не VideoWriterConfig.FOURCC OpenCV
+        output_size: (ширина, высота) итогового видео
+            (по умолчанию VideoWriterConfig.OUTPUT_SIZE или size)
+
+    Returns:
+        VideoWriter: writer итогового видео с методами write(frame) и release()
+    """
+    backend = backend or VideoWriterConfig.BACKEND
+    output_size = output_size or VideoWriterConfig.OUTPUT_SIZE
+    if backend == "auto":
+        backend = "ffmpeg" if shutil.which(VideoWriterConfig.FFMPEG_BINARY) else "opencv"
+
+    if backend == "ffmpeg":
+        return FFmpegVideoWriter(output_path, fps, size, output_size)
+    if backend == "opencv":
+        return OpenCVVideoWriter(output_path, fps, size, output_size)
+    raise ValueError(f"Неизвестный backend записи видео: {backend}")
+
+
+def concat_videos(paths: List[str], output_path: str, backend: str = "auto") -> None:
+    """
+    Склейка видео одинакового формата в одно по порядку
+
+    ffmpeg склеивает без перекодирования (concat demuxer, -c copy),
+    OpenCV - декодирует и заново кодирует кадры.
+
+    Args:
+        paths: пути до частей
+        output_path: путь итогового видео
+        backend: "ffmpeg", "opencv" или "auto" (ffmpeg, если установлен)
+    """
+    if backend == "auto":
+        backend = "ffmpeg" if shutil.which(VideoWriterConfig.FFMPEG_BINARY) else "opencv"
+
+    if backend == "ffmpeg":
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as concat_list:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                concat_list.write(f"file '{escaped}'\n")
+            concat_list.flush()
+            completed = subprocess.run(
+                [
+                    VideoWriterConfig.FFMPEG_BINARY, "-y", "-loglevel", "error", "-nostats",
+                    "-f", "concat", "-safe", "0", "-i", concat_list.name, "-c", "copy", output_path,
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        if completed.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg завершился с кодом {completed.returncode}: {completed.stderr.decode(errors='replace').strip()}"
+            )
+        return
+    if backend != "opencv":
+        raise ValueError(f"Неизвестный backend записи видео: {backend}")
+
+    w, h, fps = get_video_properties(paths[0])
+    writer = OpenCVVideoWriter(output_path, fps, (w, h))
+    try:
+        for path in paths:
+            for frame in iter_frames(path):
+                writer.write(frame)
+    finally:
+        writer.release()
@@ -0,0 +1,211 @@
+import importlib.util
+import itertools
+import multiprocessing as mp
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.settings import AutotuneConfig
+from src.utils.host_profile import save_host_profile, set_thread_counts
+from src.utils.profiling import latency_summary
+
+_BACKEND_PACKAGES = {"pt": "torch", "onnx": "onnxruntime", "ort": "onnxruntime", "openvino": "openvino"}
+
+
+def available_backends(backends: Sequence[str]) -> List[str]:
+    """Форматы модели, для которых на машине установлен runtime."""
+    return [b for b in backends if importlib.util.find_spec(_BACKEND_PACKAGES[b]) is not None]
+
+
+def thread_options(cpu_count: Optional[int] = None) -> List[int]:
+    """Варианты числа потоков по умолчанию: 1, половина и все ядра."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return sorted({1, max(cpu_count // 2, 1), cpu_count})
+
+
+def candidate_grid(
+    backends: Sequence[str],
+    img_sizes: Sequence[int],
+    batch_sizes: Sequence[int],
+    threads: Sequence[int],
+    interop_threads: Sequence[int],
+) -> List[Dict[str, Any]]:
+    """
+    Все сочетания параметров для перебора (потоки OpenCV равны intra-op потокам torch)
+
+    Returns:
+        List[Dict[str, Any]]: конфигурации в формате профиля хоста
+    """
+    return [
+        {
+            "backend": backend,
+            "img_size": img_size,
+            "batch_size": batch_size,
+            "threads": n_threads,
+            "interop_threads": n_interop,
+            "opencv_threads": n_threads,
+        }
+        for backend, img_size, batch_size, n_threads, n_interop in itertools.product(
+            backends, img_sizes, batch_sizes, threads, interop_threads
+        )
+    ]
+
+
+def measure_candidate(
+    candidate: Dict[str, Any], sample_path: str, sample_frames: int, warmup_frames: int
+) -> Dict[str, Any]:
+    """
+    Замер одной конфигурации на кадрах sample_path
+
+    Вызывается в отдельном процессе: число потоков torch можно задать
+    только до начала работы, а пул потоков сессии ONNX Runtime создаётся
+    при загрузке модели.
+
+    Args:
+        candidate: конфигурация (см. candidate_grid)
+        sample_path: путь до видео для замера
+        sample_frames: количество замеряемых кадров
+        warmup_frames: количество кадров для разогрева
+
+    Returns:
+        Dict[str, Any]: конфигурация, fps, latency (сводка задержек вызова
+            детектора на батч) и error
+    """
+    set_thread_counts(candidate["threads"], candidate["interop_threads"], candidate["opencv_threads"])
+
+    from src.models.yolo_detector import YOLODetector
+    from src.pipeline.video_io import iter_batches, iter_frames
+
+    try:
+        frames = list(itertools.islice(iter_frames(sample_path), warmup_frames + sample_frames))
+        if len(frames) <= warmup_frames:
+            raise ValueError(f"В видео {sample_path} меньше {warmup_frames + 1} кадров")
+
+        batch_size = candidate["batch_size"]
+        detector = YOLODetector(
+            batch_size, int8=False, img_size=candidate["img_size"], backend=candidate["backend"]
+        )
+        for batch in iter_batches(frames[:warmup_frames], batch_size):
+            detector.detect(batch)
+
+        latencies_ms = []
+        for batch in iter_batches(frames[warmup_frames:], batch_size):
+            start_time = time.perf_counter()
+            detector.detect(batch)
+            latencies_ms.append((time.perf_counter() - start_time) * 1000)
+
+        measured = len(frames) - warmup_frames
+        return {
+            **candidate,
+            "fps": measured / (sum(latencies_ms) / 1000),
+            "latency": latency_summary(latencies_ms),
+            "error": None,
+        }
+    except Exception as e:
+        return {**candidate, "fps": 0.0, "latency": latency_summary([]), "error": f"{type(e).__name__}: {e}"}
+
+
+def select_profile(results: List[Dict[str, Any]], latency_target_ms: float) -> Optional[Dict[str, Any]]:
+    """
+    Выбор конфигурации: среди укладывающихся в latency_target_ms по p95
+    берётся наибольший IMG_SIZE (он определяет качество детекции), а для
+    него - самая быстрая конфигурация. Если цель не достигнута ни одной
+    конфигурацией, берётся конфигурация с наименьшей задержкой
+
+    Args:
+        results: результаты measure_candidate
+        latency_target_ms: цель по p95 задержки вызова детектора
+
+    Returns:
+        Optional[Dict[str, Any]]: результат выбранной конфигурации или None,
+            если все замеры завершились ошибкой
+    """
+    valid = [r for r in results if r["error"] is None]
+    if not valid:
+        return None
+
+    meeting = [r for r in valid if r["latency"]["p95_ms"] <= latency_target_ms]
+    if not meeting:
+        return min(valid, key=lambda r: r["latency"]["p95_ms"])
+    return max(meeting, key=lambda r: (r["img_size"], r["fps"]))
+
+
+def autotune(
+    sample_path: str,
+    latency_target_ms: Optional[float] = None,
+    profile_path: Optional[str] = None,
+    backends: Optional[Sequence[str]] = None,
+    img_sizes: Optional[Sequence[int]] = None,
+    batch_sizes: Optional[Sequence[int]] = None,
+    threads: Optional[Sequence[int]] = None,
+    interop_threads: Optional[Sequence[int]] = None,
+    sample_frames: Optional[int] = None,
+    warmup_frames: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Подбор формата модели, IMG_SIZE, батча и числа потоков на этой машине
+    и запись профиля хоста, который main.py применяет с флагом --host_profile
+    (см. src/utils/host_profile.py)
+
+    Каждая конфигурация замеряется в новом процессе на кадрах sample_path.
+    Параметры перебора по умолчанию берутся из AutotuneConfig.
+
+    Args:
+        sample_path: путь до записанного видео с типичной сценой
+        latency_target_ms: цель по p95 задержки вызова детектора
+        profile_path: путь сохранения профиля
+
+    Returns:
+        Optional[Dict[str, Any]]: выбранный профиль или None, если ни одна
+            конфигурация не запустилась
+    """
+    latency_target_ms = latency_target_ms or AutotuneConfig.LATENCY_TARGET_MS
+    candidates = candidate_grid(
+        available_backends(backends or AutotuneConfig.BACKENDS),
+        img_sizes or AutotuneConfig.IMG_SIZES,
+        batch_sizes or AutotuneConfig.BATCH_SIZES,
+        threads or AutotuneConfig.THREADS or thread_options(),
+        interop_threads or AutotuneConfig.INTEROP_THREADS,
+    )
+    sample_frames = sample_frames or AutotuneConfig.SAMPLE_FRAMES
+    warmup_frames = AutotuneConfig.WARMUP_FRAMES if warmup_frames is None else warmup_frames
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for i, candidate in enumerate(candidates, 1):
+        with ctx.Pool(1) as pool:
+            result = pool.apply(measure_candidate, (candidate, sample_path, sample_frames, warmup_frames))
+        results.append(result)
+        _print_result(i, len(candidates), result)
+
+    best = select_profile(results, latency_target_ms)
+    if best is None:
+        return None
+
+    profile = {key: best[key] for key in candidates[0]}
+    save_host_profile(
+        profile,
+        {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sample": sample_path,
+            "latency_target_ms": latency_target_ms,
+            "meets_target": best["latency"]["p95_ms"] <= latency_target_ms,
+            "results": results,
+        },
+        profile_path,
+    )
+    return profile
+
+
+def _print_result(index: int, total: int, result: Dict[str, Any]) -> None:
+    config = (
+        f"{result['backend']:>8} imgsz {result['img_size']:>4} batch {result['batch_size']:>2} "
+        f"threads {result['threads']:>2}/{result['interop_threads']}"
+    )
+    if result["error"] is not None:
+        print(f"[{index}/{total}] {config}: ошибка {result['error']}")
+        return
+    print(
+        f"[{index}/{total}] {config}: {result['fps']:6.1f} FPS, "
+        f"p95 {result['latency']['p95_ms']:6.1f} мс"
+    )
@@ -0,0 +1,182 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Попарный IoU двух наборов bounding boxes
+
+    Args:
+        boxes_a: boxes формы (N, 4) в формате xyxy
+        boxes_b: boxes формы (M, 4) в формате xyxy
+
+    Returns:
+        np.ndarray: матрица IoU формы (N, M)
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).clip(0).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).clip(0).prod(axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return intersection / np.maximum(union, 1e-9)
+
+
+def box_ios(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Попарная доля пересечения от площади меньшего box (intersection over smaller)
+
+    В отличие от IoU, близка к 1, когда один box почти целиком лежит
+    в другом - например, обрезанный границей тайла box внутри полного.
+
+    Args:
+        boxes_a: boxes формы (N, 4) в формате xyxy
+        boxes_b: boxes формы (M, 4) в формате xyxy
+
+    Returns:
+        np.ndarray: матрица формы (N, M)
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2:] - boxes_a[:, :2]).clip(0).prod(axis=1)
+    area_b = (boxes_b[:, 2:] - boxes_b[:, :2]).clip(0).prod(axis=1)
+    smaller = np.minimum(area_a[:, None], area_b[None, :])
+
+    return intersection / np.maximum(smaller, 1e-9)
+
+
+def nms(
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    cls_ids: np.ndarray,
+    threshold: float,
+    metric: str = "iou",
+    max_det: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Жадное подавление немаксимумов с учётом класса
+
+    Перекрытия считаются только между очередным оставленным box и ещё не
+    подавленными, поэтому память линейна по числу кандидатов, а число
+    итераций равно числу оставленных boxes.
+
+    Args:
+        xyxy: boxes формы (N, 4)
+        scores: уверенности формы (N,)
+        cls_ids: классы формы (N,)
+        threshold: box подавляется, если его перекрытие с более
+            уверенным box того же класса больше threshold (как в
+            torchvision.ops.nms)
+        metric: "iou" или "ios" (см. box_ios)
+        max_det: сколько boxes оставить не больше (None - без ограничения)
+
+    Returns:
+        np.ndarray: индексы оставленных boxes по убыванию уверенности
+    """
+    overlap_fn = {"iou": box_iou, "ios": box_ios}[metric]
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)[order]
+    cls_ids = np.asarray(cls_ids).reshape(-1)[order]
+
+    rest = np.arange(len(order))
+    keep = []
+    while len(rest) and (max_det is None or len(keep) < max_det):
+        i, rest = rest[0], rest[1:]
+        keep.append(i)
+        same_cls = cls_ids[rest] == cls_ids[i]
+        rest = rest[~same_cls | (overlap_fn(xyxy[i], xyxy[rest])[0] <= threshold)]
+
+    return order[np.array(keep, dtype=np.intp)]
+
+
+def nmm(
+    xyxy: np.ndarray,
+    scores: np.ndarray,
+    cls_ids: np.ndarray,
+    threshold: float,
+    metric: str = "ios",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Жадное слияние немаксимумов (NMM) с учётом класса: как nms, но
+    оставленный box заменяется объединением с boxes, которые он подавил.
+    Обрезанная границей тайла часть объекта не вытесняет полный box,
+    даже если её уверенность выше.
+
+    Args:
+        xyxy: boxes формы (N, 4)
+        scores: уверенности формы (N,)
+        cls_ids: классы формы (N,)
+        threshold: box сливается с более уверенным box того же класса,
+            если их перекрытие больше threshold
+        metric: "iou" или "ios" (см. box_ios)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: индексы оставленных boxes по убыванию
+            уверенности и объединённые boxes формы (M, 4)
+    """
+    overlap_fn = {"iou": box_iou, "ios": box_ios}[metric]
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)[order]
+    cls_ids = np.asarray(cls_ids).reshape(-1)[order]
+
+    rest = np.arange(len(order))
+    keep, merged = [], []
+    while len(rest):
+        i, rest = rest[0], rest[1:]
+        in_group = (cls_ids[rest] == cls_ids[i]) & (overlap_fn(xyxy[i], xyxy[rest])[0] > threshold)
+        group = xyxy[np.append(i, rest[in_group])]
+        rest = rest[~in_group]
+        keep.append(i)
+        merged.append(np.concatenate([group[:, :2].min(axis=0), group[:, 2:].max(axis=0)]))
+
+    return order[np.array(keep, dtype=np.intp)], np.array(merged, dtype=np.float32).reshape(-1, 4)
+
+
+def match_detections(
+    ref_xyxy: np.ndarray,
+    ref_cls: np.ndarray,
+    xyxy: np.ndarray,
+    cls: np.ndarray,
+    iou_threshold: float = 0.5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Жадное сопоставление детекций с эталонными (по убыванию IoU, с учётом класса)
+
+    Args:
+        ref_xyxy: эталонные boxes формы (N, 4)
+        ref_cls: классы эталонных boxes формы (N,)
+        xyxy: сравниваемые boxes формы (M, 4)
+        cls: классы сравниваемых boxes формы (M,)
+        iou_threshold: минимальный IoU для совпадения
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: индексы совпавших эталонных и
+            сравниваемых boxes
+    """
+    iou = box_iou(ref_xyxy, xyxy)
+    iou[np.asarray(ref_cls)[:, None] != np.asarray(cls)[None, :]] = 0.0
+
+    ref_idx, idx = np.nonzero(iou >= iou_threshold)
+    order = np.argsort(-iou[ref_idx, idx], kind="stable")
+
+    matched_ref, matched = [], []
+    used_ref, used = set(), set()
+    for i, j in zip(ref_idx[order].tolist(), idx[order].tolist()):
+        if i in used_ref or j in used:
+            continue
+        used_ref.add(i)
+        used.add(j)
+        matched_ref.append(i)
+        matched.append(j)
+
+    return np.array(matched_ref, dtype=np.intp), np.array(matched, dtype=np.intp)
@@ -0,0 +1,217 @@
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.boxes import box_iou, match_detections
+
+IOU_THRESHOLDS = np.round(np.arange(0.5, 0.96, 0.05), 2)
+RECALL_POINTS = np.linspace(0.0, 1.0, 101)
+
+# (boxes (N, 4), классы (N,), расстояния (N,) в метрах, nan - расстояние не размечено)
+FrameLabels = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def load_labels(path: str, names: Dict[int, str]) -> Dict[int, FrameLabels]:
+    """
+    Загрузка разметки клипа из JSONL: одна строка на размеченный кадр в том
+    же виде, что и результаты headless-режима -
+    {"frame": 12, "boxes": [[x1, y1, x2, y2], ...], "cls": ["person", ...], "distance": [7.5, ...]}
+
+    Классы задаются именами или id модели, расстояние может быть null или
+    отсутствовать. Кадры без строки в разметке в оценку не входят.
+
+    Args:
+        path: путь до файла разметки
+        names: имена классов модели по id
+
+    Returns:
+        Dict[int, FrameLabels]: разметка по номеру кадра
+    """
+    ids = {name: cls_id for cls_id, name in names.items()}
+    labels = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            boxes = np.asarray(record.get("boxes", []), dtype=np.float32).reshape(-1, 4)
+            cls = []
+            for value in record.get("cls", []):
+                if isinstance(value, str) and value not in ids:
+                    raise ValueError(f"{path}: класса {value!r} нет среди классов модели")
+                cls.append(ids[value] if isinstance(value, str) else int(value))
+            distance = record.get("distance") or [None] * len(boxes)
+            labels[int(record["frame"])] = (
+                boxes,
+                np.asarray(cls, dtype=np.int32),
+                np.array([np.nan if d is None else d for d in distance], dtype=np.float32),
+            )
+    return labels
+
+
+def match_by_confidence(
+    gt_xyxy: np.ndarray,
+    gt_cls: np.ndarray,
+    xyxy: np.ndarray,
+    cls: np.ndarray,
+    confs: np.ndarray,
+    iou_threshold: float,
+) -> np.ndarray:
+    """
+    Сопоставление детекций кадра с разметкой в порядке убывания уверенности
+    (как в COCO): детекция совпадает с ещё не занятым размеченным box того
+    же класса с наибольшим IoU не меньше iou_threshold
+
+    Args:
+        gt_xyxy: размеченные boxes формы (N, 4)
+        gt_cls: классы размеченных boxes формы (N,)
+        xyxy: boxes детекций формы (M, 4)
+        cls: классы детекций формы (M,)
+        confs: уверенности детекций формы (M,)
+        iou_threshold: минимальный IoU для совпадения
+
+    Returns:
+        np.ndarray: bool формы (M,) - детекция совпала с разметкой
+    """
+    tp = np.zeros(len(xyxy), dtype=bool)
+    if not len(xyxy) or not len(gt_xyxy):
+        return tp
+
+    iou = box_iou(xyxy, gt_xyxy)
+    iou[np.asarray(cls)[:, None] != np.asarray(gt_cls)[None, :]] = 0.0
+    used = np.zeros(len(gt_xyxy), dtype=bool)
+    for i in np.argsort(-np.asarray(confs), kind="stable"):
+        candidates = np.where(used, 0.0, iou[i])
+        j = int(candidates.argmax())
+        if candidates[j] >= iou_threshold:
+            used[j] = True
+            tp[i] = True
+    return tp
+
+
+def average_precision(confs: np.ndarray, tp: np.ndarray, num_gt: int) -> float:
+    """
+    AP одного класса: площадь под огибающей кривой precision-recall по
+    101 точке recall (как в COCO)
+
+    Args:
+        confs: уверенности всех детекций класса
+        tp: совпала ли каждая детекция с разметкой
+        num_gt: число размеченных boxes класса
+
+    Returns:
+        float: AP от 0 до 1
+    """
+    if num_gt == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(confs), kind="stable")
+    tp_cum = np.cumsum(np.asarray(tp, dtype=np.float64)[order])
+    recall = tp_cum / num_gt
+    precision = tp_cum / np.arange(1, len(tp_cum) + 1)
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+
+    # precision при первом достижении каждой точки recall; недостигнутый recall - 0
+    idx = np.searchsorted(recall, RECALL_POINTS, side="left")
+    reached = idx < len(precision)
+    interpolated = np.zeros(len(RECALL_POINTS))
+    interpolated[reached] = precision[idx[reached]]
+    return float(interpolated.mean())
+
+
+def detection_map(
+    predictions: Sequence[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    labels: Sequence[FrameLabels],
+    iou_thresholds: Optional[Sequence[float]] = None,
+) -> Dict[str, float]:
+    """
+    mAP детекций по кадрам: AP усредняется по классам, встречающимся в
+    разметке, затем по порогам IoU
+
+    Args:
+        predictions: (xyxy, cls, confs) детекций по кадрам
+        labels: разметка тех же кадров
+        iou_thresholds: пороги IoU (по умолчанию 0.5:0.95 с шагом 0.05)
+
+    Returns:
+        Dict[str, float]: map50 и map50_95 (map50_95 - среднее по iou_thresholds)
+    """
+    iou_thresholds = IOU_THRESHOLDS if iou_thresholds is None else iou_thresholds
+    all_gt_cls = np.concatenate([gt_cls for _, gt_cls, _ in labels] or [np.zeros(0, dtype=np.int32)])
+    classes, num_gt = np.unique(all_gt_cls, return_counts=True)
+
+    aps = {}
+    for threshold in iou_thresholds:
+        confs: Dict[int, List[np.ndarray]] = {c: [] for c in classes.tolist()}
+        tps: Dict[int, List[np.ndarray]] = {c: [] for c in classes.tolist()}
+        for (xyxy, cls, conf), (gt_xyxy, gt_cls, _) in zip(predictions, labels):
+            tp = match_by_confidence(gt_xyxy, gt_cls, xyxy, cls, conf, threshold)
+            for c in confs:
+                mask = cls == c
+                confs[c].append(conf[mask])
+                tps[c].append(tp[mask])
+        class_aps = [
+            average_precision(np.concatenate(confs[c]), np.concatenate(tps[c]), n)
+            for c, n in zip(classes.tolist(), num_gt.tolist())
+        ]
+        aps[float(threshold)] = float(np.mean(class_aps)) if class_aps else 0.0
+
+    return {
+        "map50": aps.get(0.5, 0.0),
+        "map50_95": float(np.mean(list(aps.values()))) if aps else 0.0,
+    }
+
+
+def distance_error(
+    predictions: Sequence[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    labels: Sequence[FrameLabels],
+    iou_threshold: float = 0.5,
+) -> Dict[str, float]:
+    """
+    Ошибка оценки расстояния на детекциях, совпавших с размеченными
+    boxes, у которых размечено расстояние
+
+    Args:
+        predictions: (xyxy, cls, distances) детекций по кадрам
+        labels: разметка тех же кадров
+        iou_threshold: минимальный IoU для совпадения
+
+    Returns:
+        Dict[str, float]: mae_m (средняя абсолютная ошибка в метрах),
+            rel_error (средняя относительная ошибка) и matched (число пар)
+    """
+    errors, gt_distances = [], []
+    for (xyxy, cls, distances), (gt_xyxy, gt_cls, gt_distance) in zip(predictions, labels):
+        gt_idx, idx = match_detections(gt_xyxy, gt_cls, xyxy, cls, iou_threshold)
+        known = np.isfinite(gt_distance[gt_idx])
+        errors.append(np.abs(distances[idx][known] - gt_distance[gt_idx][known]))
+        gt_distances.append(gt_distance[gt_idx][known])
+
+    errors = np.concatenate(errors) if errors else np.zeros(0)
+    gt_distances = np.concatenate(gt_distances) if gt_distances else np.zeros(0)
+    if not len(errors):
+        return {"mae_m": float("nan"), "rel_error": float("nan"), "matched": 0}
+    return {
+        "mae_m": float(errors.mean()),
+        "rel_error": float(np.mean(errors / np.maximum(gt_distances, 1e-6))),
+        "matched": int(len(errors)),
+    }
+
+
+def pareto_front(points: np.ndarray) -> np.ndarray:
+    """
+    Парето-оптимальные точки при максимизации всех координат (минимизируемые
+    показатели передаются со знаком минус)
+
+    Args:
+        points: массив формы (N, K)
+
+    Returns:
+        np.ndarray: bool формы (N,) - точку не доминирует ни одна другая
+    """
+    points = np.asarray(points, dtype=np.float64)
+    front = np.ones(len(points), dtype=bool)
+    for i, point in enumerate(points):
+        dominated = np.all(points >= point, axis=1) & np.any(points > point, axis=1)
+        front[i] = not dominated.any()
+    return front
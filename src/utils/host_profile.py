@@ -0,0 +1,118 @@
+import json
+import os
+import platform
+from typing import Any, Dict, Optional
+
+from config.settings import AutotuneConfig, ModelConfig, OrtConfig
+
+
+def host_fingerprint() -> Dict[str, Any]:
+    """Параметры машины, для которой подобран профиль."""
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def set_thread_counts(
+    threads: Optional[int] = None,
+    interop_threads: Optional[int] = None,
+    opencv_threads: Optional[int] = None,
+) -> None:
+    """
+    Число потоков torch и OrtEngine (intra-op и inter-op) и OpenCV в текущем процессе
+
+    Inter-op потоки torch можно задать только до первой параллельной
+    операции, поэтому позже они молча не меняются. Потоки OrtEngine
+    применяются к сессиям, созданным после вызова.
+
+    Args:
+        threads: intra-op потоки torch и ONNX Runtime
+        interop_threads: inter-op потоки torch и ONNX Runtime
+        opencv_threads: потоки OpenCV
+    """
+    import cv2
+    import torch
+
+    if opencv_threads:
+        cv2.setNumThreads(opencv_threads)
+    if threads:
+        torch.set_num_threads(threads)
+        OrtConfig.INTRA_OP_THREADS = threads
+    if interop_threads:
+        OrtConfig.INTER_OP_THREADS = interop_threads
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            pass
+
+
+def load_host_profile(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Чтение профиля хоста
+
+    Args:
+        path: путь до профиля (по умолчанию AutotuneConfig.PROFILE_PATH)
+
+    Returns:
+        Optional[Dict[str, Any]]: профиль (backend, img_size, batch_size, threads,
+            interop_threads, opencv_threads) или None, если файла нет или он
+            подобран для другой машины
+    """
+    path = path or AutotuneConfig.PROFILE_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("host") != host_fingerprint():
+        print(f"Профиль {path} подобран для другой машины ({data.get('host')}), он не применяется")
+        return None
+    return data["profile"]
+
+
+def save_host_profile(profile: Dict[str, Any], report: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Сохранение профиля хоста вместе с результатами замеров
+
+    Args:
+        profile: выбранная конфигурация
+        report: дополнительные данные (цель по задержке, замеры всех конфигураций)
+        path: путь до профиля (по умолчанию AutotuneConfig.PROFILE_PATH)
+
+    Returns:
+        str: путь до профиля
+    """
+    path = path or AutotuneConfig.PROFILE_PATH
+    with open(path, "w") as f:
+        json.dump({"host": host_fingerprint(), "profile": profile, **report}, f, indent=2)
+    return path
+
+
+def apply_host_profile(path: Optional[str] = None, threads: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Применение профиля хоста: формат модели, IMG_SIZE и BATCH_SIZE
+    становятся значениями ModelConfig по умолчанию (явные аргументы
+    YOLODetector и VideoProcessor их по-прежнему переопределяют), и
+    задаётся число потоков. Вызывается явно (main.py --host_profile),
+    процессы пула получают настройки модели от родительского процесса.
+
+    Args:
+        path: путь до профиля (по умолчанию AutotuneConfig.PROFILE_PATH)
+        threads: задать число потоков из профиля
+
+    Returns:
+        Optional[Dict[str, Any]]: применённый профиль или None
+    """
+    profile = load_host_profile(path)
+    if profile is None:
+        return None
+
+    ModelConfig.BACKEND = profile["backend"]
+    ModelConfig.IMG_SIZE = profile["img_size"]
+    ModelConfig.BATCH_SIZE = profile["batch_size"]
+    if threads:
+        set_thread_counts(profile["threads"], profile["interop_threads"], profile["opencv_threads"])
+    return profile
+
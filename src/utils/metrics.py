@@ -0,0 +1,318 @@
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from config.settings import MetricsConfig
+
+
+class _Histogram:
+    """Гистограмма с фиксированными границами корзин (как в Prometheus)."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float, count: int = 1) -> None:
+        self.counts[bisect_left(self.bounds, value)] += count
+        self.total += value * count
+        self.count += count
+
+    def cumulative(self) -> List[int]:
+        result, running = [], 0
+        for c in self.counts:
+            running += c
+            result.append(running)
+        return result
+
+
+class PipelineMetrics:
+    """
+    Метрики пайплайна обработки: задержки стадий, счётчики кадров,
+    глубины очередей и гистограмма числа объектов на кадр.
+
+    Запись метрики - несколько арифметических операций под блокировкой,
+    поэтому метрики можно не выключать в production. Каждые
+    export_every кадров (и по завершении обработки) снимок метрик
+    передаётся в зарегистрированные callbacks и, если задан
+    textfile_path, записывается в Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        prefix: Optional[str] = None,
+        export_every: Optional[int] = None,
+        textfile_path: Optional[str] = None,
+    ):
+        self.prefix = prefix or MetricsConfig.PREFIX
+        self.export_every = export_every or MetricsConfig.EXPORT_EVERY
+        self.textfile_path = textfile_path
+
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[Dict], None]] = []
+        self._stages: Dict[str, _Histogram] = {}
+        self._objects = _Histogram(MetricsConfig.OBJECTS_BUCKETS)
+        self._queue_depths: Dict[str, int] = {}
+        self._frames = 0
+        self._dropped = 0
+        self._detector_runs = 0
+        self._reused = 0
+        self._input_size: Optional[int] = None
+        self._input_size_changes = 0
+        self._next_export = self.export_every
+
+    def add_callback(self, callback: Callable[[Dict], None]) -> None:
+        """
+        Регистрация callback, получающего снимок метрик (см. snapshot)
+
+        Args:
+            callback: функция от словаря со снимком метрик
+        """
+        self._callbacks.append(callback)
+
+    def observe(self, stage: str, seconds: float, count: int = 1) -> None:
+        """
+        Замер задержки стадии
+
+        Args:
+            stage: имя стадии
+            seconds: задержка на один кадр в секундах
+            count: на скольких кадрах наблюдалась эта задержка (для батчей)
+        """
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = _Histogram(
+                    [ms / 1000 for ms in MetricsConfig.LATENCY_BUCKETS_MS]
+                )
+            histogram.observe(seconds, count)
+
+    def observe_objects(self, counts: Iterable[int]) -> None:
+        """
+        Числа объектов на обработанных кадрах
+
+        Args:
+            counts: число объектов на каждом кадре
+        """
+        with self._lock:
+            for count in counts:
+                self._objects.observe(count)
+
+    def add_detector_runs(self, frames: int) -> None:
+        """Учёт кадров, на которых запускался детектор."""
+        with self._lock:
+            self._detector_runs += frames
+
+    def add_reused(self, frames: int) -> None:
+        """Учёт кадров, на которых переиспользованы детекции предыдущего кадра."""
+        with self._lock:
+            self._reused += frames
+
+    def add_dropped(self, frames: int = 1) -> None:
+        """Учёт кадров, пропущенных без обработки."""
+        with self._lock:
+            self._dropped += frames
+
+    def set_queue_depths(self, depths: Dict[str, int]) -> None:
+        """
+        Текущие глубины очередей между стадиями
+
+        Args:
+            depths: число элементов в очереди перед каждой стадией
+        """
+        with self._lock:
+            self._queue_depths.update(depths)
+
+    def set_input_size(self, img_size: int) -> None:
+        """
+        Текущий размер входа модели (режим adaptive, см. ResolutionController)
+
+        Args:
+            img_size: размер стороны входа модели
+        """
+        with self._lock:
+            if self._input_size is not None and img_size != self._input_size:
+                self._input_size_changes += 1
+            self._input_size = img_size
+
+    def add_frames(self, frames: int) -> None:
+        """
+        Учёт полностью обработанных кадров; каждые export_every кадров
+        вызывает export
+
+        Args:
+            frames: количество кадров
+        """
+        with self._lock:
+            self._frames += frames
+            due = self._frames >= self._next_export
+            if due:
+                self._next_export = self._frames + self.export_every
+        if due:
+            self.export()
+
+    def snapshot(self) -> Dict:
+        """
+        Снимок метрик
+
+        Returns:
+            Dict: frames, dropped, detector_runs, reused, stages (count, mean_ms и
+                доля времени кадра по каждой стадии), queue_depths,
+                objects_per_frame (mean и счётчики по корзинам), input_size
+                и input_size_changes
+        """
+        with self._lock:
+            stage_totals = {name: h.total for name, h in self._stages.items()}
+            total_time = sum(stage_totals.values())
+            return {
+                "frames": self._frames,
+                "dropped": self._dropped,
+                "detector_runs": self._detector_runs,
+                "reused": self._reused,
+                "stages": {
+                    name: {
+                        "count": h.count,
+                        "mean_ms": h.total / h.count * 1000 if h.count else 0.0,
+                        "share": stage_totals[name] / total_time if total_time else 0.0,
+                    }
+                    for name, h in self._stages.items()
+                },
+                "queue_depths": dict(self._queue_depths),
+                "objects_per_frame": {
+                    "mean": self._objects.total / self._objects.count if self._objects.count else 0.0,
+                    "buckets": dict(zip(
+                        [str(b) for b in self._objects.bounds] + ["+Inf"], self._objects.counts
+                    )),
+                },
+                "input_size": self._input_size,
+                "input_size_changes": self._input_size_changes,
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Метрики в Prometheus text format (версия 0.0.4)
+
+        Returns:
+            str: текст для textfile collector или ответа /metrics
+        """
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_frames_total Frames fully processed.",
+            f"# TYPE {p}_frames_total counter",
+        ]
+        with self._lock:
+            lines.append(f"{p}_frames_total {self._frames}")
+            lines += [
+                f"# HELP {p}_frames_dropped_total Frames dropped without processing.",
+                f"# TYPE {p}_frames_dropped_total counter",
+                f"{p}_frames_dropped_total {self._dropped}",
+                f"# HELP {p}_detector_runs_total Frames the detector was run on.",
+                f"# TYPE {p}_detector_runs_total counter",
+                f"{p}_detector_runs_total {self._detector_runs}",
+                f"# HELP {p}_frames_reused_total Frames that reused the previous detections of a static scene.",
+                f"# TYPE {p}_frames_reused_total counter",
+                f"{p}_frames_reused_total {self._reused}",
+                f"# HELP {p}_queue_depth Items waiting in the queue before a pipeline stage.",
+                f"# TYPE {p}_queue_depth gauge",
+            ]
+            for name, depth in self._queue_depths.items():
+                lines.append(f'{p}_queue_depth{{queue="{name}"}} {depth}')
+            if self._input_size is not None:
+                lines += [
+                    f"# HELP {p}_input_size Current model input size in adaptive mode.",
+                    f"# TYPE {p}_input_size gauge",
+                    f"{p}_input_size {self._input_size}",
+                    f"# HELP {p}_input_size_changes_total Model input size changes in adaptive mode.",
+                    f"# TYPE {p}_input_size_changes_total counter",
+                    f"{p}_input_size_changes_total {self._input_size_changes}",
+                ]
+
+            lines += [
+                f"# HELP {p}_stage_latency_seconds Per-frame latency of a pipeline stage.",
+                f"# TYPE {p}_stage_latency_seconds histogram",
+            ]
+            for name, histogram in self._stages.items():
+                lines += _histogram_lines(f"{p}_stage_latency_seconds", histogram, f'stage="{name}",')
+
+            lines += [
+                f"# HELP {p}_objects_per_frame Objects reported per processed frame.",
+                f"# TYPE {p}_objects_per_frame histogram",
+            ]
+            lines += _histogram_lines(f"{p}_objects_per_frame", self._objects, "")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Атомарная запись метрик в файл (для textfile collector node_exporter)
+
+        Args:
+            path: путь до .prom файла
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def export(self) -> None:
+        """Передача снимка метрик в callbacks и запись textfile_path."""
+        if self._callbacks:
+            snapshot = self.snapshot()
+            for callback in self._callbacks:
+                callback(snapshot)
+        if self.textfile_path:
+            self.write_prometheus(self.textfile_path)
+
+
+def _histogram_lines(name: str, histogram: _Histogram, labels: str) -> List[str]:
+    lines = []
+    for bound, count in zip(histogram.bounds + ["+Inf"], histogram.cumulative()):
+        le = bound if isinstance(bound, str) else f"{bound:g}"
+        lines.append(f'{name}_bucket{{{labels}le="{le}"}} {count}')
+    suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.total:.6f}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def serve_metrics(metrics: PipelineMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Локальный HTTP endpoint /metrics в фоновом потоке
+
+    Args:
+        metrics: метрики пайплайна
+        port: порт (0 - любой свободный, см. server.server_address)
+        host: адрес, на котором слушать
+
+    Returns:
+        ThreadingHTTPServer: запущенный сервер (остановка - server.shutdown())
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
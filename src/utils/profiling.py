@@ -0,0 +1,121 @@
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+import psutil
+
+PERCENTILES = (50, 95, 99)
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """
+    Сводка по задержкам: среднее и перцентили p50/p95/p99
+
+    Args:
+        latencies_ms: задержки в миллисекундах
+
+    Returns:
+        Dict[str, float]: mean_ms, p50_ms, p95_ms, p99_ms (нули, если замеров нет)
+    """
+    latencies_ms = np.asarray(latencies_ms, dtype=np.float64)
+    if latencies_ms.size == 0:
+        return {"mean_ms": 0.0, **{f"p{p}_ms": 0.0 for p in PERCENTILES}}
+
+    summary = {"mean_ms": float(latencies_ms.mean())}
+    for p, value in zip(PERCENTILES, np.percentile(latencies_ms, PERCENTILES)):
+        summary[f"p{p}_ms"] = float(value)
+    return summary
+
+
+def rss_mb() -> float:
+    """Текущий RSS процесса в МБ."""
+    return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
+
+
+class StageTimer:
+    """
+    Замер задержек по стадиям обработки кадра.
+
+    Каждый вход в stage(name) добавляет один замер в миллисекундах,
+    порядок стадий сохраняется в порядке первого замера.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append((time.perf_counter() - start_time) * 1000)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Сводка по каждой стадии
+
+        Returns:
+            Dict[str, Dict[str, float]]: latency_summary по именам стадий
+        """
+        return {name: latency_summary(samples) for name, samples in self.samples.items()}
+
+
+def find_regressions(
+    current: Dict,
+    baseline: Dict,
+    max_regression_pct: float,
+    min_delta_ms: float = 0.5,
+) -> List[str]:
+    """
+    Поиск регрессий относительно сохранённого baseline
+
+    Сравниваются конфигурации, которые есть в обоих отчётах: перцентили
+    задержки каждой стадии и итоговой задержки (рост хуже), fps (падение
+    хуже) и peak_rss_mb (рост хуже). Для задержек изменение меньше
+    min_delta_ms не считается регрессией, чтобы шум на коротких стадиях
+    не давал ложных срабатываний.
+
+    Args:
+        current: отчёт текущего прогона (поле "results")
+        baseline: отчёт baseline (поле "results")
+        max_regression_pct: допустимое ухудшение в процентах
+        min_delta_ms: минимальный абсолютный рост задержки для регрессии
+
+    Returns:
+        List[str]: описания найденных регрессий (пустой, если их нет)
+    """
+    regressions = []
+    limit = 1 + max_regression_pct / 100
+
+    def check(name: str, value: float, reference: float, higher_is_worse: bool = True,
+              min_delta: float = 0.0) -> None:
+        if reference <= 0:
+            return
+        worse = value > reference * limit if higher_is_worse else value * limit < reference
+        if worse and abs(value - reference) >= min_delta:
+            change = (value - reference) / reference * 100
+            regressions.append(f"{name}: {reference:.2f} -> {value:.2f} ({change:+.1f}%)")
+
+    for config, result in current.items():
+        reference = baseline.get(config)
+        if reference is None:
+            continue
+
+        stages = {**result["stages"], "total": result["total"]}
+        reference_stages = {**reference["stages"], "total": reference["total"]}
+        for stage, summary in stages.items():
+            if stage not in reference_stages:
+                continue
+            for p in PERCENTILES:
+                key = f"p{p}_ms"
+                check(f"{config} {stage} {key}", summary[key], reference_stages[stage][key],
+                      min_delta=min_delta_ms)
+
+        check(f"{config} fps", result["fps"], reference["fps"], higher_is_worse=False)
+        check(f"{config} peak_rss_mb", result["peak_rss_mb"], reference["peak_rss_mb"])
+
+    return regressions
@@ -1,52 +1,201 @@
 import cv2
 import numpy as np
 from config.settings import DistanceConfig
-from ..models.distance_estimator import DistanceEstimator
-from typing import List, Dict, Any
+from ..models.distance_estimator import DistanceEstimator, create_distance_estimator
+from typing import List, Dict, Any, Optional, Tuple
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.5
+LABEL_THICKNESS = 2
+LABEL_OFFSET = 10
+
+_char_widths: Dict[str, int] = {}
+_label_height: Optional[int] = None
+
+
+def label_size(label: str) -> Tuple[int, int]:
+    """
+    Размер подписи в пикселях с кэшированием ширин символов
+
+    Шрифт Hershey моноширинным не является, но ширина строки равна сумме
+    ширин символов, поэтому cv2.getTextSize вызывается один раз на символ,
+    а не на каждую подпись каждого кадра.
+
+    Args:
+        label: текст подписи
+
+    Returns:
+        Tuple[int, int]: ширина и высота подписи
+    """
+    global _label_height
+    width = 0
+    for char in label:
+        char_width = _char_widths.get(char)
+        if char_width is None:
+            (char_width, height), _ = cv2.getTextSize(
+                char, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS
+            )
+            char_width -= LABEL_THICKNESS
+            _char_widths[char] = char_width
+            _label_height = max(_label_height or 0, height)
+        width += char_width
+    return width + LABEL_THICKNESS, _label_height or 0
 
 
 def draw_detections(
-    frame: np.ndarray, detections: List[Any], id2name: Dict[int, str]
+    frame: np.ndarray,
+    detections: List[Any],
+    id2name: Dict[int, str],
+    estimator: Optional[DistanceEstimator] = None,
 ) -> np.ndarray:
     """
     Отрисовка bounding boxes и информации на кадре
 
     Args:
         frame: исходный кадр
-        detections: список обнаружений
+        detections: результат детекции (ultralytics Results)
+        id2name: словарь id класса -> имя класса
+        estimator: оценщик расстояния с построенной таблицей ширин
+            (если не передан, создаётся новый)
 
     Returns:
         frame: кадр с отрисованными bounding boxes и подписями
     """
-    estimator = DistanceEstimator()
-
-    for detection in detections:
-        boxes = detection.boxes
-        for box in boxes:
-
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-            cls_id = int(box.cls[0])
-            class_name = id2name[cls_id]
-            conf = box.conf[0]
-
-            distance = estimator.estimate(class_name, x1, x2)
-
-            label = f"{class_name} {conf:.2f} {distance:.2f}m"
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 255, 255), thickness=2)
-            cv2.putText(
-                frame,
-                label,
-                (x1, y1 - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (255, 255, 255),
-                thickness=2,
-            )
+    if estimator is None or estimator.width_table is None:
+        estimator = create_distance_estimator(id2name)
+
+    boxes = detections.boxes
+    if len(boxes) == 0:
+        return frame
+
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)
+    cls_ids = boxes.cls.cpu().numpy().astype(np.int32)
+    confs = boxes.conf.cpu().numpy()
+
+    distances = estimator.estimate_batch(cls_ids, xyxy, frame.shape[1::-1])
+
+    return draw_boxes(frame, xyxy, cls_ids, confs, distances, id2name)
+
+
+def draw_boxes(
+    frame: np.ndarray,
+    xyxy: np.ndarray,
+    cls_ids: np.ndarray,
+    confs: np.ndarray,
+    distances: np.ndarray,
+    id2name: Dict[int, str],
+    track_ids: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Отрисовка bounding boxes по готовым массивам
+
+    Args:
+        frame: исходный кадр
+        xyxy: bounding boxes формы (N, 4)
+        cls_ids: id классов формы (N,)
+        confs: уверенности формы (N,)
+        distances: расстояния в метрах формы (N,)
+        id2name: словарь id класса -> имя класса
+        track_ids: id треков формы (N,), добавляются в подпись
+
+    Returns:
+        frame: кадр с отрисованными bounding boxes и подписями
+
+    Подпись рисуется над box, а если там не хватает места - внутри box.
+    """
+    frame_width = frame.shape[1]
+    prefixes = (
+        [f"#{track_id} " for track_id in np.asarray(track_ids).tolist()]
+        if track_ids is not None
+        else [""] * len(xyxy)
+    )
+    for (x1, y1, x2, y2), cls_id, conf, distance, prefix in zip(
+        np.asarray(xyxy, dtype=np.int32).tolist(),
+        np.asarray(cls_ids, dtype=np.int32).tolist(),
+        np.asarray(confs).tolist(),
+        np.asarray(distances).tolist(),
+        prefixes,
+    ):
+        label = f"{prefix}{id2name[cls_id]} {conf:.2f} {distance:.2f}m"
+        label_width, label_height = label_size(label)
+
+        label_x = min(max(x1, 0), max(frame_width - label_width, 0))
+        label_y = y1 - LABEL_OFFSET
+        if label_y - label_height < 0:
+            label_y = y1 + label_height + LABEL_OFFSET
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 255, 255), thickness=2)
+        cv2.putText(
+            frame,
+            label,
+            (label_x, label_y),
+            LABEL_FONT,
+            LABEL_SCALE,
+            (255, 255, 255),
+            thickness=LABEL_THICKNESS,
+        )
 
     return frame
 
 
+class OverlayRenderer:
+    """
+    Отрисовка детекций по массивам boxes без Results.plot()
+
+    По умолчанию рисует прямо в декодированный кадр. С copy_frame=True
+    кадр копируется в один переиспользуемый буфер, поэтому результат
+    действителен только до следующего вызова render (подходит для
+    последовательной обработки, но не для передачи кадра в другой поток).
+    """
+
+    def __init__(
+        self, id2name: Dict[int, str], show_stats: bool = True, copy_frame: bool = False
+    ):
+        self.id2name = id2name
+        self.show_stats = show_stats
+        self.copy_frame = copy_frame
+        self._buffer: Optional[np.ndarray] = None
+
+    def render(
+        self,
+        frame: np.ndarray,
+        xyxy: np.ndarray,
+        cls_ids: np.ndarray,
+        confs: np.ndarray,
+        distances: np.ndarray,
+        track_ids: Optional[np.ndarray] = None,
+        cur_time: float = 0.0,
+    ) -> np.ndarray:
+        """
+        Отрисовка boxes, подписей и (опционально) статистики на кадре
+
+        Args:
+            frame: декодированный кадр
+            xyxy: bounding boxes формы (N, 4)
+            cls_ids: id классов формы (N,)
+            confs: уверенности формы (N,)
+            distances: расстояния в метрах формы (N,)
+            track_ids: id треков формы (N,)
+            cur_time: время обработки кадра в мс для статистики
+
+        Returns:
+            np.ndarray: кадр с отрисованными детекциями
+        """
+        canvas = self._canvas(frame)
+        draw_boxes(canvas, xyxy, cls_ids, confs, distances, self.id2name, track_ids)
+        if self.show_stats:
+            draw_performance_stats(canvas, cur_time, len(xyxy))
+        return canvas
+
+    def _canvas(self, frame: np.ndarray) -> np.ndarray:
+        if not self.copy_frame:
+            return frame
+        if self._buffer is None or self._buffer.shape != frame.shape:
+            self._buffer = np.empty_like(frame)
+        np.copyto(self._buffer, frame)
+        return self._buffer
+
+
 def draw_performance_stats(
     frame: np.ndarray, cur_time: float, detections_count: int
 ) -> np.ndarray:
@@ -1,5 +1,6 @@
 import unittest
 import cv2
+import json
 import numpy as np
 from pathlib import Path
 import sys
@@ -7,7 +8,20 @@ import tempfile
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.pipeline.multi_stream import expand_sources, process_sources
 from src.pipeline.processor import VideoProcessor
+from src.pipeline.records import FrameDetections
+from src.pipeline.results_writer import load_results
+from src.pipeline.shared_frames import run_ring_pipeline
+from src.pipeline.video_io import iter_frames
+from src.utils.metrics import PipelineMetrics
+
+
+def mark_frame(frame: np.ndarray, payload: None) -> float:
+    """Стадия конвейера процессов для test_ring_pipeline: отметка на кадре и яркость кадра."""
+    brightness = float(frame.mean())
+    frame[:8, :8] = (0, 0, 255)
+    return brightness
 
 
 class TestIntegration(unittest.TestCase):
@@ -53,11 +67,404 @@ class TestIntegration(unittest.TestCase):
         
         cap.release()
     
+    def test_pipelined_video_processing(self) -> None:
+        """Тест многопоточного режима: все кадры записаны по порядку."""
+        output_path = Path(self.temp_dir.name) / "output_pipelined.avi"
+
+        self.processor.process_video(
+            video_path=str(self.test_video_path),
+            output_path=str(output_path),
+            verbose=False,
+            pipelined=True,
+        )
+
+        self.assertTrue(output_path.exists())
+
+        cap = cv2.VideoCapture(str(output_path))
+        self.assertTrue(cap.isOpened())
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 5)
+        cap.release()
+
+    def test_batched_video_processing(self) -> None:
+        """Тест батчевого инференса: неполный последний батч не теряется."""
+        processor = VideoProcessor(batch_size=4)
+        output_path = Path(self.temp_dir.name) / "output_batched.avi"
+
+        processor.process_video(
+            video_path=str(self.test_video_path),
+            output_path=str(output_path),
+            verbose=False,
+        )
+
+        cap = cv2.VideoCapture(str(output_path))
+        self.assertTrue(cap.isOpened())
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 5)
+        cap.release()
+
+    def test_detect_every_n_frames(self) -> None:
+        """Тест режима детекции раз в N кадров с трекингом между детекциями."""
+        for pipelined in (False, True):
+            with self.subTest(pipelined=pipelined):
+                output_path = Path(self.temp_dir.name) / f"output_tracked_{pipelined}.avi"
+
+                frames = self.processor.process_video(
+                    video_path=str(self.test_video_path),
+                    output_path=str(output_path),
+                    verbose=False,
+                    pipelined=pipelined,
+                    detect_every=3,
+                )
+
+                self.assertEqual(frames, 5)
+                cap = cv2.VideoCapture(str(output_path))
+                self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 5)
+                cap.release()
+
+    def test_tiled_video_processing(self) -> None:
+        """Тест тайлового режима: кадры детектируются по тайлам и записываются все."""
+        processor = VideoProcessor(tiled=True)
+        output_path = Path(self.temp_dir.name) / "output_tiled.avi"
+
+        frames = processor.process_video(str(self.test_video_path), str(output_path))
+
+        self.assertEqual(frames, 5)
+        tiles = len(processor.tiler.tiles_for(np.zeros((480, 640, 3), dtype=np.uint8)))
+        self.assertGreater(tiles, 1)
+        self.assertEqual(processor.metrics.snapshot()["detector_runs"], 5)
+
+    def test_ort_engine_video_processing(self) -> None:
+        """Тест пайплайна на OrtEngine: видео, трекинг и headless-режим."""
+        from src.models.yolo_detector import YOLODetector
+
+        processor = VideoProcessor(detector=YOLODetector(batch_size=4, backend="ort"))
+
+        frames = processor.process_video(
+            str(self.test_video_path), str(Path(self.temp_dir.name) / "output_ort.avi"), pipelined=True
+        )
+        self.assertEqual(frames, 5)
+        frames = processor.process_video(
+            str(self.test_video_path), str(Path(self.temp_dir.name) / "output_ort_tracked.avi"), detect_every=2
+        )
+        self.assertEqual(frames, 5)
+
+        results_path = Path(self.temp_dir.name) / "ort.jsonl"
+        self.assertEqual(processor.process_results(str(self.test_video_path), str(results_path)), 5)
+        # время стадий учитывается на каждый кадр, прошедший через детектор: все кадры, каждый второй, все
+        detected = frames + len(range(0, frames, 2)) + frames
+        self.assertEqual(processor.metrics.snapshot()["stages"]["inference"]["count"], detected)
+
+    def test_stage_metrics_over_model_calls(self) -> None:
+        """Тест метрик стадий: время берётся из всех вызовов модели, а не только из первого."""
+        processor = VideoProcessor(metrics=PipelineMetrics())
+        speeds = [{"preprocess": 1.0, "inference": 10.0, "postprocess": 1.0}, {"preprocess": 1.0, "inference": 30.0, "postprocess": 1.0}]
+
+        def predict(frames: list, verbose: bool, **kwargs) -> list:
+            return [
+                FrameDetections(frame, np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32),
+                                speed=speeds[i * len(speeds) // len(frames)])
+                for i, frame in enumerate(frames)
+            ]
+
+        processor._predict = predict
+        processor._infer([np.zeros((48, 64, 3), dtype=np.uint8)] * 4, verbose=False)
+
+        inference = processor.metrics.snapshot()["stages"]["inference"]
+        self.assertEqual(inference["count"], 4)
+        self.assertAlmostEqual(inference["mean_ms"], 20.0)
+
+    def test_motion_gated_video_processing(self) -> None:
+        """Тест пропуска детекции: на статичном видео детектор запускается один раз."""
+        static_path = Path(self.temp_dir.name) / "static.avi"
+        frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        out = cv2.VideoWriter(str(static_path), cv2.VideoWriter_fourcc(*'XVID'), 10.0, (640, 480))
+        for _ in range(5):
+            out.write(frame)
+        out.release()
+
+        processor = VideoProcessor(detector=self.processor.detector, motion_gate=True)
+        frames = processor.process_video(str(static_path), str(Path(self.temp_dir.name) / "static_out.avi"))
+
+        snapshot = processor.metrics.snapshot()
+        self.assertEqual(frames, 5)
+        self.assertEqual(snapshot["detector_runs"], 1)
+        self.assertEqual(snapshot["reused"], 4)
+
+    def test_adaptive_resolution(self) -> None:
+        """Тест adaptive: при недостижимом бюджете размер входа спускается по лестнице без перезагрузки моделей."""
+        from config.settings import AdaptiveConfig
+        from src.models.resolution import ResolutionController
+
+        processor = VideoProcessor(detector=self.processor.detector, adaptive=True)
+        self.assertEqual(sorted(processor.detectors), sorted(AdaptiveConfig.LADDER))
+        self.assertIs(processor.detectors[self.processor.detector.img_size], self.processor.detector)
+
+        detectors = dict(processor.detectors)
+        processor.resolution = ResolutionController(budget_ms=1e-3, window=2)
+        processor.detector = processor.detectors[processor.resolution.img_size]
+        frames = processor.process_video(str(self.test_video_path), str(Path(self.temp_dir.name) / "adaptive.avi"))
+
+        snapshot = processor.metrics.snapshot()
+        self.assertEqual(frames, 5)
+        self.assertEqual(snapshot["input_size"], min(AdaptiveConfig.LADDER))
+        self.assertEqual(processor.resolution.changes, len(AdaptiveConfig.LADDER) - 1)
+        self.assertIs(processor.detector, detectors[min(AdaptiveConfig.LADDER)])
+        self.assertEqual(processor.detectors, detectors)
+
+    def test_detection_cache(self) -> None:
+        """Тест кэша детекций: повторная обработка видео идёт без инференса с теми же детекциями."""
+        from src.pipeline.detection_cache import DetectionCache
+
+        processor = VideoProcessor(detector=self.processor.detector, detection_cache=True, metrics=PipelineMetrics())
+        processor.detection_cache = DetectionCache(str(Path(self.temp_dir.name) / "detection_cache"))
+        first_path = Path(self.temp_dir.name) / "first.bin"
+        self.assertEqual(processor.process_results(str(self.test_video_path), str(first_path)), 5)
+        self.assertEqual(processor.metrics.snapshot()["detector_runs"], 5)
+
+        processor.metrics = PipelineMetrics()
+        second_path = Path(self.temp_dir.name) / "second.bin"
+        self.assertEqual(processor.process_results(str(self.test_video_path), str(second_path), pipelined=True), 5)
+        frames = processor.process_video(str(self.test_video_path), str(Path(self.temp_dir.name) / "cached.avi"))
+
+        snapshot = processor.metrics.snapshot()
+        self.assertEqual(frames, 5)
+        self.assertEqual(snapshot["detector_runs"], 0)
+        self.assertEqual(snapshot["stages"]["cache"]["count"], 10)
+        first, second = load_results(str(first_path)), load_results(str(second_path))
+        for name in ("count", "boxes", "cls", "conf", "distance"):
+            np.testing.assert_array_equal(first[name], second[name])
+
+    def test_ring_pipeline(self) -> None:
+        """Тест конвейера процессов на кольце кадров: все кадры по порядку, изменения стадии видны приёмнику."""
+        expected = [float(frame.mean()) for frame in iter_frames(str(self.test_video_path))]
+        received = []
+
+        def sink(frame: np.ndarray, brightness: float) -> None:
+            received.append((brightness, frame[0, 0].tolist()))
+
+        frames = run_ring_pipeline(str(self.test_video_path), [("mark", mark_frame)], sink, num_slots=2)
+
+        self.assertEqual(frames, 5)
+        np.testing.assert_allclose([b for b, _ in received], expected)
+        self.assertTrue(all(pixel == [0, 0, 255] for _, pixel in received))
+
+    def test_live_replay(self) -> None:
+        """Тест live-режима на проигрываемом файле: каждый кадр либо обработан, либо пропущен."""
+        results_path = Path(self.temp_dir.name) / "live.jsonl"
+
+        stats = self.processor.process_live(
+            str(self.test_video_path), results_path=str(results_path), replay=True, replay_fps=100
+        )
+
+        self.assertEqual(stats["captured"], 5)
+        self.assertEqual(stats["frames"] + stats["dropped"], 5)
+        self.assertGreater(stats["latency"]["p50_ms"], 0)
+        with open(results_path) as f:
+            indices = [json.loads(line)["frame"] for line in f]
+        self.assertEqual(len(indices), stats["frames"])
+        self.assertEqual(indices, sorted(indices))
+
+    def test_headless_results(self) -> None:
+        """Тест headless-режима: по записи на кадр, видео не пишется."""
+        jsonl_path = Path(self.temp_dir.name) / "results.jsonl"
+        bin_path = Path(self.temp_dir.name) / "results.bin"
+
+        frames = self.processor.process_results(str(self.test_video_path), str(jsonl_path))
+        self.assertEqual(frames, 5)
+        with open(jsonl_path) as f:
+            self.assertEqual(len(f.readlines()), 5)
+
+        frames = self.processor.process_results(
+            str(self.test_video_path), str(bin_path), pipelined=True
+        )
+        self.assertEqual(frames, 5)
+        self.assertEqual(load_results(str(bin_path))["frame"].tolist(), list(range(5)))
+
+    def test_pipeline_metrics(self) -> None:
+        """Тест метрик по стадиям в последовательном и многопоточном режимах."""
+        for pipelined in (False, True):
+            with self.subTest(pipelined=pipelined):
+                snapshots = []
+                processor = VideoProcessor(metrics=PipelineMetrics(export_every=100))
+                processor.metrics.add_callback(snapshots.append)
+
+                processor.process_video(
+                    video_path=str(self.test_video_path),
+                    output_path=str(Path(self.temp_dir.name) / f"output_metrics_{pipelined}.avi"),
+                    pipelined=pipelined,
+                )
+
+                snapshot = snapshots[-1]
+                self.assertEqual(snapshot["frames"], 5)
+                self.assertEqual(snapshot["detector_runs"], 5)
+                for stage in ("decode", "preprocess", "inference", "postprocess", "draw", "write"):
+                    self.assertEqual(snapshot["stages"][stage]["count"], 5)
+                if pipelined:
+                    self.assertEqual(set(snapshot["queue_depths"]), {"detect", "draw", "write"})
+
+    def test_inference_server(self) -> None:
+        """Тест сервера инференса: детекция кадров, видео-задача и Unix socket."""
+        import threading
+
+        from src.pipeline.client import InferenceClient
+        from src.pipeline.server import InferenceServer
+
+        server = InferenceServer(batch_size=4, max_delay_ms=20)
+        unix_socket = str(Path(self.temp_dir.name) / "server.sock")
+        addresses = server.run_in_thread(port=0, unix_socket=unix_socket)
+        port = addresses[1][1]
+        try:
+            frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+            with InferenceClient(port=port) as client:
+                detections = client.detect(frame)
+                self.assertEqual(set(detections), {"boxes", "cls", "conf", "distance"})
+
+                output_path = Path(self.temp_dir.name) / "output_server.avi"
+                job = client.process_video(str(self.test_video_path), output_path=str(output_path))
+                self.assertEqual(job["frames"], 5)
+                self.assertEqual(job["metrics"]["frames"], 5)
+                self.assertTrue(output_path.exists())
+
+                with self.assertRaises(RuntimeError):
+                    client.process_video(
+                        str(Path(self.temp_dir.name) / "missing.avi"),
+                        output_path=str(Path(self.temp_dir.name) / "output_missing.avi"),
+                    )
+
+            batches_before = server.batcher.batches
+            errors = []
+
+            def detect_many() -> None:
+                try:
+                    with InferenceClient(unix_socket=unix_socket) as client:
+                        for _ in range(3):
+                            client.detect(frame)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=detect_many) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            self.assertLess(server.batcher.batches - batches_before, 12)
+
+            # одновременные задачи не смешивают метрики
+            jobs = []
+
+            def run_job(i: int) -> None:
+                with InferenceClient(port=port) as client:
+                    jobs.append(client.process_video(
+                        str(self.test_video_path),
+                        results_path=str(Path(self.temp_dir.name) / f"results_server_{i}.jsonl"),
+                    ))
+
+            threads = [threading.Thread(target=run_job, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual([job["metrics"]["frames"] for job in jobs], [5, 5])
+        finally:
+            server.shutdown()
+
+    def test_multi_source_processing(self) -> None:
+        """Тест обработки нескольких видео пулом процессов."""
+        second_video_path = Path(self.temp_dir.name) / "test_video_2.avi"
+        second_video_path.write_bytes(self.test_video_path.read_bytes())
+        output_dir = Path(self.temp_dir.name) / "outputs"
+
+        sources = expand_sources([str(Path(self.temp_dir.name) / "test_video*.avi")])
+        self.assertEqual(len(sources), 2)
+
+        results = process_sources(sources, str(output_dir), num_workers=2, threads_per_worker=1)
+
+        self.assertEqual([r["source"] for r in results], sources)
+        for result in results:
+            self.assertIsNone(result["error"])
+            self.assertEqual(result["frames"], 5)
+            self.assertTrue(Path(result["output_path"]).exists())
+
+    def test_chunked_processing(self) -> None:
+        """Тест обработки одного видео по частям: кадры на стыках не теряются и не дублируются."""
+        from config.settings import PipelineConfig
+        from src.pipeline.chunked import process_chunked
+
+        long_video_path = Path(self.temp_dir.name) / "long_video.avi"
+        out = cv2.VideoWriter(str(long_video_path), cv2.VideoWriter_fourcc(*'XVID'), 10.0, (320, 240))
+        for i in range(12):
+            out.write(np.full((240, 320, 3), i * 20, dtype=np.uint8))
+        out.release()
+
+        min_chunk_frames = PipelineConfig.MIN_CHUNK_FRAMES
+        PipelineConfig.MIN_CHUNK_FRAMES = 4
+        try:
+            video = process_chunked(
+                str(long_video_path), str(Path(self.temp_dir.name) / "chunked.avi"),
+                num_workers=2, threads_per_worker=1,
+            )
+            results_path = Path(self.temp_dir.name) / "chunked.jsonl"
+            results = process_chunked(
+                str(long_video_path), str(results_path), num_workers=2, threads_per_worker=1, headless=True,
+            )
+        finally:
+            PipelineConfig.MIN_CHUNK_FRAMES = min_chunk_frames
+
+        for result in (video, results):
+            self.assertIsNone(result["error"])
+            self.assertEqual(result["chunks"], 2)
+            self.assertEqual(result["frames"], 12)
+
+        cap = cv2.VideoCapture(video["output_path"])
+        brightness = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            brightness.append(frame[120:, :, 0].mean())
+        cap.release()
+        self.assertEqual(len(brightness), 12)
+        self.assertEqual(brightness, sorted(brightness))
+
+        with open(results_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["frame"] for r in records], list(range(12)))
+        self.assertEqual(len(list(Path(self.temp_dir.name).glob("tmp*"))), 0)
+
+    def test_autotune(self) -> None:
+        """Тест подбора профиля хоста: замеры в отдельных процессах и запись профиля."""
+        from src.utils.autotune import autotune
+        from src.utils.host_profile import load_host_profile
+
+        profile_path = str(Path(self.temp_dir.name) / "host_profile.json")
+
+        profile = autotune(
+            str(self.test_video_path),
+            latency_target_ms=1000.0,
+            profile_path=profile_path,
+            backends=["pt"],
+            img_sizes=[256, 320],
+            batch_sizes=[1],
+            threads=[1],
+            interop_threads=[1],
+            sample_frames=3,
+            warmup_frames=1,
+        )
+
+        self.assertEqual(profile["img_size"], 320)
+        self.assertEqual(load_host_profile(profile_path), profile)
+        with open(profile_path) as f:
+            report = json.load(f)
+        self.assertEqual(len(report["results"]), 2)
+        self.assertTrue(all(r["error"] is None for r in report["results"]))
+
     def test_pipeline_with_different_settings(self) -> None:
         """Тест пайплайна с различными настройками."""
         test_cases = [
             {"verbose": True},
             {"verbose": False},
+            {"verbose": False, "pipelined": True},
         ]
         
         for settings in test_cases:
@@ -1,25 +1,33 @@
 import unittest
+import os
 import time
 import cv2
 import numpy as np
 from pathlib import Path
 import sys
+import tempfile
 from typing import List, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.models.yolo_detector import YOLODetector
 from src.pipeline.processor import VideoProcessor
+from src.utils.metrics import PipelineMetrics
+from src.utils.profiling import rss_mb
+from src.utils.visualization import OverlayRenderer
 
 
 class TestPerformance(unittest.TestCase):
     """Performance-тесты для проверки скорости работы."""
     
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Загрузка моделей один раз на все тесты класса."""
+        cls.detector = YOLODetector()
+        cls.processor = VideoProcessor()
+
     def setUp(self) -> None:
         """Инициализация перед каждым тестом."""
-        self.detector = YOLODetector()
-        self.processor = VideoProcessor()
-        
         self.test_images = [
             np.random.randint(0, 255, (240, 320, 3), dtype=np.uint8),   
             np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8),   
@@ -149,24 +157,60 @@ class TestPerformance(unittest.TestCase):
             f"Слшиком большое увеличение использования памяти: {memory_increase:.2f} МБ"
         )
 
+    def test_memory_soak(self) -> None:
+        """Тест длительной обработки: RSS не растёт на тысячах кадров (SOAK_FRAMES, по умолчанию 2000)."""
+        total_frames = int(os.environ.get("SOAK_FRAMES", 2000))
+        warmup_frames = total_frames // 5
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video_path = str(Path(tmp_dir) / "soak.avi")
+            out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'XVID'), 25.0, (320, 240))
+            rng = np.random.default_rng(0)
+            background = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+            for i in range(total_frames):
+                frame = background.copy()
+                x = i * 3 % 280
+                cv2.rectangle(frame, (x, 60), (x + 40, 180), (0, 0, 255), -1)
+                out.write(frame)
+            out.release()
+
+            samples: List[Tuple[int, float]] = []
+            self.processor.process_video(
+                video_path,
+                str(Path(tmp_dir) / "soak_out.avi"),
+                pipelined=True,
+                progress_callback=lambda frames: samples.append((frames, rss_mb())),
+            )
+
+        self.assertEqual(samples[-1][0], total_frames)
+        baseline = max(rss for frames, rss in samples if frames <= warmup_frames)
+        peak = max(rss for frames, rss in samples)
+
+        print(f"\nRSS после {warmup_frames} кадров: {baseline:.1f} МБ, пик за {total_frames} кадров: {peak:.1f} МБ")
+
+        self.assertLess(peak - baseline, 20.0, f"RSS вырос на {peak - baseline:.1f} МБ после разогрева")
+
 
 class TestPerformanceBenchmarks(unittest.TestCase):
     """Бенчмарки производительности для различных сценариев."""
     
     def setUp(self) -> None:
-        self.detector = YOLODetector()
+        self.detector = YOLODetector(batch_size=4)
         self.test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
     
     def test_batch_processing_performance(self) -> None:
-        """Тест производительности при обработке батча изображений."""
+        """Тест производительности при обработке батча изображений одним вызовом модели."""
         batch_size = 4
         batch = [self.test_image.copy() for _ in range(batch_size)]
         
+        _ = self.detector.model(batch, verbose=False)
+        
         start_time = time.perf_counter()
-        for image in batch:
-            _ = list(self.detector.model(image, verbose=False))
+        results = self.detector.model(batch, verbose=False)
         end_time = time.perf_counter()
         
+        self.assertEqual(len(results), batch_size)
+        
         total_time = (end_time - start_time) * 1000
         avg_time_per_image = total_time / batch_size
         
@@ -176,6 +220,46 @@ class TestPerformanceBenchmarks(unittest.TestCase):
         
         self.assertLess(avg_time_per_image, 100.0)
 
+    def test_overlay_rendering_performance(self) -> None:
+        """Тест времени отрисовки при росте числа детекций."""
+        renderer = OverlayRenderer(self.detector.model.names)
+        frame = np.random.randint(0, 255, (720, 1280, 3), dtype=np.uint8)
+        rng = np.random.default_rng(0)
+
+        for count in (5, 50):
+            top_left = rng.uniform(0, 600, (count, 2))
+            xyxy = np.hstack([top_left, top_left + rng.uniform(10, 100, (count, 2))])
+            cls_ids = rng.integers(0, len(self.detector.model.names), count)
+            confs = rng.uniform(0.25, 1.0, count)
+            distances = rng.uniform(1.0, 80.0, count)
+
+            test_runs = 20
+            start_time = time.perf_counter()
+            for _ in range(test_runs):
+                renderer.render(frame, xyxy, cls_ids, confs, distances, cur_time=30.0)
+            avg_time = (time.perf_counter() - start_time) * 1000 / test_runs
+
+            print(f"\nОтрисовка {count} детекций: {avg_time:.2f} мс")
+
+            self.assertLess(avg_time, 20.0)
+
+    def test_metrics_overhead(self) -> None:
+        """Тест накладных расходов метрик на кадр (должны быть пренебрежимы)."""
+        metrics = PipelineMetrics(export_every=10 ** 9)
+        stages = ("decode", "preprocess", "inference", "postprocess", "draw", "write")
+
+        test_runs = 1000
+        start_time = time.perf_counter()
+        for _ in range(test_runs):
+            for stage in stages:
+                metrics.observe(stage, 0.004)
+            metrics.observe_objects([3])
+            metrics.add_frames(1)
+        avg_time = (time.perf_counter() - start_time) * 1000 / test_runs
+
+        print(f"\nМетрики на кадр: {avg_time * 1000:.1f} мкс")
+
+        self.assertLess(avg_time, 0.1)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
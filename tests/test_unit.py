@@ -1,15 +1,69 @@
 import unittest
 import cv2
 import numpy as np
+import torch
 from pathlib import Path
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import time
+import tracemalloc
 from typing import Any
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.models.yolo_detector import YOLODetector
-from src.models.distance_estimator import DistanceEstimator
-from src.utils.visualization import draw_detections, draw_performance_stats
+from config.settings import AutotuneConfig, DistanceConfig, ModelConfig
+from src.models.artifact_cache import ArtifactCache, ArtifactSpec, file_hash
+from src.models.yolo_detector import YOLODetector, artifact_spec, prepare_model
+from src.models.distance_estimator import (
+    DistanceEstimator,
+    GroundPlaneDistanceEstimator,
+    create_distance_estimator,
+)
+from src.models.motion_gate import MotionGate
+from src.models.preprocessing import letterbox
+from src.models.resolution import ResolutionController
+from src.models.tiling import TiledInference, make_tiles, merge_detections
+from src.models.tracker import ByteTracker
+from ultralytics import YOLO
+from ultralytics.engine.results import Results
+from src.pipeline.results_writer import (
+    JsonlResultsWriter,
+    NumpyResultsWriter,
+    ResultsWriter,
+    load_results,
+)
+from src.pipeline.chunked import chunk_ranges
+from src.pipeline.multi_stream import _claim_slot
+from src.pipeline.detection_cache import DetectionCache, DetectionCacheSpec, source_fingerprint
+from src.pipeline.live import FileReplayCapture, LatestFrameGrabber
+from src.pipeline.records import FrameDetections
+from src.pipeline.server import HTTPError, MicroBatcher, _read_request
+from src.pipeline.shared_frames import FrameRing, decode_to_ring
+from src.pipeline.threaded import StagePipeline
+from src.pipeline.video_io import (
+    FFmpegVideoWriter,
+    OpenCVVideoWriter,
+    concat_videos,
+    create_video_writer,
+    iter_frames,
+)
+from src.utils import host_profile
+from src.utils.autotune import candidate_grid, select_profile
+from src.utils.boxes import box_ios, box_iou, match_detections, nmm, nms
+from src.utils.evaluation import average_precision, detection_map, distance_error, load_labels, pareto_front
+from src.utils.metrics import PipelineMetrics, serve_metrics
+from src.utils.profiling import StageTimer, find_regressions, latency_summary
+from src.utils.visualization import (
+    OverlayRenderer,
+    draw_detections,
+    draw_performance_stats,
+    label_size,
+)
 
 
 class TestYOLODetector(unittest.TestCase):
@@ -55,6 +109,59 @@ class TestYOLODetector(unittest.TestCase):
             self.assertGreaterEqual(y1, 0)
 
 
+class TestOrtEngine(unittest.TestCase):
+    """Unit-тесты для ONNX Runtime движка без обёртки ultralytics."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Загрузка движка один раз на все тесты класса."""
+        cls.detector = YOLODetector(batch_size=2, backend="ort")
+
+    def test_detect_plain_arrays(self) -> None:
+        """Тест результата: FrameDetections с массивами NumPy и временем стадий на кадр."""
+        frames = [np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(3)]
+
+        detections = self.detector.detect(frames, conf=0.0)
+
+        self.assertIsNone(self.detector.model)
+        self.assertEqual(self.detector.names, YOLO(self.detector.model_path, task="detect").names)
+        self.assertEqual(len(detections), 3)
+        for d in detections:
+            self.assertEqual(d.xyxy.dtype, np.float32)
+            self.assertEqual(d.cls_ids.dtype, np.int32)
+            self.assertEqual(set(d.speed), {"preprocess", "inference", "postprocess"})
+            self.assertLessEqual(len(d), 300)
+            self.assertTrue((d.xyxy[:, 2] <= 640).all() and (d.xyxy[:, 3] <= 480).all())
+
+    def test_decode_to_frame_coordinates(self) -> None:
+        """Тест разбора выхода: порог, NMS по классам и перевод boxes из letterbox в кадр."""
+        engine = self.detector.engine
+        output = np.zeros((4 + len(engine.names), 6), dtype=np.float32)
+        output[:4, :4] = [[100, 102, 300, 200], [100, 100, 100, 100], [40, 40, 40, 40], [20, 20, 20, 20]]
+        output[4 + 0, :3] = [0.9, 0.8, 0.7]  # второй box - дубль первого того же класса
+        output[4 + 2, 3] = 0.1  # ниже порога
+
+        xyxy, confs, cls_ids = engine._decode(output, (0.5, 0, 70, 640, 360), 0.25, 0.7, 300)
+
+        np.testing.assert_allclose(xyxy, [[160, 40, 240, 80], [560, 40, 640, 80]])
+        np.testing.assert_allclose(confs, [0.9, 0.7])
+        self.assertEqual(cls_ids.tolist(), [0, 0])
+
+    def test_decode_caps_nms_candidates(self) -> None:
+        """Тест max_nms: в NMS попадают только самые уверенные кандидаты."""
+        engine = self.detector.engine
+        output = np.zeros((4 + len(engine.names), 50), dtype=np.float32)
+        output[0] = np.arange(50) * 20 + 10  # непересекающиеся boxes
+        output[1:4] = [[10], [10], [10]]
+        output[4] = np.linspace(0.3, 0.8, 50)
+
+        xyxy, confs, _ = engine._decode(output, (1.0, 0, 0, 1000, 20), 0.25, 0.7, 300, max_nms=5)
+
+        self.assertEqual(len(confs), 5)
+        np.testing.assert_allclose(confs, output[4, -1:-6:-1])
+        np.testing.assert_allclose(xyxy[0], [985, 5, 995, 15])
+
+
 class TestDistanceEstimator(unittest.TestCase):
     """Unit-тесты для оценщика расстояния."""
     
@@ -95,6 +202,101 @@ class TestDistanceEstimator(unittest.TestCase):
         self.assertIsInstance(distance, float)
         self.assertGreater(distance, 0)
 
+    def test_batch_estimation_matches_single(self) -> None:
+        """Тест совпадения векторной оценки с поштучной."""
+        id2name = {0: "person", 1: "bicycle", 2: "car", 3: "unknown_class"}
+        estimator = DistanceEstimator(id2name)
+
+        cls_ids = np.array([0, 2, 3, 1])
+        xyxy = np.array(
+            [
+                [100, 50, 200, 300],
+                [150, 80, 350, 200],
+                [10, 10, 60, 40],
+                [300, 100, 370, 250],
+            ],
+            dtype=np.float32,
+        )
+
+        distances = estimator.estimate_batch(cls_ids, xyxy)
+
+        self.assertEqual(distances.shape, (4,))
+        for i, cls_id in enumerate(cls_ids):
+            expected = estimator.estimate(
+                id2name[int(cls_id)], int(xyxy[i, 0]), int(xyxy[i, 2])
+            )
+            self.assertAlmostEqual(float(distances[i]), expected, places=4)
+
+    def test_batch_estimation_zero_width(self) -> None:
+        """Тест оценки для bounding box нулевой ширины."""
+        estimator = DistanceEstimator({0: "person"})
+
+        distances = estimator.estimate_batch(
+            np.array([0, 0]), np.array([[100, 0, 100, 10], [100, 0, 99, 10]])
+        )
+
+        self.assertTrue(np.all(np.isfinite(distances)))
+        self.assertTrue(np.all(distances > 0))
+
+    def test_batch_estimation_empty(self) -> None:
+        """Тест векторной оценки для пустого кадра."""
+        estimator = DistanceEstimator({0: "person"})
+
+        distances = estimator.estimate_batch(np.zeros(0), np.zeros((0, 4)))
+
+        self.assertEqual(distances.shape, (0,))
+
+    def test_ground_plane_estimation(self) -> None:
+        """Тест оценки по нижней кромке box: геометрия камеры и независимость от ширины."""
+        estimator = GroundPlaneDistanceEstimator({0: "person", 1: "unknown_class"})
+        estimator.pitch = 0.0
+        xyxy = np.array([[100, 300, 140, 440], [500, 200, 900, 440]], dtype=np.float32)
+
+        distances = estimator.estimate_batch(np.array([0, 1]), xyxy, (1280, 720))
+
+        expected = estimator.camera_height * estimator.focal_length / (440.5 - 360)
+        np.testing.assert_allclose(distances, [expected, expected], rtol=1e-5)
+
+    def test_ground_plane_fallback_above_horizon(self) -> None:
+        """Тест запасной оценки по ширине для boxes у горизонта и выше него."""
+        estimator = GroundPlaneDistanceEstimator({0: "person"})
+        estimator.pitch = 0.0
+        xyxy = np.array([[100, 100, 200, 300], [100, 100, 200, 361]], dtype=np.float32)
+
+        distances = estimator.estimate_batch(np.array([0, 0]), xyxy, (1280, 720))
+
+        np.testing.assert_allclose(distances, DistanceEstimator({0: "person"}).estimate_batch([0, 0], xyxy))
+        self.assertIs(estimator.row_table((1280, 720)), estimator.row_table((1280, 720)))
+
+    def test_methods_agree_after_resolution_change(self) -> None:
+        """Тест CALIBRATION_SIZE: оценки по ширине и по плоскости дороги масштабируются одинаково."""
+        width = DistanceEstimator({0: "person"})
+        ground = GroundPlaneDistanceEstimator({0: "person"})
+        calibration_size = DistanceConfig.CALIBRATION_SIZE
+        DistanceConfig.CALIBRATION_SIZE = (1280, 720)
+        try:
+            # box, у которого в разрешении калибровки обе оценки совпадают
+            bottom = 540
+            distance = float(ground.row_table((1280, 720))[bottom])
+            pixel_width = DistanceConfig.KNOWN_WIDTHS["person"] * DistanceConfig.FOCAL_LENGTH / distance
+            xyxy = np.array([[600, 300, 600 + pixel_width, bottom]], dtype=np.float32)
+
+            for image_size in [(1280, 720), (640, 360), (1920, 1080)]:
+                scale = image_size[1] / 720
+                scaled = xyxy * scale
+                by_width = width.estimate_batch([0], scaled, image_size)
+                np.testing.assert_allclose(by_width, [distance], rtol=1e-5)
+                np.testing.assert_allclose(ground.estimate_batch([0], scaled, image_size), by_width, rtol=0.02)
+        finally:
+            DistanceConfig.CALIBRATION_SIZE = calibration_size
+
+    def test_create_distance_estimator(self) -> None:
+        """Тест выбора оценщика по методу."""
+        self.assertIs(type(create_distance_estimator({0: "person"}, "width")), DistanceEstimator)
+        self.assertIsInstance(create_distance_estimator({0: "person"}, "ground"), GroundPlaneDistanceEstimator)
+        with self.assertRaises(ValueError):
+            create_distance_estimator({0: "person"}, "stereo")
+
 
 class TestVisualization(unittest.TestCase):
     """Unit-тесты для функций визуализации."""
@@ -116,6 +318,1190 @@ class TestVisualization(unittest.TestCase):
         
         self.assertEqual(processed_frame.shape, original_frame.shape)
 
+    def test_overlay_renderer_in_place(self) -> None:
+        """Тест отрисовки прямо в переданный кадр."""
+        renderer = OverlayRenderer({0: "person"})
+        original_frame = self.test_frame.copy()
+
+        processed_frame = renderer.render(
+            self.test_frame,
+            np.array([[10, 5, 100, 200]]),
+            np.array([0]),
+            np.array([0.9]),
+            np.array([4.0]),
+        )
+
+        self.assertIs(processed_frame, self.test_frame)
+        self.assertFalse(np.array_equal(processed_frame, original_frame))
+
+    def test_overlay_renderer_reuses_buffer(self) -> None:
+        """Тест отрисовки в переиспользуемый буфер без изменения исходного кадра."""
+        renderer = OverlayRenderer({0: "person"}, show_stats=False, copy_frame=True)
+        original_frame = self.test_frame.copy()
+        boxes = (np.array([[10, 50, 100, 200]]), np.array([0]), np.array([0.9]), np.array([4.0]))
+
+        first = renderer.render(self.test_frame, *boxes)
+        second = renderer.render(self.test_frame, *boxes)
+
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(self.test_frame, original_frame)
+
+    def test_overlay_renderer_without_stats(self) -> None:
+        """Тест: без детекций и статистики кадр не меняется."""
+        renderer = OverlayRenderer({0: "person"}, show_stats=False)
+        original_frame = self.test_frame.copy()
+
+        renderer.render(self.test_frame, np.zeros((0, 4)), np.zeros(0), np.zeros(0), np.zeros(0))
+
+        np.testing.assert_array_equal(self.test_frame, original_frame)
+
+    def test_label_size_matches_opencv(self) -> None:
+        """Тест кэшированного размера подписи относительно cv2.getTextSize."""
+        label = "#3 person 0.87 12.34m"
+
+        width, height = label_size(label)
+        (cv_width, cv_height), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
+
+        self.assertLessEqual(abs(width - cv_width), 2)
+        self.assertEqual(height, cv_height)
+
+
+class TestReadRequest(unittest.TestCase):
+    """Unit-тесты для разбора HTTP-запроса сервера инференса."""
+
+    @staticmethod
+    def read(data: bytes) -> Any:
+        import asyncio
+
+        async def main() -> Any:
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await _read_request(reader)
+
+        return asyncio.run(main())
+
+    def test_body_by_content_length(self) -> None:
+        """Тест чтения тела ровно по Content-Length."""
+        method, path, headers, body = self.read(b"POST /detect HTTP/1.1\r\nContent-Length: 3\r\n\r\nabcdef")
+
+        self.assertEqual((method, path, body), ("POST", "/detect", b"abc"))
+        self.assertEqual(headers["content-length"], "3")
+
+    def test_invalid_content_length(self) -> None:
+        """Тест ответа 400 на нечисловой и отрицательный Content-Length."""
+        for value in (b"abc", b"-1", b""):
+            with self.subTest(value=value), self.assertRaises(HTTPError) as ctx:
+                self.read(b"POST /detect HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n")
+            self.assertEqual(ctx.exception.status, 400)
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Unit-тесты для объединения кадров одновременных запросов в батчи."""
+
+    def run_requests(self, batcher: MicroBatcher, requests: list) -> list:
+        import asyncio
+
+        async def main() -> list:
+            task = asyncio.create_task(batcher.run())
+            try:
+                return await asyncio.gather(*(batcher.detect(f, **kw) for f, kw in requests))
+            finally:
+                task.cancel()
+
+        return asyncio.run(main())
+
+    def test_concurrent_requests_merged(self) -> None:
+        """Тест объединения запросов и раздачи результатов по запросам."""
+        calls = []
+
+        def predict(frames: list, **kwargs) -> list:
+            calls.append((len(frames), kwargs))
+            return [f * 10 for f in frames]
+
+        batcher = MicroBatcher(predict, max_batch=4, max_delay_ms=50)
+        results = self.run_requests(
+            batcher, [([1], {}), ([2, 3], {}), ([4], {"conf": 0.1}), ([5, 6, 7, 8, 9], {})]
+        )
+
+        self.assertEqual(results, [[10], [20, 30], [40], [50, 60, 70, 80, 90]])
+        self.assertTrue(all(n <= 4 for n, _ in calls))
+        self.assertEqual(calls[0], (3, {}))
+        self.assertIn((1, {"conf": 0.1}), calls)
+        self.assertEqual(batcher.frames, 9)
+
+    def test_predict_error_propagates(self) -> None:
+        """Тест передачи ошибки инференса всем запросам батча."""
+
+        def predict(frames: list, **kwargs) -> list:
+            raise ValueError("broken model")
+
+        batcher = MicroBatcher(predict, max_batch=4, max_delay_ms=1)
+        with self.assertRaises(ValueError):
+            self.run_requests(batcher, [([1], {})])
+
+
+class TestStagePipeline(unittest.TestCase):
+    """Unit-тесты для многопоточного конвейера."""
+
+    def test_order_preserved(self) -> None:
+        """Тест сохранения порядка элементов при прохождении всех стадий."""
+        results = []
+        pipeline = StagePipeline(
+            source=range(100),
+            stages=[("double", lambda x: x * 2), ("inc", lambda x: x + 1)],
+            sink=results.append,
+            queue_size=2,
+        )
+
+        count = pipeline.run()
+
+        self.assertEqual(count, 100)
+        self.assertEqual(results, [x * 2 + 1 for x in range(100)])
+
+    def test_stage_error_propagates(self) -> None:
+        """Тест проброса исключения из стадии в вызывающий поток."""
+        def fail_on_five(x: int) -> int:
+            if x == 5:
+                raise ValueError("bad frame")
+            return x
+
+        pipeline = StagePipeline(
+            source=range(1000),
+            stages=[("fail", fail_on_five)],
+            sink=lambda x: None,
+            queue_size=2,
+        )
+
+        with self.assertRaises(ValueError):
+            pipeline.run()
+
+
+class TestFrameDetections(unittest.TestCase):
+    """Unit-тесты для компактной записи детекций кадра."""
+
+    def test_from_results(self) -> None:
+        """Тест разбора Results: массивы скопированы, кадр освобождается, лишних атрибутов нет."""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        boxes = torch.tensor([[10, 20, 50, 80, 0.9, 2], [0, 0, 5, 5, 0.4, 0]])
+        results = Results(frame, path="", names={0: "person", 2: "car"}, boxes=boxes)
+        results.speed = {"preprocess": 1.0, "inference": 5.0, "postprocess": None}
+
+        detections = FrameDetections.from_results(results)
+        del results
+
+        self.assertEqual(len(detections), 2)
+        np.testing.assert_allclose(detections.xyxy[0], [10, 20, 50, 80])
+        self.assertEqual(detections.cls_ids.tolist(), [2, 0])
+        self.assertEqual(detections.cur_time, 6.0)
+        self.assertFalse(hasattr(detections, "__dict__"))
+
+        detections.release_frame()
+        self.assertIsNone(detections.frame)
+        self.assertEqual(tuple(detections.image_size), (320, 240))
+
+
+class TestLiveSource(unittest.TestCase):
+    """Unit-тесты для захвата живого источника."""
+
+    class _FastCapture:
+        """Источник, отдающий кадры быстрее, чем их обрабатывают."""
+
+        def __init__(self, frames: int):
+            self.frames = frames
+            self.index = 0
+
+        def read(self) -> tuple:
+            if self.index == self.frames:
+                return False, None
+            time.sleep(0.002)
+            self.index += 1
+            return True, np.full((4, 4, 3), self.index, dtype=np.uint8)
+
+        def release(self) -> None:
+            pass
+
+    def test_grabber_keeps_newest_frame(self) -> None:
+        """Тест захвата: медленный потребитель получает только свежие кадры, остальные пропускаются."""
+        received = []
+        with LatestFrameGrabber(self._FastCapture(50)) as grabber:
+            while True:
+                item = grabber.read(timeout=1)
+                if item is None:
+                    break
+                received.append(item[0])
+                time.sleep(0.02)
+
+        self.assertEqual(received, sorted(set(received)))
+        self.assertEqual(received[-1], 49)
+        self.assertGreater(grabber.dropped, 0)
+        self.assertEqual(len(received) + grabber.dropped, 50)
+
+    def test_file_replay_paced(self) -> None:
+        """Тест проигрывания файла: кадры отдаются не быстрее заданного fps."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "replay.avi")
+            out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'XVID'), 10.0, (64, 48))
+            for _ in range(6):
+                out.write(np.zeros((48, 64, 3), dtype=np.uint8))
+            out.release()
+
+            capture = FileReplayCapture(path, fps=50)
+            start_time = time.perf_counter()
+            frames = 0
+            while capture.read()[0]:
+                frames += 1
+            capture.release()
+
+        self.assertEqual(frames, 6)
+        self.assertGreaterEqual(time.perf_counter() - start_time, 5 / 50)
+
+
+class TestVideoWriter(unittest.TestCase):
+    """Unit-тесты для writers итогового видео."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.frames = [np.full((240, 320, 3), i * 20, dtype=np.uint8) for i in range(5)]
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        self.temp_dir.cleanup()
+
+    def _write_and_probe(self, writer: Any, path: str) -> tuple:
+        for frame in self.frames:
+            writer.write(frame)
+        writer.release()
+        cap = cv2.VideoCapture(path)
+        props = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        cap.release()
+        return props
+
+    def test_opencv_writer_downscale(self) -> None:
+        """Тест OpenCV writer с уменьшением размера итогового видео."""
+        path = str(Path(self.temp_dir.name) / "opencv.avi")
+        writer = create_video_writer(path, 10, (320, 240), backend="opencv", output_size=(160, 120))
+
+        self.assertIsInstance(writer, OpenCVVideoWriter)
+        self.assertEqual(self._write_and_probe(writer, path), (5, 160))
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg не установлен")
+    def test_ffmpeg_writer(self) -> None:
+        """Тест ffmpeg writer: все кадры записаны, размер уменьшен, неверный кадр отклоняется."""
+        path = str(Path(self.temp_dir.name) / "ffmpeg.mp4")
+        writer = create_video_writer(path, 10, (320, 240), backend="ffmpeg", output_size=(160, 120))
+
+        self.assertIsInstance(writer, FFmpegVideoWriter)
+        with self.assertRaises(ValueError):
+            writer.write(np.zeros((120, 160, 3), dtype=np.uint8))
+        self.assertEqual(self._write_and_probe(writer, path), (5, 160))
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg не установлен")
+    def test_ffmpeg_writer_odd_size(self) -> None:
+        """Тест ffmpeg writer: кадры нечётного размера пишутся в видео с чётными сторонами."""
+        path = str(Path(self.temp_dir.name) / "odd.mp4")
+        self.frames = [np.full((241, 321, 3), i * 20, dtype=np.uint8) for i in range(5)]
+        writer = create_video_writer(path, 10, (321, 241), backend="ffmpeg")
+
+        self.assertEqual(writer.output_size, (320, 240))
+        self.assertEqual(self._write_and_probe(writer, path), (5, 320))
+
+    def test_unknown_backend(self) -> None:
+        """Тест ошибки для неизвестного backend."""
+        with self.assertRaises(ValueError):
+            create_video_writer("unused.avi", 10, (320, 240), backend="gstreamer")
+
+    def test_iter_frames_range(self) -> None:
+        """Тест чтения диапазона кадров: перемотка попадает точно в start."""
+        path = str(Path(self.temp_dir.name) / "range.avi")
+        self._write_and_probe(create_video_writer(path, 10, (320, 240), backend="opencv"), path)
+
+        brightness = [int(round(f.mean() / 20)) for f in iter_frames(path, 2, 4)]
+        self.assertEqual(brightness, [2, 3])
+        self.assertEqual(len(list(iter_frames(path, 3))), 2)
+
+    def test_concat_videos(self) -> None:
+        """Тест склейки частей видео по порядку."""
+        paths = []
+        for name in ("first.avi", "second.avi"):
+            paths.append(str(Path(self.temp_dir.name) / name))
+            self._write_and_probe(create_video_writer(paths[-1], 10, (320, 240), backend="opencv"), paths[-1])
+        path = str(Path(self.temp_dir.name) / "joined.avi")
+
+        concat_videos(paths, path, backend="opencv")
+
+        brightness = [int(round(f.mean() / 20)) for f in iter_frames(path)]
+        self.assertEqual(brightness, [0, 1, 2, 3, 4] * 2)
+
+
+class TestFrameRing(unittest.TestCase):
+    """Unit-тесты для кольца кадров в общей памяти."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.ring = FrameRing((48, 64, 3), num_slots=2)
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_slots_recycled(self) -> None:
+        """Тест слотов: кадр слота - view без копии, без свободных слотов acquire ждёт до timeout."""
+        frame = np.full((48, 64, 3), 7, dtype=np.uint8)
+        first = self.ring.put(frame)
+        second = self.ring.acquire()
+
+        self.assertNotEqual(first, second)
+        np.testing.assert_array_equal(self.ring.frame(first), frame)
+        self.ring.frame(second)[:] = 3
+        self.assertEqual(int(self.ring.frame(second).max()), 3)
+        with self.assertRaises(TimeoutError):
+            self.ring.acquire(timeout=0.05)
+
+        self.ring.release(first)
+        self.assertEqual(self.ring.acquire(timeout=1.0), first)
+
+    def test_decoder_process_writes_slots(self) -> None:
+        """Тест процесса-декодера: кадры, записанные в слоты другим процессом, совпадают с декодированными здесь."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            video_path = str(Path(tmp_dir) / "ring.avi")
+            out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (64, 48))
+            rng = np.random.default_rng(0)
+            for _ in range(4):
+                out.write(rng.integers(0, 255, (48, 64, 3), dtype=np.uint8))
+            out.release()
+            expected = list(iter_frames(video_path))
+
+            self.assertEqual(self.decode_in_process(video_path, expected), [0, 1, 2, 3])
+            # start после перемотки - те же кадры, что и у iter_frames; start за концом видео - пустой поток
+            self.assertEqual(self.decode_in_process(video_path, expected, 2), [2, 3])
+            self.assertEqual(self.decode_in_process(video_path, expected, 6), [])
+
+    def decode_in_process(self, video_path: str, expected: list, start: int = 0) -> list:
+        """Запуск decode_to_ring в отдельном процессе: номера кадров, кадры слотов сверяются с expected."""
+        ctx = multiprocessing.get_context("spawn")
+        handoff = ctx.Queue()
+        process = ctx.Process(target=decode_to_ring, args=(video_path, self.ring, handoff, start))
+        process.start()
+
+        indices = []
+        while True:
+            item = handoff.get(timeout=30)
+            if item is None:
+                break
+            index, slot, _ = item
+            np.testing.assert_array_equal(self.ring.frame(slot), expected[index])
+            indices.append(index)
+            self.ring.release(slot)
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        return indices
+
+
+class TestWorkerSlots(unittest.TestCase):
+    """Unit-тесты для распределения наборов ядер между процессами пула."""
+
+    def test_slot_of_exited_worker_reused(self) -> None:
+        """Тест слотов: занятый живым процессом слот не выдаётся, слот завершившегося - выдаётся снова."""
+        ctx = multiprocessing.get_context("spawn")
+        exited = ctx.Process(target=time.sleep, args=(0,))
+        exited.start()
+        exited.join()
+        owners = ctx.Array("i", 3)
+        owners[0], owners[1] = os.getppid(), exited.pid
+
+        self.assertEqual(_claim_slot(owners), 1)
+        self.assertEqual(_claim_slot(owners), 2)
+        self.assertEqual(list(owners), [os.getppid(), os.getpid(), os.getpid()])
+        with self.assertRaises(RuntimeError):
+            _claim_slot(owners)
+
+
+class TestSeekFrame(unittest.TestCase):
+    """Unit-тесты для перемотки видео к кадру части."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        self.temp_dir.cleanup()
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg не установлен")
+    def test_seek_matches_sequential_on_long_gop(self) -> None:
+        """Тест перемотки: на видео с одним ключевым кадром части совпадают с последовательным чтением."""
+        for container in ("mp4", "ts"):
+            path = str(Path(self.temp_dir.name) / f"long_gop.{container}")
+            subprocess.run(
+                ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=160x120:rate=25", "-frames:v", "120",
+                 "-c:v", "libx264", "-g", "250", "-bf", "2", "-pix_fmt", "yuv420p", path],
+                check=True,
+            )
+            frames = list(iter_frames(path))
+
+            for start, stop in ((37, 41), (100, 103)):
+                with self.subTest(container=container, start=start):
+                    chunk = list(iter_frames(path, start, stop))
+                    self.assertEqual(len(chunk), stop - start)
+                    for expected, frame in zip(frames[start:stop], chunk):
+                        np.testing.assert_array_equal(frame, expected)
+
+
+class TestChunkRanges(unittest.TestCase):
+    """Unit-тесты для разбиения видео на части."""
+
+    def test_ranges_cover_video(self) -> None:
+        """Тест смежных диапазонов без пропусков, последний открыт до конца видео."""
+        self.assertEqual(chunk_ranges(1000, 3, min_chunk_frames=100), [(0, 333), (333, 667), (667, None)])
+        self.assertEqual(chunk_ranges(150, 4, min_chunk_frames=100), [(0, None)])
+        self.assertEqual(chunk_ranges(0, 4, min_chunk_frames=100), [(0, None)])
+
+
+class TestResultsWriter(unittest.TestCase):
+    """Unit-тесты для записи результатов headless-режима."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.frames = [
+            (np.array([[1, 2, 30, 40], [5, 6, 70, 80]]), np.array([0, 2]), np.array([0.9, 0.5]), np.array([4.0, 9.5])),
+            (np.zeros((0, 4)), np.zeros(0), np.zeros(0), np.zeros(0)),
+            (np.array([[10, 20, 30, 40]]), np.array([7]), np.array([0.3]), np.array([20.0])),
+        ]
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        self.temp_dir.cleanup()
+
+    def test_jsonl_writer(self) -> None:
+        """Тест записи одной JSON-строки на кадр."""
+        path = str(Path(self.temp_dir.name) / "results.jsonl")
+
+        with JsonlResultsWriter(path, fps=10, buffer_frames=2) as writer:
+            for frame in self.frames:
+                writer.write(*frame)
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+
+        self.assertEqual([r["frame"] for r in records], [0, 1, 2])
+        self.assertAlmostEqual(records[2]["timestamp"], 0.2)
+        self.assertEqual(records[0]["cls"], [0, 2])
+        self.assertEqual(records[1]["boxes"], [])
+        self.assertAlmostEqual(records[2]["distance"][0], 20.0)
+
+    def test_numpy_writer_roundtrip(self) -> None:
+        """Тест колоночного формата из нескольких пачек."""
+        path = str(Path(self.temp_dir.name) / "results.bin")
+
+        with NumpyResultsWriter(path, fps=10, buffer_frames=2) as writer:
+            for frame in self.frames:
+                writer.write(*frame)
+
+        results = load_results(path)
+
+        self.assertEqual(results["frame"].tolist(), [0, 1, 2])
+        self.assertEqual(results["count"].tolist(), [2, 0, 1])
+        self.assertEqual(results["offsets"].tolist(), [0, 2, 2, 3])
+        np.testing.assert_allclose(results["boxes"][2], [10, 20, 30, 40])
+        self.assertEqual(results["cls"].tolist(), [0, 2, 7])
+
+    def test_base_writer_abstract(self) -> None:
+        """Тест базового класса: без _serialize writer не создаётся и файл не открывается."""
+        path = Path(self.temp_dir.name) / "results.out"
+
+        with self.assertRaises(TypeError):
+            ResultsWriter(str(path), fps=10)
+        self.assertFalse(path.exists())
+
+
+class TestDetectionCache(unittest.TestCase):
+    """Unit-тесты для кэша детекций."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DetectionCache(self.temp_dir.name)
+        self.spec = DetectionCacheSpec(source="ab" * 32, model="weights_onnx_fp32", img_size="320", mode="{}")
+        self.detections = [
+            FrameDetections(
+                None, np.array([[1, 2, 30, 40], [5, 6, 70, 80]], dtype=np.float32),
+                np.array([0.9, 0.5], dtype=np.float32), np.array([0, 2], dtype=np.int32),
+                cur_time=12.5, image_size=(640, 480),
+            ),
+            FrameDetections(
+                None, np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+                np.zeros(0, dtype=np.int32), image_size=(640, 480),
+            ),
+        ]
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        self.temp_dir.cleanup()
+
+    def test_roundtrip_memory_mapped(self) -> None:
+        """Тест записи и чтения: колонки открываются через memmap, детекции кадров совпадают."""
+        self.assertIsNone(self.cache.load(self.spec))
+
+        writer = self.cache.writer(self.spec)
+        writer.add(self.detections)
+        writer.commit()
+
+        cached = self.cache.load(self.spec)
+        self.assertEqual(len(cached), 2)
+        self.assertIsInstance(cached.columns["boxes"], np.memmap)
+        self.assertFalse(cached.tracked)
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        first = cached.get(0, frame)
+        np.testing.assert_allclose(first.xyxy, self.detections[0].xyxy)
+        self.assertEqual(first.cls_ids.tolist(), [0, 2])
+        self.assertAlmostEqual(first.cur_time, 12.5)
+        self.assertIsNone(first.track_ids)
+        self.assertIs(first.frame, frame)
+        self.assertEqual(len(cached.get(1, frame)), 0)
+        with self.assertRaises(ValueError):
+            cached.get(2, frame)
+
+    def test_writer_memory_flat(self) -> None:
+        """Тест потоковой записи: память writer не растёт с числом кадров, колонки читаются целиком."""
+        rng = np.random.default_rng(0)
+
+        def make_batch() -> list:
+            return [
+                FrameDetections(
+                    None, rng.uniform(0, 600, (20, 4)).astype(np.float32), rng.uniform(0, 1, 20).astype(np.float32),
+                    np.arange(20, dtype=np.int32), np.arange(20, dtype=np.int64), cur_time=1.0, image_size=(640, 480),
+                )
+                for _ in range(32)
+            ]
+
+        writer = self.cache.writer(self.spec)
+        tracemalloc.start()
+        try:
+            writer.add(make_batch())
+            base, _ = tracemalloc.get_traced_memory()
+            for _ in range(500):
+                batch = make_batch()
+                writer.add(batch)
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        writer.commit()
+
+        # 16032 кадра по 20 детекций - около 10 МБ колонок, в памяти остаются только счётчики
+        self.assertLess(current - base, 256 * 1024)
+        cached = self.cache.load(self.spec)
+        self.assertEqual(len(cached), 501 * 32)
+        self.assertTrue(cached.tracked)
+        self.assertEqual(cached.columns["boxes"].shape, (501 * 32 * 20, 4))
+        last = cached.get(len(cached) - 1, np.zeros((480, 640, 3), dtype=np.uint8))
+        np.testing.assert_allclose(last.xyxy, batch[-1].xyxy)
+        self.assertEqual(last.track_ids.tolist(), list(range(20)))
+        self.assertEqual(list(Path(self.temp_dir.name).iterdir()), [Path(self.temp_dir.name) / self.spec.key])
+
+    def test_key_and_fingerprint(self) -> None:
+        """Тест ключа: другой размер входа - другой ключ; отпечаток меняется вместе с файлом."""
+        other = DetectionCacheSpec(source=self.spec.source, model=self.spec.model, img_size="416", mode="{}")
+        self.assertNotEqual(self.spec.key, other.key)
+
+        path = Path(self.temp_dir.name) / "video.bin"
+        path.write_bytes(b"a" * 100)
+        fingerprint = source_fingerprint(str(path), sample_bytes=16)
+        path.write_bytes(b"a" * 50 + b"b" + b"a" * 49)
+        self.assertEqual(source_fingerprint(str(path), sample_bytes=16), fingerprint)
+        path.write_bytes(b"a" * 99 + b"b")
+        self.assertNotEqual(source_fingerprint(str(path), sample_bytes=16), fingerprint)
+
+
+class TestProfiling(unittest.TestCase):
+    """Unit-тесты для замеров по стадиям и сравнения с baseline."""
+
+    @staticmethod
+    def make_result(latency: float, fps: float, rss: float) -> dict:
+        summary = latency_summary([latency] * 10)
+        return {"stages": {"inference": summary}, "total": summary, "fps": fps, "peak_rss_mb": rss}
+
+    def test_latency_summary(self) -> None:
+        """Тест перцентилей и пустого набора замеров."""
+        summary = latency_summary(list(range(1, 101)))
+
+        self.assertAlmostEqual(summary["mean_ms"], 50.5)
+        self.assertAlmostEqual(summary["p50_ms"], 50.5)
+        self.assertGreater(summary["p99_ms"], summary["p95_ms"])
+        self.assertEqual(latency_summary([])["p99_ms"], 0.0)
+
+    def test_stage_timer(self) -> None:
+        """Тест одного замера на каждый вход в стадию."""
+        timer = StageTimer()
+        for _ in range(3):
+            with timer.stage("decode"):
+                pass
+            with timer.stage("inference"):
+                pass
+
+        self.assertEqual(list(timer.summary()), ["decode", "inference"])
+        self.assertEqual(len(timer.samples["inference"]), 3)
+
+    def test_find_regressions(self) -> None:
+        """Тест порога в процентах, минимального роста задержки и fps."""
+        baseline = {"640x480@320": self.make_result(20.0, 50.0, 500.0)}
+
+        same = {"640x480@320": self.make_result(21.0, 48.0, 510.0)}
+        self.assertEqual(find_regressions(same, baseline, 10.0), [])
+
+        slower = {"640x480@320": self.make_result(30.0, 33.0, 500.0), "other@320": self.make_result(1.0, 1.0, 1.0)}
+        regressions = find_regressions(slower, baseline, 10.0)
+        self.assertTrue(any("inference p95_ms" in r for r in regressions))
+        self.assertTrue(any("fps" in r for r in regressions))
+        self.assertFalse(any("other" in r for r in regressions))
+
+        tiny = {"640x480@320": self.make_result(20.3, 50.0, 500.0)}
+        self.assertEqual(find_regressions(tiny, baseline, 1.0, min_delta_ms=0.5), [])
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    """Unit-тесты для метрик пайплайна."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.metrics = PipelineMetrics(prefix="test", export_every=2)
+
+    def test_prometheus_text(self) -> None:
+        """Тест гистограмм, счётчиков и gauge в Prometheus text format."""
+        self.metrics.observe("inference", 0.015, count=4)
+        self.metrics.observe("inference", 2.0)
+        self.metrics.observe_objects([0, 3])
+        self.metrics.set_queue_depths({"detect": 2})
+        self.metrics.add_frames(5)
+
+        text = self.metrics.to_prometheus()
+
+        self.assertIn("test_frames_total 5", text)
+        self.assertIn('test_queue_depth{queue="detect"} 2', text)
+        self.assertIn('test_stage_latency_seconds_bucket{stage="inference",le="0.01"} 0', text)
+        self.assertIn('test_stage_latency_seconds_bucket{stage="inference",le="0.02"} 4', text)
+        self.assertIn('test_stage_latency_seconds_bucket{stage="inference",le="+Inf"} 5', text)
+        self.assertIn('test_stage_latency_seconds_count{stage="inference"} 5', text)
+        self.assertIn('test_objects_per_frame_bucket{le="0"} 1', text)
+        self.assertIn("test_objects_per_frame_sum 3.000000", text)
+
+    def test_callback_every_n_frames(self) -> None:
+        """Тест вызова callback раз в export_every кадров."""
+        snapshots = []
+        self.metrics.add_callback(snapshots.append)
+        self.metrics.observe("decode", 0.002)
+        self.metrics.observe("inference", 0.006)
+
+        for _ in range(5):
+            self.metrics.add_frames(1)
+
+        self.assertEqual([s["frames"] for s in snapshots], [2, 4])
+        self.assertAlmostEqual(snapshots[0]["stages"]["inference"]["mean_ms"], 6.0)
+        self.assertAlmostEqual(snapshots[0]["stages"]["inference"]["share"], 0.75)
+
+    def test_textfile_and_endpoint(self) -> None:
+        """Тест записи .prom файла и HTTP endpoint /metrics."""
+        import urllib.request
+
+        self.metrics.add_frames(1)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "metrics.prom")
+            self.metrics.write_prometheus(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), self.metrics.to_prometheus())
+
+        server = serve_metrics(self.metrics, port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertIn("test_frames_total 1", response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestArtifactCache(unittest.TestCase):
+    """Unit-тесты для кэша собранных моделей."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ArtifactCache(self.temp_dir.name, max_bytes=25000)
+        self.builds = []
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        self.temp_dir.cleanup()
+
+    def spec(self, img_size: int) -> ArtifactSpec:
+        return ArtifactSpec("abc", img_size, "onnx", "fp32", "1", "test")
+
+    def build(self, path: str) -> None:
+        self.builds.append(path)
+        Path(path).write_bytes(b"x" * 10000)
+
+    def test_build_once(self) -> None:
+        """Тест однократной сборки и атомарной публикации модели."""
+        first = self.cache.get_or_build(self.spec(320), self.build)
+        second = self.cache.get_or_build(self.spec(320), self.build)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.builds), 1)
+        self.assertNotEqual(Path(self.builds[0]).parent, Path(first).parent)
+        self.assertTrue((Path(first).parent / "manifest.json").exists())
+        self.assertEqual(list(Path(self.temp_dir.name).glob("*.lock")), [])
+
+    def test_key_depends_on_spec(self) -> None:
+        """Тест отдельной модели для другого IMG_SIZE и весов."""
+        self.assertNotEqual(self.spec(320).key, self.spec(640).key)
+        self.assertNotEqual(
+            self.spec(320).key, ArtifactSpec("def", 320, "onnx", "fp32", "1", "test").key
+        )
+        self.assertNotEqual(
+            artifact_spec(1, 320).key, artifact_spec(1, 640).key
+        )
+
+    def test_int8_requires_onnx(self) -> None:
+        """Тест INT8 для формата без квантизации: ошибка вместо молчаливой FP32 модели."""
+        for backend in ("pt", "openvino"):
+            with self.subTest(backend=backend), self.assertRaises(ValueError):
+                prepare_model(backend, 1, int8=True)
+
+    def test_file_hash_of_directory(self) -> None:
+        """Тест хэша каталога модели: меняется вместе с содержимым любого файла."""
+        model_dir = Path(self.temp_dir.name) / "model_openvino_model"
+        model_dir.mkdir()
+        (model_dir / "model.xml").write_text("graph")
+        (model_dir / "model.bin").write_bytes(b"weights")
+        before = file_hash(str(model_dir))
+
+        (model_dir / "model.bin").write_bytes(b"recalibrated")
+
+        self.assertNotEqual(file_hash(str(model_dir)), before)
+
+    def test_eviction_least_recently_used(self) -> None:
+        """Тест удаления давно не использованных моделей сверх max_bytes."""
+        import os
+        import time
+
+        first = self.cache.get_or_build(self.spec(320), self.build)
+        second = self.cache.get_or_build(self.spec(416), self.build)
+        old = time.time() - 100
+        os.utime(Path(second).parent, (old, old))
+        self.cache.get(self.spec(320))
+
+        self.cache.get_or_build(self.spec(640), self.build)
+
+        self.assertTrue(Path(first).exists())
+        self.assertFalse(Path(second).exists())
+
+    def test_stale_lock_is_ignored(self) -> None:
+        """Тест сборки поверх брошенного lock-файла."""
+        Path(self.temp_dir.name, f"{self.spec(320).key}.lock").write_text("1")
+
+        path = self.cache.get_or_build(self.spec(320), self.build, lock_timeout=-1)
+
+        self.assertTrue(Path(path).exists())
+
+
+class TestHostProfile(unittest.TestCase):
+    """Unit-тесты для профиля хоста и выбора конфигурации autotune."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.temp_dir.name) / "host_profile.json")
+        self.saved = (ModelConfig.BACKEND, ModelConfig.IMG_SIZE, ModelConfig.BATCH_SIZE, AutotuneConfig.PROFILE_PATH)
+        self.profile = {
+            "backend": "onnx", "img_size": 416, "batch_size": 4,
+            "threads": 1, "interop_threads": 1, "opencv_threads": 1,
+        }
+
+    def tearDown(self) -> None:
+        """Очистка после каждого теста."""
+        ModelConfig.BACKEND, ModelConfig.IMG_SIZE, ModelConfig.BATCH_SIZE, AutotuneConfig.PROFILE_PATH = self.saved
+        self.temp_dir.cleanup()
+
+    def result(self, img_size: int, fps: float, p95_ms: float, error: Any = None) -> dict:
+        return {"img_size": img_size, "fps": fps, "latency": {"p95_ms": p95_ms}, "error": error}
+
+    def test_select_profile(self) -> None:
+        """Тест выбора: наибольший IMG_SIZE в пределах цели, затем наибольший FPS."""
+        results = [
+            self.result(320, 60.0, 20.0),
+            self.result(416, 30.0, 45.0),
+            self.result(416, 40.0, 40.0),
+            self.result(640, 20.0, 80.0),
+            self.result(640, 0.0, 0.0, error="RuntimeError"),
+        ]
+
+        self.assertEqual(select_profile(results, 50.0), results[2])
+        self.assertEqual(select_profile(results, 10.0), results[0])
+        self.assertIsNone(select_profile(results[4:], 50.0))
+
+    def test_candidate_grid(self) -> None:
+        """Тест сетки конфигураций: все сочетания, потоки OpenCV равны потокам torch."""
+        grid = candidate_grid(["pt", "onnx"], [320, 416], [1], [1, 2], [1])
+
+        self.assertEqual(len(grid), 8)
+        self.assertTrue(all(c["opencv_threads"] == c["threads"] for c in grid))
+
+    def test_apply_host_profile(self) -> None:
+        """Тест применения профиля: значения ModelConfig по умолчанию меняются только явным вызовом."""
+        host_profile.save_host_profile(self.profile, {}, self.path)
+        AutotuneConfig.PROFILE_PATH = self.path
+
+        detector = YOLODetector(batch_size=1, backend="pt")
+        self.assertEqual(detector.img_size, self.saved[1])
+        self.assertEqual((ModelConfig.BACKEND, ModelConfig.IMG_SIZE, ModelConfig.BATCH_SIZE), self.saved[:3])
+
+        self.assertEqual(host_profile.apply_host_profile(threads=False), self.profile)
+        self.assertEqual(
+            (ModelConfig.BACKEND, ModelConfig.IMG_SIZE, ModelConfig.BATCH_SIZE), ("onnx", 416, 4)
+        )
+
+    def test_profile_of_other_host_ignored(self) -> None:
+        """Тест профиля, подобранного на другой машине: он не применяется."""
+        host_profile.save_host_profile(self.profile, {}, self.path)
+        with open(self.path) as f:
+            data = json.load(f)
+        data["host"]["cpu_count"] = -1
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+        self.assertIsNone(host_profile.load_host_profile(self.path))
+        self.assertIsNone(host_profile.load_host_profile(str(Path(self.temp_dir.name) / "missing.json")))
+
+
+class TestBoxes(unittest.TestCase):
+    """Unit-тесты для утилит работы с bounding boxes."""
+
+    def test_box_iou(self) -> None:
+        """Тест IoU для совпадающих, пересекающихся и непересекающихся boxes."""
+        boxes_a = np.array([[0, 0, 10, 10]])
+        boxes_b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+
+        iou = box_iou(boxes_a, boxes_b)
+
+        self.assertEqual(iou.shape, (1, 3))
+        np.testing.assert_allclose(iou[0], [1.0, 1 / 3, 0.0], atol=1e-6)
+
+    def test_box_ios(self) -> None:
+        """Тест доли пересечения от меньшего box: вложенный box даёт 1."""
+        ios = box_ios(np.array([[0, 0, 10, 10]]), np.array([[2, 2, 6, 6], [5, 0, 15, 10]]))
+
+        np.testing.assert_allclose(ios[0], [1.0, 0.5], atol=1e-6)
+
+    def test_nms_respects_class(self) -> None:
+        """Тест NMS: подавляются только менее уверенные boxes того же класса."""
+        xyxy = np.array([[0, 0, 10, 10], [1, 0, 11, 10], [1, 0, 11, 10], [2, 2, 5, 5]])
+        scores = np.array([0.9, 0.8, 0.7, 0.6])
+        cls_ids = np.array([0, 0, 1, 0])
+
+        self.assertEqual(nms(xyxy, scores, cls_ids, 0.5).tolist(), [0, 2, 3])
+        self.assertEqual(nms(xyxy, scores, cls_ids, 0.5, metric="ios").tolist(), [0, 2])
+        self.assertEqual(nms(xyxy, scores, cls_ids, 0.5, max_det=2).tolist(), [0, 2])
+
+    def test_nmm_merges_group(self) -> None:
+        """Тест NMM: оставленный box - объединение подавленных им boxes того же класса."""
+        xyxy = np.array([[50, 0, 100, 50], [0, 0, 60, 50], [0, 0, 60, 50], [300, 0, 310, 10]])
+        scores = np.array([0.9, 0.8, 0.7, 0.6])
+        cls_ids = np.array([0, 0, 1, 0])
+
+        keep, merged = nmm(xyxy, scores, cls_ids, 0.1)
+
+        self.assertEqual(keep.tolist(), [0, 2, 3])
+        np.testing.assert_allclose(merged, [[0, 0, 100, 50], [0, 0, 60, 50], [300, 0, 310, 10]])
+
+    def test_nms_threshold_exclusive(self) -> None:
+        """Тест NMS: box с перекрытием ровно threshold не подавляется (как в torchvision)."""
+        xyxy = np.array([[0, 0, 10, 10], [0, 0, 10, 5]])  # IoU = 0.5
+
+        self.assertEqual(nms(xyxy, np.array([0.9, 0.8]), np.array([0, 0]), 0.5).tolist(), [0, 1])
+        self.assertEqual(nms(xyxy, np.array([0.9, 0.8]), np.array([0, 0]), 0.4).tolist(), [0])
+
+    def test_match_detections_respects_class(self) -> None:
+        """Тест сопоставления: boxes разных классов не совпадают."""
+        ref_xyxy = np.array([[0, 0, 10, 10], [50, 50, 60, 60]])
+        xyxy = np.array([[50, 50, 61, 60], [0, 0, 10, 11]])
+
+        ref_idx, idx = match_detections(ref_xyxy, np.array([0, 2]), xyxy, np.array([2, 1]))
+
+        self.assertEqual(ref_idx.tolist(), [1])
+        self.assertEqual(idx.tolist(), [0])
+
+    def test_letterbox_shape(self) -> None:
+        """Тест приведения кадра к квадратному входу модели."""
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+        image, ratio, (left, top) = letterbox(frame, 320)
+
+        self.assertEqual(image.shape, (320, 320, 3))
+        self.assertAlmostEqual(ratio, 0.25)
+        self.assertEqual(left, 0)
+        self.assertEqual(top, 70)
+
+
+class TestEvaluation(unittest.TestCase):
+    """Unit-тесты для оценки качества детекции и расстояний."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.gt = (
+            np.array([[0, 0, 10, 10], [20, 20, 40, 40]], dtype=np.float32),
+            np.array([0, 1], dtype=np.int32),
+            np.array([5.0, np.nan], dtype=np.float32),
+        )
+
+    def test_perfect_and_missing_detections(self) -> None:
+        """Тест mAP: точные детекции - 1.0, пропуск половины классов - 0.5."""
+        xyxy, cls, _ = self.gt
+        perfect = detection_map([(xyxy, cls, np.array([0.9, 0.8]))], [self.gt])
+        self.assertAlmostEqual(perfect["map50"], 1.0)
+        self.assertAlmostEqual(perfect["map50_95"], 1.0)
+
+        half = detection_map([(xyxy[:1], cls[:1], np.array([0.9]))], [self.gt])
+        self.assertAlmostEqual(half["map50"], 0.5)
+
+    def test_average_precision_ranking(self) -> None:
+        """Тест AP: ложная детекция с меньшей уверенностью не снижает AP, с большей - снижает."""
+        self.assertAlmostEqual(average_precision(np.array([0.9, 0.1]), np.array([True, False]), 1), 1.0)
+        self.assertAlmostEqual(average_precision(np.array([0.1, 0.9]), np.array([True, False]), 1), 0.5)
+        self.assertEqual(average_precision(np.zeros(0), np.zeros(0, dtype=bool), 3), 0.0)
+
+    def test_distance_error(self) -> None:
+        """Тест ошибки расстояния: считается только по совпавшим boxes с размеченным расстоянием."""
+        xyxy, cls, _ = self.gt
+        error = distance_error([(xyxy + 0.5, cls, np.array([6.0, 30.0]))], [self.gt])
+
+        self.assertEqual(error["matched"], 1)
+        self.assertAlmostEqual(error["mae_m"], 1.0)
+        self.assertAlmostEqual(error["rel_error"], 0.2)
+
+    def test_pareto_front(self) -> None:
+        """Тест Парето-фронта: доминируемая по всем координатам точка не попадает во фронт."""
+        points = np.array([[0.5, -20.0], [0.6, -30.0], [0.4, -25.0], [0.6, -30.0]])
+        self.assertEqual(pareto_front(points).tolist(), [True, True, False, True])
+
+    def test_load_labels(self) -> None:
+        """Тест загрузки разметки: имена классов переводятся в id модели, null - неизвестное расстояние."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "clip.jsonl"
+            path.write_text(
+                json.dumps({"frame": 3, "boxes": [[0, 0, 5, 5], [1, 1, 4, 4]], "cls": ["car", 0], "distance": [12.0, None]})
+                + "\n" + json.dumps({"frame": 7}) + "\n"
+            )
+            labels = load_labels(str(path), {0: "person", 2: "car"})
+
+            self.assertEqual(sorted(labels), [3, 7])
+            self.assertEqual(labels[3][1].tolist(), [2, 0])
+            self.assertTrue(np.isnan(labels[3][2][1]))
+            self.assertEqual(labels[7][0].shape, (0, 4))
+            with self.assertRaises(ValueError):
+                load_labels(str(path), {0: "person"})
+
+
+class TestTiling(unittest.TestCase):
+    """Unit-тесты для тайлового инференса."""
+
+    def test_tiles_cover_frame(self) -> None:
+        """Тест сетки тайлов: кадр покрыт целиком, тайлы не выходят за кадр."""
+        tiles = make_tiles((1280, 720), 320, 0.2)
+
+        covered = np.zeros((720, 1280), dtype=bool)
+        for x1, y1, x2, y2 in tiles:
+            self.assertEqual((x2 - x1, y2 - y1), (320, 320))
+            covered[y1:y2, x1:x2] = True
+        self.assertTrue(covered.all())
+        self.assertEqual(len(tiles), 5 * 3)
+
+    def test_tiles_region(self) -> None:
+        """Тест сетки тайлов для области кадра и для области меньше тайла."""
+        tiles = make_tiles((1280, 720), 320, 0.2, region=(0.25, 0.25, 0.75, 0.5))
+        self.assertEqual(tiles, [(320, 110, 640, 430), (576, 110, 896, 430), (640, 110, 960, 430)])
+
+        tiles = make_tiles((1280, 720), 320, 0.2, region=(0.0, 0.9, 0.1, 1.0))
+        self.assertEqual(tiles, [(0, 400, 320, 720)])
+
+    def test_merge_across_tiles(self) -> None:
+        """Тест перевода boxes в координаты кадра и слияния дублей с соседних тайлов."""
+        frame = np.zeros((320, 480, 3), dtype=np.uint8)
+        frame[100:150, 250:300] = 255  # объект в зоне перекрытия двух тайлов
+
+        def predict(crops: list, **kwargs: Any) -> list:
+            results = []
+            for crop in crops:
+                ys, xs = np.nonzero(crop[..., 0])
+                boxes = np.zeros((0, 6), dtype=np.float32)
+                if len(xs):
+                    conf = 0.9 if crop.shape[1] == 480 else 0.8
+                    boxes = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, conf, 0]], np.float32)
+                results.append(
+                    FrameDetections(crop, boxes[:, :4], boxes[:, 4], boxes[:, 5].astype(np.int32), speed={})
+                )
+            return results
+
+        tiler = TiledInference(predict, batch_size=2, tile_size=320, overlap=0.5)
+        result = tiler([frame, frame])[1]
+
+        self.assertEqual(len(tiler.tiles_for(frame)), 3)  # два тайла и весь кадр
+        np.testing.assert_allclose(result.xyxy, [[250, 100, 300, 150]])
+        self.assertAlmostEqual(float(result.confs[0]), 0.9, places=6)
+
+    def test_merge_keeps_full_box(self) -> None:
+        """Тест слияния по ios: обрезанный тайлом box с большей уверенностью не вытесняет полный box."""
+        data = np.array([
+            [0, 0, 100, 50, 0.6, 0],  # весь кадр: полный box
+            [60, 0, 100, 50, 0.9, 0],  # тайл: обрезанная часть того же объекта
+            [200, 0, 260, 50, 0.8, 0],
+        ], dtype=np.float32)
+
+        merged = merge_detections(data, threshold=0.6, metric="ios")
+
+        np.testing.assert_allclose(merged, [[0, 0, 100, 50, 0.9, 0], [200, 0, 260, 50, 0.8, 0]])
+        np.testing.assert_allclose(merge_detections(data, threshold=0.6, metric="iou"), data[[1, 2, 0]])
+
+    def test_frame_tiles_in_one_call(self) -> None:
+        """Тест батчей: все тайлы кадра 1280x720 и весь кадр идут в модель одним вызовом."""
+        calls = []
+
+        def predict(crops: list, **kwargs: Any) -> list:
+            calls.append(len(crops))
+            return [
+                FrameDetections(crop, np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32))
+                for crop in crops
+            ]
+
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        results = TiledInference(predict, batch_size=1)([frame, frame, frame])
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(calls, [16, 16, 16])
+
+
+class TestMotionGate(unittest.TestCase):
+    """Unit-тесты для пропуска детекции на статичных кадрах."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.frame = np.random.default_rng(0).integers(0, 255, (360, 640, 3), dtype=np.uint8)
+
+    def test_static_frames_skipped_with_refresh(self) -> None:
+        """Тест статичной сцены: детектор запускается на первом кадре и раз в refresh_every кадров."""
+        gate = MotionGate(refresh_every=4)
+
+        decisions = [gate.update(self.frame.copy()) for _ in range(9)]
+
+        self.assertEqual(decisions, [True, False, False, False, True, False, False, False, True])
+        self.assertAlmostEqual(gate.skip_ratio, 6 / 9)
+
+    def test_change_detected(self) -> None:
+        """Тест изменения сцены: шум не запускает детектор, появившийся объект - запускает."""
+        gate = MotionGate(refresh_every=100)
+        gate.update(self.frame)
+
+        noisy = cv2.add(self.frame, np.full_like(self.frame, 3))
+        self.assertFalse(gate.update(noisy))
+
+        moved = self.frame.copy()
+        moved[100:200, 300:400] = 0
+        self.assertTrue(gate.update(moved))
+
+
+class TestResolutionController(unittest.TestCase):
+    """Unit-тесты для подстройки размера входа под бюджет задержки."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.controller = ResolutionController(
+            ladder=(256, 416, 320), budget_ms=40.0, percentile=90, window=10, headroom=0.7
+        )
+
+    def test_steps_down_over_budget(self) -> None:
+        """Тест шага вниз: решение только по полному окну, затем окно копится заново."""
+        self.assertEqual(self.controller.ladder, (416, 320, 256))
+        self.assertEqual(self.controller.img_size, 416)
+
+        decisions = [self.controller.observe(60.0) for _ in range(10)]
+        self.assertEqual(decisions, [None] * 9 + [320])
+
+        decisions = [self.controller.observe(60.0) for _ in range(10)]
+        self.assertEqual(decisions, [None] * 9 + [256])
+
+        self.assertIsNone(self.controller.observe(60.0, count=10))
+        self.assertEqual(self.controller.img_size, 256)
+        self.assertEqual(self.controller.changes, 2)
+
+    def test_steps_up_with_headroom(self) -> None:
+        """Тест шага вверх: только если ожидаемая задержка на большем размере с запасом в бюджете."""
+        controller = ResolutionController(
+            ladder=(416, 320, 256), budget_ms=40.0, percentile=90, window=10, headroom=0.7, start=256
+        )
+        # 20 мс * (320/256)^2 = 31.25 мс > 0.7 * 40 мс - размер держится
+        self.assertIsNone(controller.observe(20.0, count=10))
+        self.assertIsNone(controller.observe(20.0, count=10))
+        self.assertEqual(controller.img_size, 256)
+
+        # 15 мс * (320/256)^2 = 23.4 мс < 28 мс
+        self.assertEqual(controller.observe(15.0, count=10), 320)
+
+    def test_percentile_ignores_rare_spikes(self) -> None:
+        """Тест перцентиля: единичный выброс выше бюджета не уменьшает размер."""
+        controller = ResolutionController(ladder=(416, 320, 256), budget_ms=40.0, percentile=90, window=20)
+        self.assertIsNone(controller.observe(30.0, count=19))
+        self.assertIsNone(controller.observe(500.0))
+        self.assertEqual(controller.img_size, 416)
+
+
+class TestByteTracker(unittest.TestCase):
+    """Unit-тесты для трекера."""
+
+    def setUp(self) -> None:
+        """Инициализация перед каждым тестом."""
+        self.tracker = ByteTracker()
+
+    def step(self, xyxy: Any = None, confs: Any = None, cls_ids: Any = None) -> tuple:
+        self.tracker.predict()
+        if xyxy is not None:
+            self.tracker.update(np.array(xyxy), np.array(confs), np.array(cls_ids))
+        return self.tracker.get_tracks()
+
+    def test_track_id_stable_and_box_carried_forward(self) -> None:
+        """Тест стабильного id и переноса box по скорости между детекциями."""
+        _, _, _, ids_first = self.step([[0, 0, 20, 40]], [0.9], [0])
+        self.step()
+        self.step()
+        _, _, _, ids_second = self.step([[9, 0, 29, 40]], [0.9], [0])
+
+        self.assertEqual(ids_first.tolist(), ids_second.tolist())
+
+        xyxy, _, _, _ = self.step()
+        self.assertGreater(xyxy[0, 0], 9.0)
+
+    def test_low_confidence_detection_keeps_track(self) -> None:
+        """Тест: неуверенная детекция продлевает трек, но не создаёт новый."""
+        self.step([[0, 0, 20, 40]], [0.9], [0])
+        xyxy, _, _, ids = self.step([[1, 0, 21, 40], [100, 100, 120, 140]], [0.2, 0.2], [0, 0])
+
+        self.assertEqual(len(ids), 1)
+        self.assertAlmostEqual(float(xyxy[0, 0]), 1.0)
+
+    def test_unmatched_track_lost_and_redetection_requested(self) -> None:
+        """Тест потери трека без детекции и запроса внеочередной детекции."""
+        self.step([[0, 0, 20, 40]], [0.9], [0])
+        self.assertFalse(self.tracker.needs_detection())
+
+        for _ in range(20):
+            self.step()
+        self.assertTrue(self.tracker.needs_detection())
+
+        xyxy, _, _, _ = self.step(np.zeros((0, 4)), np.zeros(0), np.zeros(0))
+        self.assertEqual(len(xyxy), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file